@@ -0,0 +1,43 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.analytics_store import get_analytics_aggregates
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            # Bentuk response sama dengan /api/analytics, dijawab dari aggregates (update incremental)
+            result = get_analytics_aggregates().summary()
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
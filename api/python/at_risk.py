@@ -0,0 +1,92 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.score_store import get_score_store
+
+DEFAULT_N = 10
+MAX_N = 500
+
+# Query parameter -> kolom filter di score store
+FILTER_PARAMS = {
+    'department': 'Department',
+    'job_role': 'JobRole',
+    'risk_level': 'risk_level',
+}
+
+def parse_query(query):
+    """?n=20&department=Sales&job_role=Sales Executive&risk_level=High,Medium"""
+    params = parse_qs(query)
+    n = int(params.get('n', [DEFAULT_N])[0])
+    filters = {}
+    for param, column in FILTER_PARAMS.items():
+        values = [part.strip() for value in params.get(param, []) for part in value.split(',') if part.strip()]
+        if values:
+            filters[column] = values
+    return n, filters
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            try:
+                n, filters = parse_query(urlparse(self.path).query)
+            except ValueError:
+                n, filters = None, None
+
+            if n is None or not 1 <= n <= MAX_N:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": f"n must be an integer between 1 and {MAX_N}"
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            store = get_score_store()
+            employees, total_matching = store.top_at_risk(n, **filters)
+
+            result = {
+                "success": True,
+                "model_version": store.meta['model_version'],
+                "filters": filters,
+                "total_matching": total_matching,
+                "count": len(employees),
+                "employees": employees
+            }
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
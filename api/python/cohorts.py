@@ -0,0 +1,91 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.cohort_cube import CohortQueryError, get_cohort_cube
+
+# Query parameter -> dimensi cube
+DIMENSION_PARAMS = {
+    'department': 'Department',
+    'job_role': 'JobRole',
+    'overtime': 'OverTime',
+    'business_travel': 'BusinessTravel',
+    'marital_status': 'MaritalStatus',
+    'tenure': 'TenureBucket',
+}
+
+def split_values(params, name):
+    return [part.strip() for value in params.get(name, []) for part in value.split(',') if part.strip()]
+
+def parse_query(query):
+    """?group_by=department,overtime&job_role=Sales Executive&tenure=0-1,2-4"""
+    params = parse_qs(query)
+    group_by = []
+    for param in split_values(params, 'group_by'):
+        if param not in DIMENSION_PARAMS:
+            raise CohortQueryError(f"Unknown group_by '{param}', expected any of {list(DIMENSION_PARAMS)}")
+        group_by.append(DIMENSION_PARAMS[param])
+    filters = {}
+    for param, dimension in DIMENSION_PARAMS.items():
+        values = split_values(params, param)
+        if values:
+            filters[dimension] = values
+    return group_by, filters
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            # Hanya query yang tidak valid yang 400; error saat build / load cube tetap 500
+            cube = get_cohort_cube()
+            try:
+                group_by, filters = parse_query(urlparse(self.path).query)
+                result = cube.query(group_by, **filters)
+            except CohortQueryError as e:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": str(e)
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            result["success"] = True
+            result["model_version"] = cube.meta['model_version']
+            result["rows"] = cube.meta['rows']
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
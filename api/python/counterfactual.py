@@ -0,0 +1,92 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.scoring import get_engine
+from utils.counterfactual import DEFAULT_MAX_CHANGES, DEFAULT_TIME_BUDGET_MS, SearchError, search
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            started = time.perf_counter()
+
+            # Read the request body
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+
+            # Body: {"employee": {...}, "target_risk": "Medium", "actions": [...], "cost_weights": {...},
+            #        "max_changes": 3, "time_budget_ms": 500, "top_k": 5}
+            input_data = json.loads(post_data.decode('utf-8'))
+            employee = input_data.get('employee') if isinstance(input_data, dict) else None
+
+            error = None
+            if not isinstance(employee, dict):
+                error = "Missing 'employee' object"
+            else:
+                try:
+                    # Semua validasi input (termasuk encoding employee) ada di search() -> SearchError
+                    with get_engine().acquire() as engine:
+                        result = search(
+                            engine, employee,
+                            target_risk=input_data.get('target_risk', 'Medium'),
+                            target_probability=input_data.get('target_probability'),
+                            actions=input_data.get('actions'),
+                            cost_weights=input_data.get('cost_weights'),
+                            max_changes=input_data.get('max_changes', DEFAULT_MAX_CHANGES),
+                            time_budget_ms=input_data.get('time_budget_ms', DEFAULT_TIME_BUDGET_MS),
+                            top_k=input_data.get('top_k', 5)
+                        )
+                        result["model_version"] = engine.version
+                except SearchError as e:
+                    error = str(e)
+
+            if error:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            result["success"] = True
+            result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+
+            # Send response
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            # Handle errors
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
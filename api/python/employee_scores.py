@@ -0,0 +1,81 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.score_store import get_score_store
+
+# Batas jumlah id per request
+MAX_IDS = 1000
+
+def parse_employee_ids(query):
+    """Ambil EmployeeId dari query string: ?id=1&id=2 atau ?ids=1,2,3"""
+    params = parse_qs(query)
+    raw_ids = params.get('id', []) + [
+        part for value in params.get('ids', []) for part in value.split(',')
+    ]
+    return [int(value) for value in raw_ids if value.strip()]
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            try:
+                employee_ids = parse_employee_ids(urlparse(self.path).query)
+            except ValueError:
+                employee_ids = None
+
+            if not employee_ids or len(employee_ids) > MAX_IDS:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": f"Provide 1-{MAX_IDS} integer EmployeeIds via ?id=1&id=2 or ?ids=1,2"
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            store = get_score_store()
+            scores, not_found = store.lookup(employee_ids)
+
+            result = {
+                "success": True,
+                "model_version": store.meta['model_version'],
+                "count": len(scores),
+                "scores": scores,
+                "not_found": not_found
+            }
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
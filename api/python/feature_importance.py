@@ -0,0 +1,120 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.artifacts import ArtifactUnavailable
+from utils.metrics import METRICS
+from utils.permutation_importance import DEFAULT_METRIC, DEFAULT_REPEATS, get_permutation_importance
+
+# Importance hanya berubah saat model atau dataset berubah (ETag), jadi boleh di-cache client/CDN
+CACHE_CONTROL = 'public, max-age=300, stale-while-revalidate=3600'
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            # ?metric=auc&repeats=10&seed=0 (optional) memilih artifact dengan parameter job lain
+            error, status = None, 400
+            params = parse_qs(urlparse(self.path).query)
+            metric = params.get('metric', [DEFAULT_METRIC])[0]
+            try:
+                n_repeats = int(params.get('repeats', [DEFAULT_REPEATS])[0])
+                seed = int(params.get('seed', [0])[0])
+            except ValueError:
+                error = "repeats and seed must be integers"
+            if error is None and metric not in METRICS:
+                error = f"Unknown metric '{metric}', expected one of {list(METRICS)}"
+            if error is None:
+                try:
+                    artifact = get_permutation_importance(metric=metric, n_repeats=n_repeats, seed=seed)
+                except ArtifactUnavailable as e:
+                    # Job offline, tidak pernah dijalankan di dalam request
+                    error, status = str(e), 503
+
+            if error:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if status == 503:
+                    self.send_header('Retry-After', '300')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+            meta = artifact['meta']
+
+            stale = '-stale' if artifact['stale'] else ''
+            etag = (f'"importance-{meta["model_version"]}-{meta["dataset_fingerprint"]}-{meta["metric"]}'
+                    f'-r{meta["n_repeats"]}-s{meta["seed"]}{stale}"')
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', CACHE_CONTROL)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                return
+
+            ranked = sorted(artifact['features'].items(), key=lambda item: -item[1]['mean'])
+            features = [
+                {
+                    "feature": name,
+                    "importance": summary['mean'],
+                    "std": summary['std'],
+                    "ci_low": summary['ci_low'],
+                    "ci_high": summary['ci_high'],
+                    "impurity_importance": summary.get('impurity_importance')
+                }
+                for name, summary in ranked
+            ]
+
+            result = {
+                "success": True,
+                "model_version": meta['model_version'],
+                # True kalau dataset berubah sejak job terakhir
+                "stale": artifact['stale'],
+                "metric": meta['metric'],
+                "baseline": artifact['baseline'],
+                "labeled_rows": meta['labeled_rows'],
+                "n_repeats": meta['n_repeats'],
+                "seed": meta['seed'],
+                "confidence": meta['confidence'],
+                "features": features
+            }
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.end_headers()
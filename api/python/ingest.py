@@ -0,0 +1,89 @@
+from http.server import BaseHTTPRequestHandler
+import hmac
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.ingest import IngestError, ingest
+
+# Kalau diset, request wajib membawa header Authorization: Bearer <token>
+INGEST_TOKEN = os.getenv('ATTRITION_INGEST_TOKEN')
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            if INGEST_TOKEN and not hmac.compare_digest(self.headers.get('Authorization', ''), f"Bearer {INGEST_TOKEN}"):
+                self.send_response(401)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": "Missing or invalid ingest token"
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            # Read the request body
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+
+            # Body: [{"EmployeeId": 1, "OverTime": "No", ...}, ...] atau {"rows": [...]}
+            input_data = json.loads(post_data.decode('utf-8'))
+            records = input_data.get('rows') if isinstance(input_data, dict) else input_data
+
+            error = None
+            try:
+                result = ingest(records)
+            except IngestError as e:
+                error = str(e)
+
+            if error:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            result["success"] = True
+
+            # Send response
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            # Handle errors
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.end_headers()
@@ -0,0 +1,103 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.artifacts import ArtifactUnavailable
+from utils.pdp import get_pdp
+
+# Curves hanya berubah saat model atau dataset berubah (ETag), jadi boleh di-cache client/CDN
+CACHE_CONTROL = 'public, max-age=300, stale-while-revalidate=3600'
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            # ?feature=MonthlyIncome,OverTime (optional, default semua fitur)
+            params = parse_qs(urlparse(self.path).query)
+            requested = [part.strip() for value in params.get('feature', []) for part in value.split(',') if part.strip()]
+
+            try:
+                artifact = get_pdp()
+            except ArtifactUnavailable as e:
+                # Curves dihitung oleh job offline, tidak pernah di dalam request
+                self.send_response(503)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Retry-After', '300')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": str(e)
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+            meta = artifact['meta']
+            unknown = [name for name in requested if name not in artifact['features']]
+            if unknown:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": f"Unknown features {unknown}, available: {list(artifact['features'])}"
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            stale = '-stale' if artifact['stale'] else ''
+            etag = (f'"pdp-{meta["model_version"]}-{meta["dataset_fingerprint"]}-g{meta["grid_size"]}'
+                    f'-i{meta["ice_sample"]}-s{meta["seed"]}{stale}-{",".join(requested)}"')
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', CACHE_CONTROL)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                return
+
+            result = {
+                "success": True,
+                "model_version": meta['model_version'],
+                # True kalau dataset berubah sejak job terakhir (jalankan ulang python -m utils.pdp)
+                "stale": artifact['stale'],
+                "rows": meta['rows'],
+                "ice_quantiles": meta['ice_quantiles'],
+                "features": {name: artifact['features'][name] for name in requested} if requested else artifact['features']
+            }
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.end_headers()
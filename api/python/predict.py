@@ -2,6 +2,16 @@ from http.server import BaseHTTPRequestHandler
 import json
 import sys
 import os
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.scoring import encode_records, format_prediction
+from utils.hot_swap import get_serving_engine
+from utils.model_pool import ModelNotFoundError, ModelSelectionError, get_model_pool, model_selector
+from utils.shadow import get_shadow_scorer
+from utils.drift import drift_status, get_drift_monitor
+from utils.prediction_log import get_prediction_logger
 
 def get_feature_columns():
     """Return the exact 47 feature columns that the model expects"""
@@ -117,66 +127,66 @@ def preprocess_input_data(input_data):
         print(f"Error preprocessing data: {e}", file=sys.stderr)
         return None
 
-def try_ml_prediction(input_data):
+# Engine di-cache per proses: cold start load sekali, warm request langsung prediksi.
+# _ENGINE adalah HotSwapEngine: dengan ATTRITION_HOT_SWAP=1 model baru di-swap tanpa redeploy
+_ENGINE = None
+_WATCHER = None
+
+# Batas jumlah employee per batch request
+MAX_BATCH_SIZE = int(os.getenv('ATTRITION_MAX_BATCH_SIZE', '1000'))
+
+def get_engine():
+    """Load scoring engine sekali per proses (pilih lewat env ATTRITION_ENGINE: sklearn/numpy/mmap)"""
+    global _ENGINE, _WATCHER
+    if _ENGINE is None:
+        _ENGINE, _WATCHER = get_serving_engine(os.getenv('ATTRITION_ENGINE') or None)
+    return _ENGINE
+
+def get_pool():
+    """Model pool per proses (engine default = get_engine(), versi lain di-load sesuai request)"""
+    get_engine()
+    return get_model_pool(os.getenv('ATTRITION_ENGINE') or None)
+
+def monitor_request(records, X, proba, version, model_info):
+    """
+    Update drift monitor dengan payload request, dan kirim request yang dilayani model
+    default ke shadow scorer (kalau ATTRITION_SHADOW_* diset)
+    """
+    monitor = get_drift_monitor()
+    if monitor is not None:
+        monitor.update(records, X)
+    shadow = get_shadow_scorer(get_pool())
+    if shadow is not None and model_info is None:
+        shadow.submit(X, proba, version)
+
+def add_model_info(result, model_info):
+    """Tambahkan nama + versi registry ke response kalau request memilih model"""
+    if model_info:
+        result["model_name"] = model_info["model_name"]
+        result["model_registry_version"] = model_info["registry_version"]
+    return result
+
+def try_ml_prediction(input_data, selector=None):
     """Try to use the ML model first"""
     try:
-        # Import ML libraries
-        from pathlib import Path
-        import pandas as pd
-        import numpy as np
-        import joblib
-        
-        # Debug: Print current working directory and file locations
-        current_dir = Path(__file__).parent
-        model_dir = current_dir / 'models'
-        model_path = model_dir / 'rf_model.pkl'
-        scaler_path = model_dir / 'scaler.pkl'
-        
-        print(f"Current file: {__file__}", file=sys.stderr)
-        print(f"Current dir: {current_dir}", file=sys.stderr)
-        print(f"Model dir: {model_dir}", file=sys.stderr)
-        print(f"Model path exists: {model_path.exists()}", file=sys.stderr)
-        print(f"Scaler path exists: {scaler_path.exists()}", file=sys.stderr)
-        
-        # List files in the directory
-        try:
-            files_in_dir = list(current_dir.iterdir())
-            print(f"Files in current dir: {files_in_dir}", file=sys.stderr)
-            if model_dir.exists():
-                model_files = list(model_dir.iterdir())
-                print(f"Files in model dir: {model_files}", file=sys.stderr)
-        except Exception as list_error:
-            print(f"Error listing files: {list_error}", file=sys.stderr)
-        
-        if not model_path.exists() or not scaler_path.exists():
-            return None, f"ML model files not found - model: {model_path.exists()}, scaler: {scaler_path.exists()}"
-        
-        # Load model and scaler
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        
-        # Preprocess input data to 47 features
-        processed_data = preprocess_input_data(input_data)
-        if processed_data is None:
-            return None, "Failed to preprocess input data"
-        
-        print(f"Processed data shape: {processed_data.shape}", file=sys.stderr)
-        print(f"Processed data columns: {list(processed_data.columns)}", file=sys.stderr)
-        
-        # Scale and predict
-        scaled_data = scaler.transform(processed_data)
-        prediction = model.predict(scaled_data)[0]
-        prediction_proba = model.predict_proba(scaled_data)[0]
-        
-        # Get feature importance
-        feature_names = processed_data.columns.tolist()
-        feature_importance = dict(zip(feature_names, model.feature_importances_))
+        # acquire(): semua atribut dari engine yang sama walaupun model di-swap di tengah request
+        with get_pool().acquire(selector) as (engine, model_info):
+            # Encode input data to 47 features and predict
+            processed_data = encode_records([input_data])
+            batch_proba = engine.predict_proba(processed_data)
+            prediction_proba = batch_proba[0]
+            prediction = engine.classes_[prediction_proba.argmax()]
+            
+            # Get feature importance
+            feature_importance = dict(zip(get_feature_columns(), engine.feature_importances_.tolist()))
+            model_type, version = engine.model_type, engine.version
+        monitor_request([input_data], processed_data, batch_proba, version, model_info)
         top_features = dict(sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:10])
         
         attrition_prob = prediction_proba[1]
         risk_level = "High" if attrition_prob > 0.7 else "Medium" if attrition_prob > 0.4 else "Low"
         
-        return {
+        return add_model_info({
             "success": True,
             "prediction": int(prediction),
             "prediction_label": "Will Leave" if prediction == 1 else "Will Stay",
@@ -186,10 +196,34 @@ def try_ml_prediction(input_data):
             },
             "risk_level": risk_level,
             "confidence": float(max(prediction_proba)),
-            "model_type": "Random Forest ML Model (47 Features)",
+            "model_type": model_type,
+            "model_version": version,
             "top_feature_importance": top_features
-        }, None
+        }, model_info), None
         
+    except ModelSelectionError:
+        raise
+    except Exception as e:
+        return None, f"ML model error: {str(e)}"
+
+def try_ml_batch_prediction(records, selector=None):
+    """Vectorized ML prediction untuk batch request (satu predict_proba call)"""
+    try:
+        with get_pool().acquire(selector) as (engine, model_info):
+            X = encode_records(records)
+            prediction_proba = engine.predict_proba(X)
+            model_type, version = engine.model_type, engine.version
+        monitor_request(records, X, prediction_proba, version, model_info)
+        
+        results = []
+        for row in prediction_proba:
+            result = format_prediction(row, model_type)
+            result["model_version"] = version
+            results.append(add_model_info(result, model_info))
+        return results, None
+        
+    except ModelSelectionError:
+        raise
     except Exception as e:
         return None, f"ML model error: {str(e)}"
 
@@ -333,7 +367,18 @@ def ml_prediction(input_data):
         return None  # Fall back to rule-based
 
 class handler(BaseHTTPRequestHandler):
+    def log_prediction(self, input_data, result, status, started, selector=None):
+        """Kirim request + response + pilihan model ke prediction log (kalau PREDICTION_LOG_PATH diset)"""
+        prediction_log = get_prediction_logger()
+        if prediction_log is None:
+            return
+        predictions = result.get("predictions", [result])
+        model_version = predictions[0].get("model_version", "rule-based") if predictions else None
+        prediction_log.log(input_data, result, status=status, model_version=model_version,
+                           latency_ms=(time.perf_counter() - started) * 1000, model_selector=selector)
+    
     def do_POST(self):
+        started = time.perf_counter()
         try:
             # Read the request body
             content_length = int(self.headers['Content-Length'])
@@ -342,45 +387,96 @@ class handler(BaseHTTPRequestHandler):
             # Parse JSON data
             input_data = json.loads(post_data.decode('utf-8'))
             
+            # A JSON list is a batch request, scored in a single predict_proba call
+            is_batch = isinstance(input_data, list)
+            records = input_data if is_batch else [input_data]
+            
             # Validate required fields
+            validation_error = None
+            if is_batch and not 0 < len(records) <= MAX_BATCH_SIZE:
+                validation_error = f"Batch size must be between 1 and {MAX_BATCH_SIZE}"
             required_fields = ['Age', 'DistanceFromHome', 'MonthlyIncome', 'YearsAtCompany']
-            for field in required_fields:
-                if field not in input_data or input_data[field] == '' or input_data[field] is None:
-                    self.send_response(400)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    
-                    error_result = {
-                        "success": False,
-                        "error": f"Missing required field: {field}"
-                    }
-                    self.wfile.write(json.dumps(error_result).encode('utf-8'))
-                    return
+            for index, record in enumerate(records):
+                if validation_error:
+                    break
+                if not isinstance(record, dict):
+                    validation_error = f"Row {index} must be a JSON object"
+                    break
+                for field in required_fields:
+                    if field not in record or record[field] == '' or record[field] is None:
+                        validation_error = f"Missing required field: {field}"
+                        if is_batch:
+                            validation_error += f" (row {index})"
+                        break
+            
+            if validation_error:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                
+                error_result = {
+                    "success": False,
+                    "error": validation_error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                self.log_prediction(input_data, error_result, 400, started)
+                return
             
-            # Try ML prediction first
-            ml_result, ml_error = try_ml_prediction(input_data)
+            # Pilihan model (header X-Model-* atau field "model"); tanpa pilihan = model default
+            try:
+                selector = model_selector(self.headers, input_data)
+                if is_batch:
+                    ml_results, ml_error = try_ml_batch_prediction(records, selector)
+                else:
+                    ml_result, ml_error = try_ml_prediction(input_data, selector)
+            except ModelSelectionError as e:
+                # Model yang dipilih eksplisit tidak di-fallback ke model lain / rule-based
+                status = 404 if isinstance(e, ModelNotFoundError) else 400
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                
+                error_result = {
+                    "success": False,
+                    "error": str(e)
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                self.log_prediction(input_data, error_result, status, started)
+                return
             
-            if ml_result and ml_result.get('success'):
-                result = ml_result
-                result["note"] = "Using Random Forest ML model"
+            if is_batch:
+                if ml_results:
+                    result = {"success": True, "count": len(ml_results), "predictions": ml_results,
+                              "note": "Using Random Forest ML model"}
+                else:
+                    result = {"success": True, "count": len(records),
+                              "predictions": [simple_rule_based_prediction(record) for record in records],
+                              "note": f"Using rule-based prediction (ML error: {ml_error})"}
             else:
-                # Fall back to rule-based
-                result = simple_rule_based_prediction(input_data)
-                if ml_error:
-                    result["note"] = f"Using rule-based prediction (ML error: {ml_error})"
+                # Try ML prediction first
+                if ml_result and ml_result.get('success'):
+                    result = ml_result
+                    result["note"] = "Using Random Forest ML model"
                 else:
-                    result["note"] = "Using rule-based prediction (ML model not available)"
+                    # Fall back to rule-based
+                    result = simple_rule_based_prediction(input_data)
+                    if ml_error:
+                        result["note"] = f"Using rule-based prediction (ML error: {ml_error})"
+                    else:
+                        result["note"] = "Using rule-based prediction (ML model not available)"
             
             # Send response
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Model-Name, X-Model-Version, X-Model-Stage')
             self.end_headers()
             
             self.wfile.write(json.dumps(result).encode('utf-8'))
+            self.log_prediction(input_data, result, 200, started, selector)
             
         except Exception as e:
             # Handle errors
@@ -397,9 +493,34 @@ class handler(BaseHTTPRequestHandler):
             
             self.wfile.write(json.dumps(error_result).encode('utf-8'))
     
+    def do_GET(self):
+        """Status model serving: versi aktif, model yang di-drain, watcher hot swap, model pool, shadow dan drift"""
+        try:
+            engine = get_engine()
+            result = {
+                "success": True,
+                "model": engine.status(),
+                "watcher": _WATCHER.status() if _WATCHER else None,
+                "pool": get_pool().status()
+            }
+            shadow = get_shadow_scorer(get_pool())
+            result["shadow"] = shadow.report() if shadow is not None else None
+            result["drift"] = drift_status()
+            status = 200
+        except Exception as e:
+            result = {"success": False, "error": f"Model not available: {str(e)}"}
+            status = 500
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(json.dumps(result).encode('utf-8'))
+    
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Model-Name, X-Model-Version, X-Model-Stage')
         self.end_headers()
\ No newline at end of file
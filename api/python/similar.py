@@ -0,0 +1,133 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.similarity import SimilarityQueryError, find_similar
+
+DEFAULT_K = 10
+MAX_K = 100
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # ?id=5&k=10 -> tetangga employee yang sudah ada di dataset (tidak termasuk dirinya sendiri)
+        try:
+            params = parse_qs(urlparse(self.path).query)
+
+            error = None
+            try:
+                employee_id = int(params['id'][0])
+                k = int(params.get('k', [DEFAULT_K])[0])
+            except (KeyError, ValueError):
+                error = "Provide an integer EmployeeId via ?id=5 (optional &k=10)"
+            if error is None:
+                try:
+                    result = find_similar(k=k, employee_id=employee_id, max_k=MAX_K)
+                except SimilarityQueryError as e:
+                    error = str(e)
+
+            if error:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            result = {"success": True, **result}
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_POST(self):
+        # Body: {"employee": {...}, "k": 10} -> tetangga untuk employee baru / hipotetis
+        try:
+            content_length = int(self.headers['Content-Length'])
+            input_data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+            employee = input_data.get('employee') if isinstance(input_data, dict) else None
+
+            error = None
+            if not isinstance(employee, dict):
+                error = "Missing 'employee' object"
+            else:
+                try:
+                    k = int(input_data.get('k', DEFAULT_K))
+                except (TypeError, ValueError):
+                    k = 0
+                try:
+                    result = find_similar(employee, k, max_k=MAX_K)
+                except SimilarityQueryError as e:
+                    # Termasuk field employee yang tidak bisa di-encode (mis. "Age": "abc")
+                    error = str(e)
+
+            if error:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            result = {"success": True, **result}
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -0,0 +1,84 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from utils.scoring import get_engine
+from utils.what_if import SweepError, sweep
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            started = time.perf_counter()
+
+            # Read the request body
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+
+            # Body: {"base": {...employee...}, "features": [{"name": ..., "values"|"start"/"stop"/"num"}]}
+            input_data = json.loads(post_data.decode('utf-8'))
+            base = input_data.get('base') if isinstance(input_data, dict) else None
+            features = input_data.get('features') if isinstance(input_data, dict) else None
+
+            error = None
+            if not isinstance(base, dict):
+                error = "Missing 'base' employee object"
+            elif not isinstance(features, list) or not all(isinstance(f, dict) for f in features):
+                error = "Missing 'features' list"
+            else:
+                try:
+                    with get_engine().acquire() as engine:
+                        result = sweep(engine, base, features)
+                        result["model_version"] = engine.version
+                except SweepError as e:
+                    error = str(e)
+
+            if error:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                error_result = {
+                    "success": False,
+                    "error": error
+                }
+                self.wfile.write(json.dumps(error_result).encode('utf-8'))
+                return
+
+            result["success"] = True
+            result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+
+            # Send response
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+        except Exception as e:
+            # Handle errors
+            error_result = {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "error_type": type(e).__name__
+            }
+
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+            self.wfile.write(json.dumps(error_result).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -0,0 +1,17 @@
+"""
+Helper bersama untuk script benchmark (cold_start_bench, load_test, replay_requests)
+
+Hanya standard library, supaya script yang mengukur cold start tidak ikut meng-import
+numpy / utils di proses pengukurnya.
+"""
+
+import math
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q dalam 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(q / 100.0 * len(ordered))))
+    return ordered[rank - 1]
@@ -1,23 +1,61 @@
+"""
+Introspeksi model: schema fitur, struktur forest dan biaya inference
+
+Tanpa argumen, script mengecek model serving di api/python/models:
+- Schema: nama + urutan fitur di scaler, model, utils.scoring.get_feature_columns() dan
+  get_feature_columns() di handler predict harus sama (exit code 1 kalau tidak)
+- Per tree: depth, jumlah node dan leaf
+- Di dataset reference: rata-rata path length (jumlah perbandingan per tree per row) dan
+  split usage per fitur (statis: jumlah node split; dinamis: berapa kali dievaluasi)
+- Memory footprint per komponen (file, array tree, alokasi saat load) dan perkiraan biaya
+  inference per row (perbandingan, byte node yang disentuh, latency terukur)
+
+Usage:
+    python scripts/check_model_features.py
+    python scripts/check_model_features.py --json cost.json
+    python scripts/check_model_features.py --local-model models/attrition_model_v3_ab12cd34ef56 \\
+        --compare cost.json
+    python scripts/check_model_features.py --list-features
+"""
+
+import argparse
+import importlib.util
+import json
 import sys
-import joblib
+import time
+import tracemalloc
 from pathlib import Path
 
+import joblib
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from utils.model_store import MODEL_FILE as LOCAL_MODEL_FILE
+from utils.model_store import load_model_file, model_content_id
+from utils.scoring import (MODEL_DIR, MODEL_FILE, NUMPY_ARTIFACT_DIR, SCALER_FILE, encode_frame,
+                           get_feature_columns, load_dataset, model_version)
+
+PREDICT_HANDLER = REPO_ROOT / 'api' / 'python' / 'predict.py'
+SINGLE_ROW_SAMPLES = 100
+
 def check_model_features():
     """Check the actual feature names used in the trained model"""
     try:
-        model_dir = Path(__file__).parent.parent / 'models'
-        
-        model_path = model_dir / 'rf_model.pkl'
-        scaler_path = model_dir / 'scaler.pkl'
-        
+        model_dir = MODEL_DIR
+
+        model_path = model_dir / MODEL_FILE
+        scaler_path = model_dir / SCALER_FILE
+
         if not model_path.exists():
             print(f"Model not found at {model_path}")
             return
-        
+
         # Load model and scaler
         model = joblib.load(model_path)
         scaler = joblib.load(scaler_path)
-        
+
         # Check if model has feature names
         if hasattr(model, 'feature_names_in_'):
             print("Model feature names:")
@@ -27,7 +65,7 @@ def check_model_features():
         else:
             print("Model doesn't have feature_names_in_ attribute")
             print(f"Model expects {model.n_features_in_} features")
-        
+
         # Check scaler features
         if hasattr(scaler, 'feature_names_in_'):
             print("\nScaler feature names:")
@@ -35,9 +73,317 @@ def check_model_features():
                 print(f"{i+1:2d}. {feature}")
         else:
             print("Scaler doesn't have feature_names_in_ attribute")
-    
+
     except Exception as e:
         print(f"Error: {e}")
 
+def traced_load(loader, path):
+    """
+    Load artifact dan ukur waktu + alokasi memori Python (tracemalloc)
+
+    Buffer node tree sklearn dialokasikan dengan malloc langsung dan tidak terlihat oleh
+    tracemalloc; ukurannya dilaporkan terpisah oleh memory_footprint.
+    """
+    import sklearn.ensemble  # noqa: F401 - import sklearn tidak dihitung sebagai biaya load
+    import sklearn.preprocessing  # noqa: F401
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        obj = loader(path)
+        load_s = time.perf_counter() - start
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return obj, {'file_bytes': path.stat().st_size, 'load_s': load_s,
+                 'python_allocated_bytes': allocated, 'python_peak_bytes': peak}
+
+def load_artifacts(model_dir=None, local_model=None):
+    """
+    Model + scaler serving (MODEL_DIR) atau directory model hasil download MLflow
+
+    Returns:
+        tuple: (model, scaler, info dict, memory dict per komponen)
+    """
+    if local_model:
+        local_model = Path(local_model)
+        model_path = local_model / LOCAL_MODEL_FILE
+        scaler_path = local_model / SCALER_FILE
+        if not scaler_path.exists():
+            scaler_path = MODEL_DIR / SCALER_FILE
+        metadata_path = local_model / 'metadata.json'
+        metadata = json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+        model, model_memory = traced_load(lambda p: load_model_file(p, metadata.get('codec')), model_path)
+        content_id = metadata.get('content_id') or model_content_id(model)
+        info = {'source': str(local_model), 'model_version': content_id[:12],
+                'registry_version': metadata.get('version'), 'codec': metadata.get('codec', 'none')}
+    else:
+        model_dir = Path(model_dir or MODEL_DIR)
+        model_path, scaler_path = model_dir / MODEL_FILE, model_dir / SCALER_FILE
+        model, model_memory = traced_load(joblib.load, model_path)
+        info = {'source': str(model_dir), 'model_version': model_version(model_dir)}
+        numpy_dir = model_dir / NUMPY_ARTIFACT_DIR
+        if numpy_dir.exists():
+            info['numpy_artifact_bytes'] = sum(p.stat().st_size for p in numpy_dir.iterdir() if p.is_file())
+
+    scaler, scaler_memory = traced_load(joblib.load, scaler_path)
+    info.update(model_type=type(model).__name__, n_estimators=len(getattr(model, 'estimators_', [])),
+                n_features_in=int(model.n_features_in_), classes=[int(c) for c in model.classes_])
+    return model, scaler, info, {'model': model_memory, 'scaler': scaler_memory}
+
+def _load_handler_columns():
+    """get_feature_columns() dari handler predict (list yang ditulis manual di handler)"""
+    spec = importlib.util.spec_from_file_location('predict_handler', PREDICT_HANDLER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return list(module.get_feature_columns())
+
+def compare_columns(name, expected, actual):
+    """Satu schema check: nama yang hilang / tambahan dan posisi pertama yang urutannya beda"""
+    expected, actual = list(expected), list(actual)
+    missing = [c for c in expected if c not in actual]
+    extra = [c for c in actual if c not in expected]
+    mismatch = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), None)
+    return {
+        'check': name,
+        'ok': not missing and not extra and mismatch is None and len(expected) == len(actual),
+        'expected': len(expected),
+        'actual': len(actual),
+        'missing': missing,
+        'extra': extra,
+        'first_order_mismatch': None if mismatch is None else
+            {'index': mismatch, 'expected': expected[mismatch], 'actual': actual[mismatch]},
+    }
+
+def schema_checks(model, scaler, include_handler=True):
+    """Scaler, model, utils.scoring dan handler predict harus memakai fitur yang sama, urutan sama"""
+    reference = get_feature_columns()
+    checks = []
+    for name, estimator in (('model', model), ('scaler', scaler)):
+        if hasattr(estimator, 'feature_names_in_'):
+            checks.append(compare_columns(f'{name}.feature_names_in_ vs get_feature_columns()',
+                                          reference, estimator.feature_names_in_))
+        else:
+            n_features = int(getattr(estimator, 'n_features_in_', -1))
+            checks.append({'check': f'{name}.n_features_in_ vs get_feature_columns()',
+                           'ok': n_features == len(reference), 'expected': len(reference), 'actual': n_features})
+    if hasattr(model, 'feature_names_in_') and hasattr(scaler, 'feature_names_in_'):
+        checks.append(compare_columns('scaler vs model feature_names_in_',
+                                      scaler.feature_names_in_, model.feature_names_in_))
+    if include_handler:
+        checks.append(compare_columns('predict handler get_feature_columns() vs utils.scoring',
+                                      reference, _load_handler_columns()))
+    return checks
+
+def tree_structure(model):
+    """Depth, node dan leaf per tree"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        trees.append({'depth': int(tree.max_depth), 'nodes': int(tree.node_count),
+                      'leaves': int((tree.children_left == -1).sum())})
+    return trees
+
+def _summary(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {'min': float(values.min()), 'mean': float(values.mean()),
+            'p50': float(np.percentile(values, 50)), 'max': float(values.max()), 'total': float(values.sum())}
+
+def path_statistics(model, X_scaled, feature_names):
+    """
+    Path length dan split usage di dataset reference dari satu decision_path
+
+    Path length per tree = jumlah node split yang dilewati satu row (= perbandingan).
+    Split usage dinamis = berapa kali setiap fitur dibandingkan, dijumlah untuk semua row.
+    """
+    indicator, node_ptr = model.decision_path(X_scaled)
+    visits = np.asarray(indicator.sum(axis=0)).ravel()
+    n_rows = X_scaled.shape[0]
+
+    static_usage = np.zeros(len(feature_names), dtype=np.int64)
+    dynamic_usage = np.zeros(len(feature_names), dtype=np.int64)
+    path_lengths = []
+    for i, estimator in enumerate(model.estimators_):
+        tree = estimator.tree_
+        split = tree.children_left != -1
+        tree_visits = visits[node_ptr[i]:node_ptr[i + 1]]
+        static_usage += np.bincount(tree.feature[split], minlength=len(feature_names))
+        dynamic_usage += np.bincount(tree.feature[split], weights=tree_visits[split],
+                                     minlength=len(feature_names)).astype(np.int64)
+        path_lengths.append(tree_visits[split].sum() / n_rows)
+
+    # Perbandingan per row = node yang dikunjungi dikurangi satu leaf per tree
+    comparisons_per_row = np.diff(indicator.indptr) - len(model.estimators_)
+    total_dynamic = max(int(dynamic_usage.sum()), 1)
+    usage = {
+        name: {'split_nodes': int(static_usage[j]), 'evaluations': int(dynamic_usage[j]),
+               'evaluation_share': float(dynamic_usage[j] / total_dynamic)}
+        for j, name in enumerate(feature_names)
+    }
+    return {
+        'rows': int(n_rows),
+        'avg_path_length': float(np.mean(path_lengths)),
+        'path_length_per_tree': [round(float(p), 3) for p in path_lengths],
+        'comparisons_per_row': _summary(comparisons_per_row),
+        'split_usage': dict(sorted(usage.items(), key=lambda item: -item[1]['evaluations'])),
+        'unused_features': [name for name, u in usage.items() if u['split_nodes'] == 0],
+    }
+
+def memory_footprint(model, scaler, load_memory):
+    """Byte per komponen: file, array tree (nodes / values), scaler dan alokasi saat load"""
+    node_bytes = value_bytes = 0
+    for estimator in model.estimators_:
+        state = estimator.tree_.__getstate__()
+        node_bytes += state['nodes'].nbytes
+        value_bytes += state['values'].nbytes
+    scaler_bytes = sum(getattr(scaler, name).nbytes for name in ('mean_', 'scale_', 'var_')
+                       if isinstance(getattr(scaler, name, None), np.ndarray))
+    return {
+        'forest_node_arrays': node_bytes,
+        'forest_value_arrays': value_bytes,
+        'scaler_arrays': scaler_bytes,
+        'node_record_bytes': int(model.estimators_[0].tree_.__getstate__()['nodes'].dtype.itemsize),
+        'load': load_memory,
+    }
+
+def inference_cost(model, scaler, X, paths, memory, repeats=3):
+    """Perkiraan biaya per row (dari struktur) dan latency terukur (batch dan single row)"""
+    X_scaled = scaler.transform(X)
+    model.predict_proba(X_scaled[:1])
+    batch_s = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(scaler.transform(X))
+        batch_s.append(time.perf_counter() - start)
+    rows = np.random.default_rng(0).choice(len(X), size=min(SINGLE_ROW_SAMPLES, len(X)), replace=False)
+    single_s = []
+    for i in rows:
+        start = time.perf_counter()
+        model.predict_proba(scaler.transform(X[i:i + 1]))
+        single_s.append(time.perf_counter() - start)
+
+    comparisons = paths['comparisons_per_row']['mean']
+    return {
+        'comparisons_per_row': comparisons,
+        # Setiap node yang dilewati + satu leaf per tree dibaca sebagai satu record node
+        'node_bytes_touched_per_row': (comparisons + len(model.estimators_)) * memory['node_record_bytes'],
+        'batch_us_per_row': min(batch_s) / len(X) * 1e6,
+        'single_row_ms_p50': float(np.percentile(single_s, 50) * 1000),
+        'single_row_ms_p99': float(np.percentile(single_s, 99) * 1000),
+    }
+
+def analyze_model(model_dir=None, local_model=None, dataset_path=None, include_handler=True):
+    """
+    Laporan lengkap (schema, struktur, path, memori, biaya) untuk satu model
+
+    Returns:
+        dict: siap di-dump ke JSON
+    """
+    model, scaler, info, load_memory = load_artifacts(model_dir, local_model)
+    checks = schema_checks(model, scaler, include_handler)
+    trees = tree_structure(model)
+
+    X = encode_frame(load_dataset(dataset_path))
+    paths = path_statistics(model, scaler.transform(X), get_feature_columns())
+    memory = memory_footprint(model, scaler, load_memory)
+    return {
+        'model': info,
+        'schema': {'ok': all(check['ok'] for check in checks), 'checks': checks},
+        'trees': {
+            'depth': _summary([t['depth'] for t in trees]),
+            'nodes': _summary([t['nodes'] for t in trees]),
+            'leaves': _summary([t['leaves'] for t in trees]),
+            'per_tree': trees,
+        },
+        'paths': paths,
+        'memory': memory,
+        'cost': inference_cost(model, scaler, X, paths, memory),
+    }
+
+COMPARE_KEYS = (
+    ('trees.nodes.total', 'total nodes'),
+    ('trees.depth.max', 'max depth'),
+    ('paths.avg_path_length', 'avg path length'),
+    ('cost.comparisons_per_row', 'comparisons/row'),
+    ('memory.forest_node_arrays', 'node bytes'),
+    ('memory.load.model.file_bytes', 'model file bytes'),
+    ('memory.load.model.python_allocated_bytes', 'load py bytes'),
+    ('cost.batch_us_per_row', 'batch us/row'),
+    ('cost.single_row_ms_p50', '1-row ms p50'),
+)
+
+def _lookup(report, dotted):
+    value = report
+    for key in dotted.split('.'):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+def print_report(report, previous=None):
+    info = report['model']
+    print(f"Model {info['model_version']} ({info['model_type']}, {info['n_estimators']} trees, "
+          f"{info['n_features_in']} features) from {info['source']}")
+
+    print("\nSchema checks:")
+    for check in report['schema']['checks']:
+        detail = ''
+        if not check['ok']:
+            detail = f" missing={check.get('missing')} extra={check.get('extra')} " \
+                     f"order={check.get('first_order_mismatch')}"
+        print(f"  {'✅' if check['ok'] else '❌'} {check['check']} ({check['actual']}/{check['expected']}){detail}")
+
+    trees, paths, memory, cost = report['trees'], report['paths'], report['memory'], report['cost']
+    print(f"\nTrees: depth {trees['depth']['min']:.0f}-{trees['depth']['max']:.0f} "
+          f"(mean {trees['depth']['mean']:.1f}), nodes {trees['nodes']['total']:.0f} "
+          f"(mean {trees['nodes']['mean']:.0f}/tree), leaves {trees['leaves']['total']:.0f}")
+    print(f"Paths on {paths['rows']} rows: {paths['avg_path_length']:.2f} comparisons/tree, "
+          f"{paths['comparisons_per_row']['mean']:.0f} comparisons/row")
+    print(f"Memory: nodes {memory['forest_node_arrays'] / 1e6:.2f} MB, values {memory['forest_value_arrays'] / 1e6:.2f} MB, "
+          f"model file {memory['load']['model']['file_bytes'] / 1e6:.2f} MB, "
+          f"load {memory['load']['model']['load_s']:.3f}s (+{memory['load']['model']['python_allocated_bytes'] / 1e6:.2f} MB "
+          f"Python heap, peak {memory['load']['model']['python_peak_bytes'] / 1e6:.2f} MB)")
+    print(f"Cost/row: {cost['node_bytes_touched_per_row'] / 1024:.1f} KB node reads, "
+          f"{cost['batch_us_per_row']:.1f} us batched, {cost['single_row_ms_p50']:.2f} ms single row (p50)")
+
+    print("\nTop split usage (evaluations on dataset):")
+    for name, usage in list(paths['split_usage'].items())[:10]:
+        print(f"  {name:34s} {usage['evaluation_share']:6.1%}  ({usage['split_nodes']} split nodes)")
+    if paths['unused_features']:
+        print(f"Unused features: {', '.join(paths['unused_features'])}")
+
+    if previous is not None:
+        print(f"\nChange vs {previous['model'].get('model_version')}:")
+        for key, label in COMPARE_KEYS:
+            old, new = _lookup(previous, key), _lookup(report, key)
+            if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+                change = f"{(new - old) / old:+.1%}" if old else 'n/a'
+                print(f"  {label:18s} {old:14.2f} -> {new:14.2f}  {change}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema, struktur dan biaya inference model")
+    parser.add_argument('--model-dir', help="Directory model serving (default: api/python/models)")
+    parser.add_argument('--local-model', help="Directory model hasil download MLflow (model.pkl + metadata.json)")
+    parser.add_argument('--dataset', help="Dataset reference untuk path length (default: active_dataset_path())")
+    parser.add_argument('--json', help="Tulis laporan ke file JSON ('-' = stdout)")
+    parser.add_argument('--compare', help="Laporan JSON sebelumnya untuk ditampilkan perubahannya")
+    parser.add_argument('--skip-handler', action='store_true', help="Jangan cek get_feature_columns() handler")
+    parser.add_argument('--list-features', action='store_true', help="Hanya print nama fitur model + scaler")
+    args = parser.parse_args()
+
+    if args.list_features:
+        check_model_features()
+        return 0
+
+    report = analyze_model(args.model_dir, args.local_model, args.dataset, include_handler=not args.skip_handler)
+    if args.json == '-':
+        print(json.dumps(report, indent=2))
+    else:
+        previous = json.loads(Path(args.compare).read_text()) if args.compare else None
+        print_report(report, previous)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✅ Report saved to {args.json}")
+    return 0 if report['schema']['ok'] else 1
+
 if __name__ == "__main__":
-    check_model_features()
\ No newline at end of file
+    sys.exit(main())
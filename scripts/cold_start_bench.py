@@ -0,0 +1,199 @@
+"""
+Cold-start harness untuk Python serverless handler
+
+Setiap run men-spawn interpreter baru yang meng-import handler module dan melayani satu
+request lewat HTTPServer + class `handler`, sama seperti runtime Vercel. Diukur:
+time-to-first-byte (dari spawn), peak RSS, dan breakdown import vs load vs predict
+untuk setiap konfigurasi engine (sklearn, numpy, mmap).
+
+Usage:
+    python scripts/cold_start_bench.py --runs 20 --json cold_start.json
+    python scripts/cold_start_bench.py --configs sklearn mmap --runs 50
+
+Catatan: run berturut-turut memakai page cache OS yang sudah hangat, jadi angka ini
+mendekati "fresh container, warm disk" bukan "fresh VM".
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from bench_utils import percentile
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HANDLER = REPO_ROOT / 'api' / 'python' / 'predict.py'
+CONFIGS = ('sklearn', 'numpy', 'mmap')
+
+SAMPLE_PAYLOAD = {
+    "Age": 30, "DistanceFromHome": 10, "MonthlyIncome": 5000, "YearsAtCompany": 5,
+    "JobLevel": 2, "OverTime": "No", "JobSatisfaction": 3, "WorkLifeBalance": 3,
+    "Department": "Research & Development", "EducationField": "Life Sciences",
+    "MaritalStatus": "Single", "EmployeeNumber": 1, "DailyRate": 800, "Education": 3,
+    "EnvironmentSatisfaction": 3, "HourlyRate": 50, "JobInvolvement": 3,
+    "MonthlyRate": 15000, "NumCompaniesWorked": 1, "PercentSalaryHike": 15,
+    "PerformanceRating": 3, "RelationshipSatisfaction": 3, "StockOptionLevel": 0,
+    "TotalWorkingYears": 10, "TrainingTimesLastYear": 2, "YearsInCurrentRole": 3,
+    "YearsSinceLastPromotion": 1, "YearsWithCurrManager": 2, "BusinessTravel": "Travel_Rarely",
+    "Gender": "Male", "JobRole": "Sales Executive", "EmployeeCount": 1, "StandardHours": 80
+}
+
+# Dijalankan di interpreter baru; meniru cara runtime memanggil `handler`
+CHILD_BOOTSTRAP = r'''
+import importlib.util, json, os, resource, sys, time
+started = time.time()
+t = time.perf_counter()
+spec = importlib.util.spec_from_file_location("serverless_handler", os.environ["COLD_START_HANDLER"])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module_import_s = time.perf_counter() - t
+
+from http.server import HTTPServer
+timing = {}
+
+class TimedHandler(module.handler):
+    def do_POST(self):
+        t = time.perf_counter()
+        super().do_POST()
+        timing["request_s"] = time.perf_counter() - t
+
+    def log_message(self, format, *args):
+        pass
+
+server = HTTPServer(("127.0.0.1", 0), TimedHandler)
+print(server.server_port, flush=True)
+server.handle_request()
+server.server_close()
+
+engine = getattr(module, "_ENGINE", None)
+engine_timings = getattr(engine, "timings", {}) or {}
+ru_maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+peak_rss = ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+print(json.dumps({
+    "interpreter_s": started - float(os.environ["COLD_START_SPAWN_TS"]),
+    "module_import_s": module_import_s,
+    "engine_import_s": engine_timings.get("import_s", 0.0),
+    "load_s": engine_timings.get("load_s", 0.0),
+    "request_s": timing.get("request_s", 0.0),
+    "peak_rss_bytes": peak_rss,
+    "engine": getattr(engine, "kind", None),
+}), flush=True)
+'''
+
+
+def ensure_numpy_artifact(configs):
+    """Export artifact NumPy forest kalau dibutuhkan dan belum ada"""
+    if not any(c in ('numpy', 'mmap') for c in configs):
+        return
+    artifact = REPO_ROOT / 'api' / 'python' / 'models' / 'rf_model_numpy' / 'meta.json'
+    if not artifact.exists():
+        print("Exporting NumPy forest artifact...", file=sys.stderr)
+        subprocess.run([sys.executable, '-m', 'utils.numpy_forest'], cwd=REPO_ROOT, check=True)
+
+
+def run_once(config, handler_path, payload, timeout=120):
+    """Spawn satu interpreter baru dan ukur satu cold request"""
+    env = dict(os.environ)
+    env['ATTRITION_ENGINE'] = config
+    env['COLD_START_HANDLER'] = str(handler_path)
+    spawn_ts = time.time()
+    env['COLD_START_SPAWN_TS'] = repr(spawn_ts)
+
+    proc = subprocess.Popen(
+        [sys.executable, '-c', CHILD_BOOTSTRAP],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, cwd=REPO_ROOT, text=True
+    )
+    try:
+        port = int(proc.stdout.readline())
+        body = json.dumps(payload)
+
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+        conn.request('POST', '/', body=body, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        ttfb_s = time.time() - spawn_ts
+        result = json.loads(response.read().decode('utf-8'))
+        conn.close()
+
+        child = json.loads(proc.stdout.readline())
+        proc.wait(timeout=timeout)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+    # Load engine terjadi di dalam request pertama (lazy), jadi dikurangkan dari request_s
+    predict_s = max(child['request_s'] - child['engine_import_s'] - child['load_s'], 0.0)
+    return {
+        'config': config,
+        'status': response.status,
+        'ml_used': bool(result.get('success')) and 'model_version' in result,
+        'ttfb_s': ttfb_s,
+        'interpreter_s': child['interpreter_s'],
+        'import_s': child['module_import_s'] + child['engine_import_s'],
+        'load_s': child['load_s'],
+        'predict_s': predict_s,
+        'peak_rss_mb': child['peak_rss_bytes'] / (1024 * 1024),
+    }
+
+
+def summarize(runs):
+    metrics = ('ttfb_s', 'interpreter_s', 'import_s', 'load_s', 'predict_s', 'peak_rss_mb')
+    summary = {'runs': len(runs), 'ml_used': all(r['ml_used'] for r in runs)}
+    for metric in metrics:
+        values = [r[metric] for r in runs]
+        summary[metric] = {'p50': percentile(values, 50), 'p99': percentile(values, 99), 'max': max(values)}
+    return summary
+
+
+def print_table(summaries):
+    header = (f"{'config':<9} {'runs':>4} {'ttfb p50':>9} {'ttfb p99':>9} {'import':>8} "
+              f"{'load':>8} {'predict':>8} {'rss p50':>8} {'rss p99':>8}  ml")
+    print(header)
+    print('-' * len(header))
+    for config, s in summaries.items():
+        print(f"{config:<9} {s['runs']:>4} "
+              f"{s['ttfb_s']['p50'] * 1000:>7.0f}ms {s['ttfb_s']['p99'] * 1000:>7.0f}ms "
+              f"{s['import_s']['p50'] * 1000:>6.0f}ms {s['load_s']['p50'] * 1000:>6.0f}ms "
+              f"{s['predict_s']['p50'] * 1000:>6.1f}ms "
+              f"{s['peak_rss_mb']['p50']:>6.1f}MB {s['peak_rss_mb']['p99']:>6.1f}MB  "
+              f"{'yes' if s['ml_used'] else 'NO'}")
+    print("(import/load/predict = p50)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start p50/p99 per engine configuration")
+    parser.add_argument('--configs', nargs='+', choices=CONFIGS, default=list(CONFIGS))
+    parser.add_argument('--runs', type=int, default=10, help="Cold starts per configuration")
+    parser.add_argument('--handler', default=str(DEFAULT_HANDLER), help="Handler module path")
+    parser.add_argument('--payload', help="JSON file dengan request body (default: sample employee)")
+    parser.add_argument('--json', dest='json_path', help="Tulis summary + raw runs ke file JSON")
+    args = parser.parse_args()
+
+    payload = SAMPLE_PAYLOAD
+    if args.payload:
+        with open(args.payload, 'r') as f:
+            payload = json.load(f)
+
+    ensure_numpy_artifact(args.configs)
+
+    runs = {config: [] for config in args.configs}
+    # Round-robin antar konfigurasi supaya noise mesin terbagi rata
+    for i in range(args.runs):
+        for config in args.configs:
+            runs[config].append(run_once(config, args.handler, payload))
+        print(f"Run {i + 1}/{args.runs} selesai", file=sys.stderr)
+
+    summaries = {config: summarize(config_runs) for config, config_runs in runs.items()}
+    print_table(summaries)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'handler': args.handler, 'summary': summaries, 'runs': runs}, f, indent=2)
+        print(f"\nJSON report saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Local load generator untuk Python prediction handler
+
+Menjalankan handler di port lokal (subprocess, ThreadingHTTPServer + class `handler`)
+lalu mengirim request secara concurrent selama durasi tertentu dengan campuran:
+- valid   : satu employee dari CSV dataset
+- missing : employee dengan salah satu required field dihapus (expected 400)
+- batch   : list employee (ukuran dari --batch-sizes)
+
+Output: latency histogram per jenis request, throughput (req/s dan rows/s) dan error rate.
+
+Usage:
+    python scripts/load_test.py --concurrency 8 --duration 30
+    python scripts/load_test.py --mix valid=0.7,missing=0.1,batch=0.2 --batch-sizes 10,100
+    python scripts/load_test.py --url http://127.0.0.1:8000/ --json load_test.json
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+
+from bench_utils import percentile
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HANDLER = REPO_ROOT / 'api' / 'python' / 'predict.py'
+DEFAULT_DATASET = REPO_ROOT / 'public' / 'data' / 'hasil_output_DSP (2).csv'
+REQUIRED_FIELDS = ['Age', 'DistanceFromHome', 'MonthlyIncome', 'YearsAtCompany']
+LABEL_COLUMNS = ('Attrition', 'Final_Attrition', 'Over18')
+EXPECTED_STATUS = {'valid': 200, 'missing': 400, 'batch': 200}
+
+SERVER_BOOTSTRAP = r'''
+import importlib.util, os
+from http.server import ThreadingHTTPServer
+spec = importlib.util.spec_from_file_location("serverless_handler", os.environ["LOAD_TEST_HANDLER"])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+
+class QuietHandler(module.handler):
+    def log_message(self, format, *args):
+        pass
+
+server = ThreadingHTTPServer(("127.0.0.1", int(os.environ.get("LOAD_TEST_PORT", "0"))), QuietHandler)
+server.daemon_threads = True
+print(server.server_port, flush=True)
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    pass
+'''
+
+
+def load_payloads(dataset_path):
+    """Baca CSV dataset menjadi list request body (tanpa kolom label)"""
+    payloads = []
+    with open(dataset_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            payload = {}
+            for key, value in row.items():
+                if key in LABEL_COLUMNS or value == '':
+                    continue
+                try:
+                    number = float(value)
+                    payload[key] = int(number) if number.is_integer() else number
+                except ValueError:
+                    payload[key] = value
+            payloads.append(payload)
+    return payloads
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in EXPECTED_STATUS:
+            raise ValueError(f"Unknown request kind '{kind}', expected one of {list(EXPECTED_STATUS)}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def start_server(handler_path, engine=None):
+    """Start handler di subprocess, return (process, base_url)"""
+    env = dict(os.environ)
+    env['LOAD_TEST_HANDLER'] = str(handler_path)
+    if engine:
+        env['ATTRITION_ENGINE'] = engine
+    proc = subprocess.Popen([sys.executable, '-c', SERVER_BOOTSTRAP], stdout=subprocess.PIPE,
+                            env=env, cwd=REPO_ROOT, text=True)
+    port = int(proc.stdout.readline())
+    return proc, f"http://127.0.0.1:{port}/"
+
+
+class LoadGenerator:
+    """Closed-loop load generator: setiap worker mengirim request berikutnya setelah response diterima"""
+
+    def __init__(self, url, payloads, mix, batch_sizes, seed=None, timeout=30):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path or '/'
+        self.payloads = payloads
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.batch_sizes = batch_sizes
+        self.seed = seed
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.status_counts = defaultdict(Counter)
+        self.errors = Counter()
+        self.rows = 0
+
+    def build_request(self, rng):
+        kind = rng.choices(self.kinds, weights=self.weights)[0]
+        if kind == 'batch':
+            size = rng.choice(self.batch_sizes)
+            return kind, [rng.choice(self.payloads) for _ in range(size)]
+        payload = dict(rng.choice(self.payloads))
+        if kind == 'missing':
+            payload.pop(rng.choice(REQUIRED_FIELDS), None)
+        return kind, payload
+
+    def send(self, body):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request('POST', self.path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def worker(self, worker_id, deadline):
+        rng = random.Random(None if self.seed is None else self.seed + worker_id)
+        while time.perf_counter() < deadline:
+            kind, payload = self.build_request(rng)
+            body = json.dumps(payload)
+            start = time.perf_counter()
+            try:
+                status = self.send(body)
+                error = None if status == EXPECTED_STATUS[kind] else f"{kind}: HTTP {status}"
+            except Exception as e:
+                status = 'exception'
+                error = f"{kind}: {type(e).__name__}"
+            latency = time.perf_counter() - start
+
+            with self.lock:
+                self.latencies[kind].append(latency)
+                self.status_counts[kind][status] += 1
+                if error:
+                    self.errors[error] += 1
+                elif kind != 'missing':
+                    self.rows += len(payload) if kind == 'batch' else 1
+
+    def run(self, concurrency, duration):
+        start = time.perf_counter()
+        deadline = start + duration
+        threads = [threading.Thread(target=self.worker, args=(i, deadline), daemon=True)
+                   for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+
+def histogram(values, buckets_per_decade=4):
+    """Log-spaced latency histogram: list of (upper_bound_ms, count)"""
+    if not values:
+        return []
+    counts = Counter()
+    for value in values:
+        ms = max(value * 1000, 0.01)
+        counts[math.ceil(math.log10(ms) * buckets_per_decade)] += 1
+    return [(round(10 ** (b / buckets_per_decade), 3), counts[b])
+            for b in range(min(counts), max(counts) + 1)]
+
+
+def build_report(generator, elapsed, concurrency):
+    total = sum(len(v) for v in generator.latencies.values())
+    errors = sum(generator.errors.values())
+    report = {
+        'elapsed_s': elapsed,
+        'concurrency': concurrency,
+        'requests': total,
+        'throughput_rps': total / elapsed if elapsed else 0.0,
+        'rows_per_s': generator.rows / elapsed if elapsed else 0.0,
+        'error_rate': errors / total if total else 0.0,
+        'errors': dict(generator.errors),
+        'kinds': {},
+    }
+    for kind, values in generator.latencies.items():
+        report['kinds'][kind] = {
+            'requests': len(values),
+            'status': {str(k): v for k, v in generator.status_counts[kind].items()},
+            'p50_ms': percentile(values, 50) * 1000,
+            'p90_ms': percentile(values, 90) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': max(values) * 1000,
+            'histogram_ms': histogram(values),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n--- Load Test ({report['concurrency']} workers, {report['elapsed_s']:.1f}s) ---")
+    print(f"Requests      : {report['requests']}")
+    print(f"Throughput    : {report['throughput_rps']:.1f} req/s, {report['rows_per_s']:.1f} rows/s")
+    print(f"Error rate    : {report['error_rate'] * 100:.2f}%")
+    for error, count in sorted(report['errors'].items()):
+        print(f"  {error}: {count}")
+
+    for kind, stats in report['kinds'].items():
+        print(f"\n[{kind}] {stats['requests']} requests, status {stats['status']}")
+        print(f"  p50 {stats['p50_ms']:.1f}ms  p90 {stats['p90_ms']:.1f}ms  "
+              f"p99 {stats['p99_ms']:.1f}ms  max {stats['max_ms']:.1f}ms")
+        peak = max(count for _, count in stats['histogram_ms'])
+        for upper, count in stats['histogram_ms']:
+            bar = '#' * max(1 if count else 0, int(40 * count / peak))
+            print(f"  <= {upper:>9.2f}ms {count:>7} {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load generator for the prediction handler")
+    parser.add_argument('--url', help="Target server yang sudah jalan (default: start handler lokal)")
+    parser.add_argument('--handler', default=str(DEFAULT_HANDLER), help="Handler module path")
+    parser.add_argument('--engine', help="ATTRITION_ENGINE untuk handler lokal (sklearn/numpy/mmap)")
+    parser.add_argument('--dataset', default=str(DEFAULT_DATASET), help="CSV sumber payload")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0, help="Durasi dalam detik")
+    parser.add_argument('--mix', default='valid=0.8,missing=0.1,batch=0.1',
+                        help="Bobot jenis request, contoh: valid=0.8,missing=0.1,batch=0.1")
+    parser.add_argument('--batch-sizes', default='10,50', help="Ukuran batch, dipisah koma")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-warmup', action='store_true', help="Jangan kirim request warmup (ikut ukur cold load)")
+    parser.add_argument('--json', dest='json_path', help="Tulis report ke file JSON")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.dataset)
+    mix = parse_mix(args.mix)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_server(args.handler, args.engine)
+        print(f"Handler started at {url}", file=sys.stderr)
+
+    try:
+        generator = LoadGenerator(url, payloads, mix, batch_sizes, seed=args.seed)
+        if not args.no_warmup:
+            generator.send(json.dumps(payloads[0]))
+
+        elapsed = generator.run(args.concurrency, args.duration)
+        report = build_report(generator, elapsed, args.concurrency)
+    finally:
+        if proc is not None:
+            # SIGINT supaya atexit handler di server (mis. flush prediction log) tetap jalan
+            proc.send_signal(signal.SIGINT)
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    report['url'] = url
+    report['mix'] = mix
+    report['batch_sizes'] = batch_sizes
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nJSON report saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
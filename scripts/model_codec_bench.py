@@ -0,0 +1,107 @@
+"""
+Benchmark codec artifact model: ukuran file vs waktu decompress + unpickle
+
+Model yang diukur adalah model asli (default: rf_model.pkl di api/python/models, atau
+model.pkl di directory model hasil download MLflow). Untuk setiap codec yang tersedia
+(none, zlib, lzma, dan lz4 / zstd kalau package-nya terinstall) diukur ukuran file, waktu
+tulis dan waktu load pada level default dan level arsip. Dipilih dua codec:
+- serving: load tercepat (yang terkecil di antara yang load-nya dalam 10% dari tercepat)
+- archive: file terkecil (dipakai cleanup_old_models untuk versi lama)
+
+Dengan --apply, model.pkl di --model-dir ditulis ulang dengan codec serving terpilih dan
+pilihan + hasil benchmark dicatat di metadata.json (dan manifest kalau directory-nya ada
+di LOCAL_MODELS_DIR).
+
+Usage:
+    python scripts/model_codec_bench.py
+    python scripts/model_codec_bench.py --model-dir models/attrition_model_v3_ab12cd34ef56 --apply
+    python scripts/model_codec_bench.py --codecs none zlib --repeats 5 --json codecs.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from utils.model_store import (INDEX_DIR, MODEL_FILE, ModelManifest, available_codecs, benchmark_codecs,
+                               choose_codec, load_model_dir, load_model_file, recompress_model_dir)
+from utils.scoring import MODEL_DIR
+from utils.scoring import MODEL_FILE as SERVING_MODEL_FILE
+
+
+def format_results(results, baseline_bytes, serving, archive):
+    header = f"{'codec':6s} {'level':>5s} {'size MB':>8s} {'ratio':>6s} {'dump s':>7s} {'load ms':>8s}"
+    lines = [header, '-' * len(header)]
+    for r in results:
+        marks = [name for name, choice in (('serving', serving), ('archive', archive)) if r is choice]
+        level = '-' if r['codec_level'] is None else str(r['codec_level'])
+        lines.append(f"{r['codec']:6s} {level:>5s} {r['bytes'] / 1e6:8.2f} {baseline_bytes / r['bytes']:6.2f} "
+                     f"{r['dump_s']:7.3f} {r['load_s'] * 1000:8.1f}  {' '.join(marks)}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark codec model artifact (ukuran vs load time)")
+    parser.add_argument('--model-dir', help="Directory model hasil download MLflow (default: model serving)")
+    parser.add_argument('--codecs', nargs='+', choices=available_codecs(), help="Codec yang diukur")
+    parser.add_argument('--repeats', type=int, default=3, help="Load per codec (diambil tercepat)")
+    parser.add_argument('--apply', action='store_true',
+                        help="Tulis ulang model.pkl di --model-dir dengan codec serving terpilih")
+    parser.add_argument('--json', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    if args.model_dir:
+        model, metadata = load_model_dir(args.model_dir)
+        source = Path(args.model_dir) / MODEL_FILE
+    else:
+        if args.apply:
+            parser.error("--apply needs --model-dir")
+        source = MODEL_DIR / SERVING_MODEL_FILE
+        model, metadata = load_model_file(source), {}
+
+    print(f"Benchmarking {source} ({source.stat().st_size / 1e6:.2f} MB, "
+          f"codec {metadata.get('codec', 'none')}) with {', '.join(args.codecs or available_codecs())}")
+    results = benchmark_codecs(model, args.codecs, repeats=args.repeats)
+    baseline = next((r['bytes'] for r in results if r['codec'] == 'none'), source.stat().st_size)
+    serving = choose_codec(results, 'serving')
+    archive = choose_codec(results, 'archive')
+    print(format_results(results, baseline, serving, archive))
+
+    summary = {
+        'source': str(source),
+        'benchmarked_at': datetime.now().isoformat(),
+        'serving': {'codec': serving['codec'], 'codec_level': serving['codec_level']},
+        'archive': {'codec': archive['codec'], 'codec_level': archive['codec_level']},
+        'results': results,
+    }
+
+    if args.apply:
+        model_dir = Path(args.model_dir)
+        start = time.perf_counter()
+        extra = {'codec_benchmark': summary}
+        if (model_dir.parent / INDEX_DIR).exists():
+            manifest = ModelManifest(model_dir.parent)
+            with manifest.transaction() as entries:
+                metadata = recompress_model_dir(model_dir, serving['codec'], serving['codec_level'],
+                                                extra_metadata=extra)
+                entries[model_dir.name] = dict(metadata, local_directory=str(model_dir))
+        else:
+            metadata = recompress_model_dir(model_dir, serving['codec'], serving['codec_level'],
+                                            extra_metadata=extra)
+        print(f"✅ {model_dir} now uses codec {metadata['codec']} "
+              f"({metadata.get('model_bytes', (model_dir / MODEL_FILE).stat().st_size) / 1e6:.2f} MB, "
+              f"{time.perf_counter() - start:.2f}s)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"✅ Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
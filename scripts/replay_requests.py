@@ -0,0 +1,246 @@
+"""
+Replay prediction log sebagai performance dan regression benchmark
+
+Membaca JSONL prediction log (format utils/prediction_log.py, plain atau .gz), mengirim
+setiap request yang dulu sukses (status 200) ke scoring path handler saat ini (in-process,
+tanpa HTTP), lalu:
+- mengukur throughput dan latency per request
+- membandingkan output baru dengan response yang tercatat: perubahan prediction,
+  risk_level dan probabilitas will_leave (di atas --tolerance)
+
+Request yang dulu memilih model (header X-Model-* / field body "model") di-replay ke model
+yang sama. Drift monitor dan shadow scorer dimatikan selama replay, jadi latency hanya
+mengukur scoring path dan replay tidak mengubah state monitoring.
+
+Usage:
+    python scripts/replay_requests.py logs/predictions.jsonl
+    python scripts/replay_requests.py logs/predictions.jsonl* --timing original --speed 2
+    python scripts/replay_requests.py logs/predictions.jsonl --engine numpy --json replay.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from bench_utils import percentile
+from utils.prediction_log import read_prediction_log
+
+DEFAULT_HANDLER = REPO_ROOT / 'api' / 'python' / 'predict.py'
+
+
+def load_handler_module(handler_path):
+    spec = importlib.util.spec_from_file_location("serverless_handler", handler_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_records(paths):
+    """Gabungkan semua log, urutkan berdasarkan timestamp"""
+    records = []
+    for path in paths:
+        records.extend(read_prediction_log(path))
+    records.sort(key=lambda r: r.get('ts', 0))
+    return records
+
+
+def record_selector(module, record):
+    """Pilihan model request yang tercatat (log lama: hanya dari field body "model")"""
+    if 'model_selector' in record:
+        return record['model_selector']
+    return module.model_selector(None, record['request'])
+
+
+def score(module, request, selector=None):
+    """Jalankan scoring path handler untuk satu request (single atau batch)"""
+    if isinstance(request, list):
+        results, error = module.try_ml_batch_prediction(request, selector)
+        if results is None:
+            results = [module.simple_rule_based_prediction(r) for r in request]
+        return results
+    result, error = module.try_ml_prediction(request, selector)
+    return [result if result else module.simple_rule_based_prediction(request)]
+
+
+def compare(recorded, replayed, tolerance):
+    """Bandingkan satu prediction lama vs baru, return list nama perubahan"""
+    changes = []
+    if recorded.get('prediction') != replayed.get('prediction'):
+        changes.append('prediction')
+    if recorded.get('risk_level') != replayed.get('risk_level'):
+        changes.append('risk_level')
+    old_p = (recorded.get('probability') or {}).get('will_leave')
+    new_p = (replayed.get('probability') or {}).get('will_leave')
+    if old_p is None or new_p is None or abs(old_p - new_p) > tolerance:
+        changes.append('probability')
+    return changes
+
+
+def replay(module, records, timing='fast', speed=1.0, tolerance=1e-9, max_examples=20):
+    latencies = []
+    skipped = Counter()
+    diffs = Counter()
+    version_pairs = Counter()
+    deltas = []
+    examples = []
+    rows = 0
+    changed_rows = 0
+    schedule_lag = []
+
+    replayable = [r for r in records if r.get('status', 200) == 200 and isinstance(r.get('request'), (dict, list))]
+    skipped['non_200'] = len(records) - len(replayable)
+
+    start = time.perf_counter()
+    first_ts = replayable[0].get('ts', 0) if replayable else 0
+    for index, record in enumerate(replayable):
+        if timing == 'original':
+            due = start + (record.get('ts', first_ts) - first_ts) / speed
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            schedule_lag.append(max(time.perf_counter() - due, 0.0))
+
+        request = record['request']
+        try:
+            selector = record_selector(module, record)
+            t = time.perf_counter()
+            replayed = score(module, request, selector)
+        except module.ModelSelectionError:
+            # Model yang dulu dipilih tidak tersedia lagi di sini; bukan regression model default
+            skipped['model_unavailable'] += 1
+            continue
+        latencies.append(time.perf_counter() - t)
+
+        response = record.get('response') or {}
+        recorded = response.get('predictions') if isinstance(request, list) else [response]
+        if not recorded or len(recorded) != len(replayed):
+            skipped['malformed_response'] += 1
+            continue
+
+        for old, new in zip(recorded, replayed):
+            rows += 1
+            version_pairs[(old.get('model_version', record.get('model_version')), new.get('model_version'))] += 1
+            old_p = (old.get('probability') or {}).get('will_leave')
+            new_p = (new.get('probability') or {}).get('will_leave')
+            if old_p is not None and new_p is not None:
+                deltas.append(abs(old_p - new_p))
+
+            changes = compare(old, new, tolerance)
+            changed_rows += bool(changes)
+            for change in changes:
+                diffs[change] += 1
+            if changes and len(examples) < max_examples:
+                examples.append({
+                    'record_index': index,
+                    'ts': record.get('ts'),
+                    'changes': changes,
+                    'recorded': {k: old.get(k) for k in ('prediction', 'risk_level', 'probability', 'model_version')},
+                    'replayed': {k: new.get(k) for k in ('prediction', 'risk_level', 'probability', 'model_version')},
+                })
+
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'rows': rows,
+        'elapsed_s': elapsed,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'rows_per_s': rows / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'p50': (percentile(latencies, 50) or 0) * 1000,
+            'p90': (percentile(latencies, 90) or 0) * 1000,
+            'p99': (percentile(latencies, 99) or 0) * 1000,
+            'max': max(latencies, default=0) * 1000,
+        },
+        'schedule_lag_ms_p99': (percentile(schedule_lag, 99) or 0) * 1000 if schedule_lag else None,
+        'skipped': dict(skipped),
+        'diffs': dict(diffs),
+        'changed_rows': changed_rows,
+        'probability_delta': {
+            'mean': sum(deltas) / len(deltas) if deltas else 0.0,
+            'max': max(deltas, default=0.0),
+        },
+        'model_versions': [{'recorded': old, 'replayed': new, 'rows': count}
+                           for (old, new), count in version_pairs.items()],
+        'examples': examples,
+    }
+
+
+def print_report(report, tolerance):
+    print("\n--- Replay Report ---")
+    print(f"Requests replayed : {report['requests']} ({report['rows']} rows) in {report['elapsed_s']:.2f}s")
+    print(f"Throughput        : {report['throughput_rps']:.1f} req/s, {report['rows_per_s']:.1f} rows/s")
+    lat = report['latency_ms']
+    print(f"Latency           : p50 {lat['p50']:.2f}ms  p90 {lat['p90']:.2f}ms  "
+          f"p99 {lat['p99']:.2f}ms  max {lat['max']:.2f}ms")
+    if report['schedule_lag_ms_p99'] is not None:
+        print(f"Schedule lag p99  : {report['schedule_lag_ms_p99']:.2f}ms")
+    if any(report['skipped'].values()):
+        print(f"Skipped           : {report['skipped']}")
+    for pair in report['model_versions']:
+        print(f"Model version     : {pair['recorded']} -> {pair['replayed']} ({pair['rows']} rows)")
+
+    print(f"\nBehavior changes (tolerance {tolerance:g}): {report['changed_rows']} of {report['rows']} rows")
+    for name in ('prediction', 'risk_level', 'probability'):
+        print(f"  {name:<12}: {report['diffs'].get(name, 0)}")
+    delta = report['probability_delta']
+    print(f"  |Δ will_leave| mean {delta['mean']:.6f}, max {delta['max']:.6f}")
+
+    for example in report['examples'][:5]:
+        print(f"  #{example['record_index']} {example['changes']}: "
+              f"{example['recorded']['risk_level']} {example['recorded']['probability']} -> "
+              f"{example['replayed']['risk_level']} {example['replayed']['probability']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged prediction requests against the current engine")
+    parser.add_argument('logs', nargs='+', help="Prediction log JSONL file(s), .gz didukung")
+    parser.add_argument('--timing', choices=('fast', 'original'), default='fast',
+                        help="fast = secepat mungkin, original = ikuti jarak timestamp asli")
+    parser.add_argument('--speed', type=float, default=1.0, help="Pengali kecepatan untuk --timing original")
+    parser.add_argument('--engine', help="ATTRITION_ENGINE (sklearn/numpy/mmap)")
+    parser.add_argument('--handler', default=str(DEFAULT_HANDLER), help="Handler module path")
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="Toleransi selisih will_leave")
+    parser.add_argument('--limit', type=int, help="Maksimum jumlah record yang di-replay")
+    parser.add_argument('--json', dest='json_path', help="Tulis report ke file JSON")
+    parser.add_argument('--fail-on-diff', action='store_true',
+                        help="Exit code 1 kalau ada perubahan prediction/risk_level")
+    args = parser.parse_args()
+
+    if args.engine:
+        os.environ['ATTRITION_ENGINE'] = args.engine
+    # Replay tidak boleh menulis ke prediction log yang sedang dibaca, mengubah drift monitor
+    # atau mengirim request ke shadow model (dan side effect itu tidak ikut diukur)
+    os.environ.pop('PREDICTION_LOG_PATH', None)
+    os.environ['ATTRITION_DRIFT_MONITOR'] = '0'
+    os.environ.pop('ATTRITION_SHADOW_MODEL', None)
+    os.environ.pop('ATTRITION_SHADOW_STAGE', None)
+
+    module = load_handler_module(args.handler)
+    records = load_records(args.logs)
+    if args.limit:
+        records = records[:args.limit]
+    print(f"Loaded {len(records)} records from {len(args.logs)} file(s)", file=sys.stderr)
+
+    module.get_engine()  # load di luar pengukuran latency
+    report = replay(module, records, timing=args.timing, speed=args.speed, tolerance=args.tolerance)
+    print_report(report, args.tolerance)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nJSON report saved to: {args.json_path}")
+
+    if args.fail_on_diff and (report['diffs'].get('prediction') or report['diffs'].get('risk_level')):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Test validasi delta ingest (utils/ingest.py validate_records)
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils.ingest import IngestError, validate_records
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'EmployeeId': [1, 2],
+        'Age': [30, 41],
+        'MonthlyIncome': [2500.0, 6100.0],
+        'OverTime': ['Yes', 'No'],
+    })
+
+
+def test_nan_employee_id_is_rejected(df):
+    records = json.loads('[{"EmployeeId": NaN, "Age": 30}]')
+    with pytest.raises(IngestError, match="integer EmployeeId"):
+        validate_records(records, df)
+
+
+def test_infinite_integer_field_is_rejected(df):
+    records = json.loads('[{"EmployeeId": 1, "Age": Infinity}]')
+    with pytest.raises(IngestError, match="Age must be a finite number"):
+        validate_records(records, df)
+
+
+def test_non_finite_float_field_is_rejected(df):
+    records = json.loads('[{"EmployeeId": 1, "MonthlyIncome": -Infinity}]')
+    with pytest.raises(IngestError, match="MonthlyIncome must be a finite number"):
+        validate_records(records, df)
+
+
+def test_partial_update_of_existing_row(df):
+    assert validate_records([{"EmployeeId": 2, "Age": 42, "OverTime": None}], df) == {2: {'EmployeeId': 2, 'Age': 42}}
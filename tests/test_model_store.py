@@ -0,0 +1,52 @@
+"""
+Test deteksi manifest stale (utils/model_store.py ModelManifest)
+"""
+
+import json
+
+from utils.model_store import METADATA_FILE, ModelManifest, dump_model, recompress_model_dir
+
+
+def write_model_dir(models_dir, name, **metadata):
+    model_dir = models_dir / name
+    model_dir.mkdir(parents=True)
+    metadata = dict(metadata, **dump_model({'weights': [0.25, 0.5, 0.25]}, model_dir / 'model.pkl'))
+    (model_dir / METADATA_FILE).write_text(json.dumps(metadata))
+    return model_dir
+
+
+def test_manifest_picks_up_metadata_edit_in_version_dir(tmp_path):
+    model_dir = write_model_dir(tmp_path, 'attrition_model_v3', model_name='attrition_model', version='3',
+                                stage='Staging')
+    manifest = ModelManifest(tmp_path)
+    assert manifest.latest('attrition_model', stage='Production') is None
+
+    # Edit manual di dalam directory versi tidak mengubah mtime directory models
+    metadata = json.loads((model_dir / METADATA_FILE).read_text())
+    (model_dir / METADATA_FILE).write_text(json.dumps(dict(metadata, stage='Production')))
+
+    assert manifest.latest('attrition_model', stage='Production')['version'] == '3'
+    # Manifest proses lain (tanpa cache di memori) juga melihat perubahan yang sama
+    assert ModelManifest(tmp_path).latest('attrition_model', stage='Production')['version'] == '3'
+
+
+def test_manifest_picks_up_metadata_only_recompress(tmp_path):
+    model_dir = write_model_dir(tmp_path, 'attrition_model_v3', model_name='attrition_model', version='3')
+    manifest = ModelManifest(tmp_path)
+    assert 'benchmark' not in manifest.latest('attrition_model')
+
+    recompress_model_dir(model_dir, 'none', extra_metadata={'benchmark': {'load_s': 0.01}})
+
+    assert manifest.latest('attrition_model')['benchmark'] == {'load_s': 0.01}
+
+
+def test_manifest_is_reused_while_unchanged(tmp_path, monkeypatch):
+    write_model_dir(tmp_path, 'attrition_model_v3', model_name='attrition_model', version='3')
+    manifest = ModelManifest(tmp_path)
+    manifest.entries()
+
+    rebuilds = []
+    monkeypatch.setattr(manifest, 'rebuild', lambda: rebuilds.append(1))
+    assert manifest.latest('attrition_model')['version'] == '3'
+    assert ModelManifest(tmp_path).entries().keys() == {'attrition_model_v3'}
+    assert rebuilds == []
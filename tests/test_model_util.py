@@ -0,0 +1,291 @@
+"""
+Test download cache dan cache registry (utils/model_util.py) dengan registry palsu yang
+di-inject lewat constructor dan tracking URI file: (tanpa DagsHub / jaringan)
+"""
+
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from utils import model_util
+from utils.model_store import MODEL_FILE, STAGING_DIR, file_checksum, load_model_dir
+from utils.model_util import MLflowModelManager, TTLCache
+
+MODEL_NAMES = ('attrition_model', 'attrition_model_gbm', 'attrition_model_lr')
+
+
+def model_version(name, version):
+    return SimpleNamespace(name=name, version=str(version), current_stage='Production' if version == 2 else 'None',
+                           run_id=f"run{version}", source=f"runs:/run{version}/model", status='READY',
+                           creation_timestamp=1, last_updated_timestamp=1, description=None)
+
+
+class FakeClient:
+    """Stand-in MlflowClient: tiga model dengan versi 1-3; versi 2 di Production"""
+
+    def __init__(self, barrier=None):
+        self.calls = []
+        self.barrier = barrier
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+        if self.barrier is not None:
+            # Hanya lolos kalau semua lookup berjalan bersamaan
+            self.barrier.wait()
+
+    def search_registered_models(self):
+        self._record('search_registered_models')
+        return [SimpleNamespace(name=name, description=None, creation_timestamp=1, last_updated_timestamp=2, tags={})
+                for name in MODEL_NAMES]
+
+    def search_model_versions(self, filter_string):
+        name = filter_string.split("'")[1]
+        self._record('search_model_versions', name)
+        return [model_version(name, version) for version in (1, 2, 3)]
+
+    def get_model_version(self, name, version):
+        self._record('get_model_version', name, str(version))
+        if int(version) > 3:
+            raise LookupError(f"{name} v{version} not found")
+        return model_version(name, int(version))
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Ganti mlflow.sklearn.load_model; list berisi URI setiap download"""
+    calls = []
+
+    def load_model(uri):
+        calls.append(uri)
+        return {'uri': uri, 'weights': [0.25, 0.5, 0.25]}
+
+    monkeypatch.setattr(model_util.mlflow.sklearn, 'load_model', load_model)
+    return calls
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return MLflowModelManager(mlflow_tracking_uri=f"file:{tmp_path / 'mlruns'}",
+                              local_models_dir=tmp_path / 'models', client=FakeClient())
+
+
+def test_cache_hit_skips_download(manager, loads):
+    first = manager.download_model('attrition_model', version=3)
+    second = manager.download_model('attrition_model', version=3)
+
+    assert first['cache_hit'] is False
+    assert second['cache_hit'] is True
+    assert second['local_path'] == first['local_path']
+    assert loads == ['models:/attrition_model/3']
+
+
+def test_integrity_failure_triggers_redownload(manager, loads):
+    first = manager.download_model('attrition_model', version=3)
+    model_file = Path(first['local_path']) / MODEL_FILE
+    model_file.write_bytes(b'corrupted')
+
+    second = manager.download_model('attrition_model', version=3)
+
+    assert second['cache_hit'] is False
+    assert len(loads) == 2
+    assert second['local_path'] == first['local_path']
+    assert file_checksum(model_file) == second['checksum']
+    model, _ = load_model_dir(first['local_path'])
+    assert model['uri'] == 'models:/attrition_model/3'
+
+
+def test_cache_key_is_registry_identity(manager, loads, tmp_path):
+    first = manager.download_model('attrition_model', version=3)
+
+    # Proses lain (manager baru) dengan registry yang sama memakai directory yang sama
+    other = MLflowModelManager(mlflow_tracking_uri=f"file:{tmp_path / 'mlruns'}",
+                               local_models_dir=manager.local_models_dir, client=FakeClient())
+    second = other.download_model('attrition_model', version=3)
+
+    assert second['cache_hit'] is True
+    assert second['cache_key'] == first['cache_key']
+    assert other.download_model('attrition_model', version=2)['cache_key'] != first['cache_key']
+    assert len(loads) == 2
+
+
+def test_concurrent_downloads_publish_one_directory(manager, monkeypatch):
+    workers = 4
+    barrier = threading.Barrier(workers, timeout=10)
+
+    def load_model(uri):
+        # Semua thread sudah lewat cache check sebelum ada yang publish
+        barrier.wait()
+        return {'uri': uri, 'weights': [0.25, 0.5, 0.25]}
+
+    monkeypatch.setattr(model_util.mlflow.sklearn, 'load_model', load_model)
+    results, errors = [], []
+
+    def download():
+        try:
+            results.append(manager.download_model('attrition_model', version=3))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=download) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len({result['local_path'] for result in results}) == 1
+    local_path = results[0]['local_path']
+    model, metadata = load_model_dir(local_path)
+    assert model['uri'] == 'models:/attrition_model/3'
+    assert metadata['checksum'] == file_checksum(Path(local_path) / MODEL_FILE)
+
+    entries = manager.manifest.entries()
+    assert [entry['local_directory'] for entry in entries.values()] == [local_path]
+    staging = manager.local_models_dir / STAGING_DIR
+    assert not staging.exists() or list(staging.iterdir()) == []
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(model_util.time, 'monotonic', clock)
+    return clock
+
+
+def test_ttl_cache_expires(clock):
+    cache = TTLCache(ttl=60)
+    loads = []
+
+    def loader():
+        loads.append(clock.now)
+        return {'loaded_at': clock.now}
+
+    assert cache.get_or_load(('versions', 'm'), loader) == {'loaded_at': 1000.0}
+    clock.now += 59
+    assert cache.get_or_load(('versions', 'm'), loader) == {'loaded_at': 1000.0}
+    clock.now += 2
+    assert cache.get_or_load(('versions', 'm'), loader) == {'loaded_at': 1061.0}
+    assert len(loads) == 2
+
+
+def test_ttl_cache_returns_copies():
+    cache = TTLCache(ttl=60)
+    value = cache.get_or_load(('versions', 'm'), lambda: [{'version': '1'}])
+    value[0]['version'] = 'changed'
+    assert cache.get_or_load(('versions', 'm'), lambda: []) == [{'version': '1'}]
+
+
+def test_ttl_cache_invalidate_model():
+    cache = TTLCache(ttl=60)
+    keys = [('registered_models',), ('versions', 'a'), ('version', 'a', '1'), ('versions', 'b')]
+    for key in keys:
+        cache.get_or_load(key, lambda: 'cached')
+
+    cache.invalidate('a')
+    reloaded = [key for key in keys if cache.get_or_load(key, lambda: 'reloaded') == 'reloaded']
+    assert reloaded == [('registered_models',), ('versions', 'a'), ('version', 'a', '1')]
+
+    cache.invalidate()
+    assert cache.get_or_load(('versions', 'b'), lambda: 'reloaded') == 'reloaded'
+
+
+def test_ttl_cache_single_flight():
+    cache = TTLCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+    loads, results = [], []
+
+    def loader():
+        loads.append(1)
+        started.set()
+        release.wait(10)
+        return 'value'
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(('k',), loader)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait(10)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [1]
+    assert results == ['value'] * 8
+
+
+def test_ttl_cache_failed_load_is_not_cached():
+    cache = TTLCache(ttl=60)
+
+    def failing():
+        raise ConnectionError("registry unavailable")
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_load(('k',), failing)
+    assert cache.get_or_load(('k',), lambda: 'value') == 'value'
+
+
+def registry_manager(tmp_path, client):
+    return MLflowModelManager(mlflow_tracking_uri=f"file:{tmp_path / 'mlruns'}",
+                              local_models_dir=tmp_path / 'models', client=client)
+
+
+def test_versions_for_models_fetches_concurrently(tmp_path):
+    client = FakeClient(barrier=threading.Barrier(len(MODEL_NAMES), timeout=10))
+    manager = registry_manager(tmp_path, client)
+
+    versions = manager.get_versions_for_models(list(MODEL_NAMES))
+
+    assert list(versions) == list(MODEL_NAMES)
+    assert all([v['version'] for v in versions[name]] == ['3', '2', '1'] for name in MODEL_NAMES)
+
+    # Hit cache: tidak ada query ke registry lagi
+    client.barrier = None
+    assert manager.get_versions_for_models(list(MODEL_NAMES)) == versions
+    assert len(client.calls) == len(MODEL_NAMES)
+
+
+def test_versions_for_models_expire_and_invalidate(tmp_path, clock):
+    client = FakeClient()
+    manager = registry_manager(tmp_path, client)
+
+    manager.get_versions_for_models()
+    assert len(client.calls) == 1 + len(MODEL_NAMES)
+
+    manager.invalidate_registry_cache('attrition_model')
+    manager.get_versions_for_models()
+    # Listing semua model + versi attrition_model di-fetch ulang, model lain dari cache
+    assert client.calls[-2:] == [('search_registered_models',), ('search_model_versions', 'attrition_model')]
+
+    clock.now += model_util.REGISTRY_CACHE_TTL + 1
+    manager.get_versions_for_models()
+    assert len(client.calls) == 2 * (1 + len(MODEL_NAMES)) + 2
+
+
+def test_model_version_details_concurrent_and_cached(tmp_path):
+    client = FakeClient(barrier=threading.Barrier(3, timeout=10))
+    manager = registry_manager(tmp_path, client)
+
+    details = manager.get_model_version_details('attrition_model', [1, 2, 3])
+
+    assert {version: info['stage'] for version, info in details.items()} == {'1': 'None', '2': 'Production', '3': 'None'}
+    client.barrier = None
+    assert manager.get_model_version_details('attrition_model', ['1', '2', '3']) == details
+    assert len(client.calls) == 3
+
+    # Versi yang tidak ada -> None, dan tidak di-cache
+    assert manager.get_model_version_details('attrition_model', [4]) == {'4': None}
+    assert manager.get_model_version_details('attrition_model', [4]) == {'4': None}
+    assert len(client.calls) == 5
@@ -0,0 +1,188 @@
+"""
+Aggregate analytics dashboard yang bisa di-update incremental
+
+Menyimpan counter dan sum (bukan hasil rata-rata) sehingga row yang berubah cukup dikurangi
+kontribusi lamanya dan ditambah kontribusi barunya. summary() mengembalikan bentuk response
+yang sama dengan pages/api/analytics.js.
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.scoring import CACHE_DIR, active_dataset_path, dataset_fingerprint, load_dataset
+
+AGGREGATES_FILE = 'analytics_aggregates.json'
+
+COUNTERS = ('total', 'attrition', 'age_sum', 'age_count', 'tenure_sum', 'tenure_count',
+            'at_risk', 'overtime_total', 'overtime_attrition')
+
+
+def _numeric(df, name):
+    return df[name].to_numpy(dtype=np.float64) if name in df.columns else np.full(len(df), np.nan)
+
+
+def row_contributions(df):
+    """Kontribusi setiap row ke counter global dan per department (aturan sama dengan analytics.js)"""
+    attrition = (_numeric(df, 'Final_Attrition') == 1) | (_numeric(df, 'Attrition') == 1)
+    overtime = (df['OverTime'] == 'Yes').to_numpy()
+    age = _numeric(df, 'Age')
+    tenure = _numeric(df, 'YearsAtCompany')
+    # analytics.js: parseFloat(x || 0), jadi nilai kosong dihitung 0 (<= 2)
+    low_satisfaction = np.zeros(len(df), dtype=bool)
+    for name in ('EnvironmentSatisfaction', 'JobSatisfaction', 'WorkLifeBalance'):
+        low_satisfaction |= np.nan_to_num(_numeric(df, name), nan=0.0) <= 2
+
+    counters = {
+        'total': float(len(df)),
+        'attrition': float(attrition.sum()),
+        'age_sum': float(np.nansum(age)),
+        'age_count': float((~np.isnan(age)).sum()),
+        'tenure_sum': float(np.nansum(tenure)),
+        'tenure_count': float((~np.isnan(tenure)).sum()),
+        'at_risk': float((low_satisfaction & overtime).sum()),
+        'overtime_total': float(overtime.sum()),
+        'overtime_attrition': float((overtime & attrition).sum()),
+    }
+    departments = {}
+    for department, group in zip(df['Department'].fillna('Unknown'), attrition):
+        entry = departments.setdefault(str(department), {'total': 0, 'attrition': 0})
+        entry['total'] += 1
+        entry['attrition'] += int(group)
+    return counters, departments
+
+
+class AnalyticsAggregates:
+    def __init__(self, counters, departments, meta):
+        self.counters = counters
+        self.departments = departments
+        self.meta = meta
+
+    @classmethod
+    def build(cls, df, dataset_fp):
+        counters, departments = row_contributions(df)
+        return cls(counters, departments, {'dataset_fingerprint': dataset_fp, 'rows': int(len(df))})
+
+    def apply(self, old_rows, new_rows, dataset_fp):
+        """
+        Update incremental: kurangi kontribusi old_rows, tambah kontribusi new_rows
+
+        Args:
+            old_rows (DataFrame): Versi lama row yang di-update (kosong untuk insert)
+            new_rows (DataFrame): Versi baru row yang di-update + row baru
+
+        Returns:
+            AnalyticsAggregates: object baru (object lama tetap konsisten untuk reader lain)
+        """
+        counters = dict(self.counters)
+        departments = {name: dict(entry) for name, entry in self.departments.items()}
+        for rows, sign in ((old_rows, -1), (new_rows, 1)):
+            if rows is None or len(rows) == 0:
+                continue
+            delta_counters, delta_departments = row_contributions(rows)
+            for name in COUNTERS:
+                counters[name] += sign * delta_counters[name]
+            for name, entry in delta_departments.items():
+                target = departments.setdefault(name, {'total': 0, 'attrition': 0})
+                target['total'] += sign * entry['total']
+                target['attrition'] += sign * entry['attrition']
+        departments = {name: entry for name, entry in departments.items() if entry['total'] > 0}
+        meta = dict(self.meta, dataset_fingerprint=dataset_fp, rows=int(counters['total']))
+        return AnalyticsAggregates(counters, departments, meta)
+
+    def is_current(self, current_dataset_fingerprint):
+        return self.meta.get('dataset_fingerprint') == current_dataset_fingerprint
+
+    def summary(self):
+        """Response dengan bentuk yang sama dengan /api/analytics"""
+        c = self.counters
+        total = int(c['total'])
+        highest = {'name': 'Unknown', 'rate': 0}
+        for name, entry in self.departments.items():
+            rate = entry['attrition'] / entry['total'] * 100
+            if rate > float(highest['rate']):
+                highest = {'name': name, 'rate': f"{rate:.1f}"}
+
+        return {
+            "totalEmployees": total,
+            "attritionRate": round(c['attrition'] / total * 100, 1) if total else 0,
+            "atRiskEmployees": int(c['at_risk']),
+            "avgTenure": round(c['tenure_sum'] / c['tenure_count'], 1) if c['tenure_count'] else 0,
+            "avgAge": round(c['age_sum'] / c['age_count'], 1) if c['age_count'] else 0,
+            "highestAttritionDept": highest,
+            "keyInsights": {
+                "overTimeImpact": f"{c['overtime_attrition'] / c['overtime_total'] * 100:.1f}" if c['overtime_total'] else 0,
+                "totalAttrition": int(c['attrition']),
+                "departmentBreakdown": self.departments
+            }
+        }
+
+    def save(self, path):
+        """Tulis atomik (temp file + rename) supaya reader tidak pernah membaca file setengah jadi"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': self.meta, 'counters': self.counters, 'departments': self.departments}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['counters'], data['departments'], data['meta'])
+
+
+_AGGREGATES = None
+_AGGREGATES_LOCK = threading.Lock()
+
+
+def get_analytics_aggregates(dataset_path=None, aggregates_path=None):
+    """Aggregates per proses; dihitung penuh dari CSV kalau belum ada atau stale"""
+    global _AGGREGATES
+    dataset_path = Path(dataset_path or active_dataset_path())
+    aggregates_path = Path(aggregates_path or CACHE_DIR / AGGREGATES_FILE)
+    fingerprint = dataset_fingerprint(dataset_path)
+
+    aggregates = _AGGREGATES
+    if aggregates is not None and aggregates.is_current(fingerprint):
+        return aggregates
+
+    with _AGGREGATES_LOCK:
+        if _AGGREGATES is not None and _AGGREGATES.is_current(fingerprint):
+            return _AGGREGATES
+
+        aggregates = None
+        if aggregates_path.exists():
+            try:
+                aggregates = AnalyticsAggregates.load(aggregates_path)
+            except Exception as e:
+                print(f"Failed to load analytics aggregates {aggregates_path}: {e}", file=sys.stderr)
+        if aggregates is None or not aggregates.is_current(fingerprint):
+            aggregates = AnalyticsAggregates.build(load_dataset(dataset_path), fingerprint)
+            try:
+                aggregates.save(aggregates_path)
+            except OSError as e:
+                print(f"Analytics aggregates not persisted ({e}), keeping in memory", file=sys.stderr)
+
+        _AGGREGATES = aggregates
+        return aggregates
+
+
+def update_analytics_aggregates(old_rows, new_rows, dataset_fp, aggregates_path=None):
+    """Terapkan delta ke aggregates current dan simpan (dipanggil oleh ingest)"""
+    global _AGGREGATES
+    aggregates_path = Path(aggregates_path or CACHE_DIR / AGGREGATES_FILE)
+    with _AGGREGATES_LOCK:
+        aggregates = _AGGREGATES.apply(old_rows, new_rows, dataset_fp)
+        try:
+            aggregates.save(aggregates_path)
+        except OSError as e:
+            print(f"Analytics aggregates not persisted ({e}), keeping in memory", file=sys.stderr)
+        _AGGREGATES = aggregates
+        return aggregates
@@ -0,0 +1,135 @@
+"""
+Versioned JSON artifacts
+
+Hasil job offline (PDP, permutation importance, ...) disimpan sebagai satu file JSON per
+model version. Setiap artifact membawa meta (model_version, dataset_fingerprint, parameter
+job) sehingga reader bisa memutuskan apakah artifact masih current.
+
+Job menulis ke ARTIFACT_DIR (default api/python/models/artifacts) yang di-commit dan ikut
+ter-deploy bersama model, seperti drift_reference.json; CACHE_DIR tidak ada di deploy serverless.
+Reader mencari di ARTIFACT_DIR dulu lalu di CACHE_DIR (job yang dijalankan dengan --output-dir
+ke cache di server yang sama, mis. setelah model baru di-load).
+
+Endpoint hanya melayani artifact yang sudah ada (ServedArtifact); job tidak pernah dijalankan
+di dalam request.
+
+Environment:
+    ATTRITION_ARTIFACT_DIR=path   directory artifact yang di-deploy (default: MODEL_DIR/artifacts)
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from utils.scoring import CACHE_DIR, MODEL_DIR
+
+ARTIFACT_DIR = Path(os.getenv('ATTRITION_ARTIFACT_DIR', MODEL_DIR / 'artifacts'))
+
+
+class ArtifactUnavailable(RuntimeError):
+    """Belum ada artifact precomputed untuk model / parameter ini (dikembalikan sebagai HTTP 503)"""
+
+
+def artifact_path(name, model_version, artifact_dir=None, **params):
+    """
+    Path artifact: <artifact_dir>/<name>_<model_version>[_<key>-<value>...].json
+
+    Parameter job yang mengubah hasil (metric, jumlah repeat, seed, ...) ikut menjadi bagian
+    nama file, supaya artifact dengan parameter berbeda tidak saling menimpa.
+    """
+    suffix = ''.join(f"_{key}-{value}" for key, value in sorted(params.items()))
+    return Path(artifact_dir or ARTIFACT_DIR) / f"{name}_{model_version}{suffix}.json"
+
+
+def find_artifact(name, model_version, artifact_dir=None, **params):
+    """
+    Path artifact yang ada untuk dibaca: artifact_dir kalau diberikan, selain itu ARTIFACT_DIR
+    (ter-deploy) lalu CACHE_DIR (hasil job lokal). Kalau tidak ada, path di directory pertama.
+    """
+    candidates = [artifact_path(name, model_version, directory, **params)
+                  for directory in ([artifact_dir] if artifact_dir else [ARTIFACT_DIR, CACHE_DIR])]
+    return next((path for path in candidates if path.exists()), candidates[0])
+
+
+def save_artifact(path, meta, payload):
+    """Tulis atomik (temp file + rename) supaya reader tidak pernah membaca file setengah jadi"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, **payload}, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path, **expected_meta):
+    """
+    Load artifact kalau ada dan semua expected_meta cocok
+
+    Returns:
+        dict atau None (tidak ada, rusak, atau stale)
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    meta = artifact.get('meta', {})
+    if any(meta.get(key) != value for key, value in expected_meta.items()):
+        return None
+    return artifact
+
+
+class ServedArtifact:
+    """
+    Artifact precomputed yang dilayani endpoint, di-cache per proses
+
+    get() tidak pernah menghitung: file di-load sekali dan hanya di-load ulang kalau berubah
+    (job offline menulis versi baru). Artifact untuk model version / parameter yang diminta
+    tetap dilayani walaupun dataset sudah berubah sejak job terakhir, dengan 'stale': True.
+    """
+
+    def __init__(self, name, job_command):
+        """
+        Args:
+            name (str): Nama artifact (prefix file)
+            job_command (str): Command job offline, untuk pesan error kalau artifact belum ada
+        """
+        self.name = name
+        self.job_command = job_command
+        self._cached = None
+        self._lock = threading.Lock()
+
+    def get(self, model_version, fresh_meta, artifact_dir=None, **params):
+        """
+        Args:
+            model_version (str): Versi model yang harus cocok
+            fresh_meta (dict): Meta yang menentukan stale (mis. dataset_fingerprint)
+            artifact_dir (str): Directory artifact (default: ARTIFACT_DIR, lalu CACHE_DIR)
+            **params: Parameter job yang harus cocok (juga bagian dari nama file)
+
+        Returns:
+            dict: artifact (salinan dangkal) dengan key 'stale'
+
+        Raises:
+            ArtifactUnavailable: belum ada artifact untuk model version + parameter ini
+        """
+        path = find_artifact(self.name, model_version, artifact_dir, **params)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            cached = self._cached
+            if mtime is not None and (cached is None or cached[:2] != (path, mtime)):
+                artifact = load_artifact(path, model_version=model_version, **params)
+                cached = (path, mtime, artifact) if artifact is not None else None
+                self._cached = cached
+        if mtime is None or cached is None or cached[0] != path:
+            raise ArtifactUnavailable(f"No precomputed {self.name} for model {model_version}"
+                                      f"{' with ' + str(params) if params else ''}; run `{self.job_command}`")
+
+        artifact = cached[2]
+        stale = any(artifact['meta'].get(key) != value for key, value in fresh_meta.items())
+        return dict(artifact, stale=stale)
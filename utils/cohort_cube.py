@@ -0,0 +1,369 @@
+"""
+OLAP-style cohort cube untuk attrition analytics
+
+Dataset di-aggregate sekali ke cube dense Department x JobRole x OverTime x BusinessTravel x
+MaritalStatus x TenureBucket berisi count, attrition count, jumlah risk prediksi, dsb.
+Query slice (filter per dimensi) dan roll-up (group by subset dimensi) dijawab dari cube
+dengan indexing + sum NumPy, tanpa menyentuh row mentah.
+
+Cube juga menyimpan fakta per row (cell, flag attrition, risk). Saat CSV atau model berubah,
+fakta baru dibandingkan per EmployeeId dan hanya row yang berubah/ditambah/dihapus yang
+dikurangi/ditambahkan ke cube. Rebuild penuh hanya kalau muncul kategori baru.
+
+Build manual:
+    python -m utils.cohort_cube [--force]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.score_store import get_score_store
+from utils.scoring import CACHE_DIR, active_dataset_path, dataset_fingerprint, load_dataset
+
+CUBE_FILE = 'cohort_cube.npz'
+
+CATEGORY_DIMENSIONS = ('Department', 'JobRole', 'OverTime', 'BusinessTravel', 'MaritalStatus')
+TENURE_DIMENSION = 'TenureBucket'
+DIMENSIONS = CATEGORY_DIMENSIONS + (TENURE_DIMENSION,)
+
+# Bucket YearsAtCompany: [0, 2), [2, 5), [5, 10), [10, 20), [20, inf)
+TENURE_EDGES = (2, 5, 10, 20)
+TENURE_BUCKETS = ('0-1', '2-4', '5-9', '10-19', '20+')
+
+# Measure additive per cell; rate dan mean diturunkan saat query
+MEASURES = ('count', 'attrition', 'labeled', 'labeled_attrition', 'high_risk', 'risk_sum')
+
+# Kolom dataset yang dibutuhkan untuk membangun fakta per row
+SOURCE_COLUMNS = ['EmployeeId', 'YearsAtCompany', 'Attrition', 'Final_Attrition'] + list(CATEGORY_DIMENSIONS)
+
+
+def tenure_bucket_codes(years):
+    return np.searchsorted(np.asarray(TENURE_EDGES), np.nan_to_num(np.asarray(years, dtype=np.float64)),
+                           side='right').astype(np.int16)
+
+
+def row_facts(df, store, categories):
+    """
+    Fakta per row: cell index di cube dan kontribusi setiap measure
+
+    Returns:
+        dict of arrays, atau None kalau ada nilai kategori di luar `categories` (perlu rebuild penuh)
+    """
+    shape = tuple(len(categories[dim]) for dim in DIMENSIONS)
+    codes = []
+    for dim in CATEGORY_DIMENSIONS:
+        lookup = {value: code for code, value in enumerate(categories[dim])}
+        dim_codes = df[dim].fillna('Unknown').map(lookup)
+        if dim_codes.isna().any():
+            return None
+        codes.append(dim_codes.to_numpy(dtype=np.int64))
+    codes.append(tenure_bucket_codes(df['YearsAtCompany']).astype(np.int64))
+
+    positions = store.positions(df['EmployeeId'].to_numpy())
+    if (positions < 0).any():
+        raise ValueError("Score store does not cover every EmployeeId in the dataset")
+    attrition = df['Attrition'].to_numpy(dtype=np.float64)
+    final_attrition = df['Final_Attrition'].to_numpy(dtype=np.float64)
+
+    return {
+        'employee_ids': df['EmployeeId'].to_numpy(dtype=np.int64),
+        'cell': np.ravel_multi_index(codes, shape).astype(np.int32),
+        'count': np.ones(len(df), dtype=np.int64),
+        # Definisi sama dengan pages/api/analytics.js: Final_Attrition atau Attrition == 1
+        'attrition': ((final_attrition == 1) | (attrition == 1)).astype(np.int64),
+        'labeled': (~np.isnan(attrition)).astype(np.int64),
+        'labeled_attrition': (attrition == 1).astype(np.int64),
+        'high_risk': (store.risk_codes[positions] == 2).astype(np.int64),
+        'risk_sum': store.will_leave[positions].astype(np.float64),
+    }
+
+
+class CohortQueryError(ValueError):
+    """Dimensi atau nilai filter yang tidak dikenal (dikembalikan sebagai HTTP 400)"""
+
+
+class CohortCube:
+    """Dense cube measure per kombinasi dimensi, plus fakta per row untuk update incremental"""
+
+    def __init__(self, measures, facts, meta):
+        self.measures = measures
+        self.facts = facts
+        self.meta = meta
+
+    @property
+    def categories(self):
+        return self.meta['categories']
+
+    @property
+    def shape(self):
+        return tuple(len(self.categories[dim]) for dim in DIMENSIONS)
+
+    @classmethod
+    def build(cls, df, store, dataset_fp):
+        import pandas as pd
+
+        categories = {dim: [str(v) for v in pd.factorize(df[dim].fillna('Unknown'), sort=True)[1]]
+                      for dim in CATEGORY_DIMENSIONS}
+        categories[TENURE_DIMENSION] = list(TENURE_BUCKETS)
+        facts = row_facts(df, store, categories)
+        size = int(np.prod([len(categories[dim]) for dim in DIMENSIONS]))
+        measures = {name: np.bincount(facts['cell'], weights=facts[name], minlength=size) for name in MEASURES}
+        meta = {
+            'model_version': store.meta['model_version'],
+            'dataset_fingerprint': dataset_fp,
+            'rows': int(len(df)),
+            'built_at': time.time(),
+            'categories': categories,
+            'last_update': {'mode': 'full', 'rows_touched': int(len(df))},
+        }
+        return cls(measures, facts, meta)
+
+    def refresh(self, df, store, dataset_fp):
+        """
+        Update incremental ke dataset/score store baru
+
+        Hanya row yang fakta-nya berubah (termasuk risk karena model baru), row baru, dan row
+        yang hilang yang dikurangi/ditambahkan ke measure. Cube ini tidak diubah; hasilnya cube
+        baru yang di-swap oleh caller, sehingga query yang sedang berjalan tetap melihat
+        measures/facts/meta lama yang konsisten.
+
+        Returns:
+            CohortCube baru, atau None kalau perlu rebuild penuh (kategori baru)
+        """
+        new = row_facts(df, store, self.categories)
+        if new is None:
+            return None
+        old = self.facts
+
+        _, old_common, new_common = np.intersect1d(old['employee_ids'], new['employee_ids'],
+                                                   assume_unique=True, return_indices=True)
+        changed = np.zeros(len(old_common), dtype=bool)
+        for name in ('cell',) + MEASURES:
+            changed |= old[name][old_common] != new[name][new_common]
+
+        removed = np.setdiff1d(np.arange(len(old['employee_ids'])), old_common, assume_unique=True)
+        added = np.setdiff1d(np.arange(len(new['employee_ids'])), new_common, assume_unique=True)
+        subtract = np.concatenate([old_common[changed], removed])
+        add = np.concatenate([new_common[changed], added])
+
+        measures = {name: values.copy() for name, values in self.measures.items()}
+        for name in MEASURES:
+            np.subtract.at(measures[name], old['cell'][subtract], old[name][subtract])
+            np.add.at(measures[name], new['cell'][add], new[name][add])
+
+        meta = dict(self.meta, model_version=store.meta['model_version'], dataset_fingerprint=dataset_fp,
+                    rows=int(len(df)), built_at=time.time(),
+                    last_update={'mode': 'incremental', 'rows_touched': int(len(subtract) + len(added)),
+                                 'changed': int(changed.sum()), 'added': int(len(added)),
+                                 'removed': int(len(removed))})
+        return CohortCube(measures, new, meta)
+
+    def upsert(self, rows, store, dataset_fp):
+        """
+        Update incremental untuk delta row (insert atau update berdasarkan EmployeeId)
+
+        Returns:
+            CohortCube baru, atau None kalau delta membawa kategori baru (perlu rebuild penuh)
+        """
+        new = row_facts(rows, store, self.categories)
+        if new is None:
+            return None
+        old = self.facts
+
+        _, old_index, new_index = np.intersect1d(old['employee_ids'], new['employee_ids'],
+                                                 assume_unique=True, return_indices=True)
+        appended = np.setdiff1d(np.arange(len(new['employee_ids'])), new_index, assume_unique=True)
+
+        measures = {name: values.copy() for name, values in self.measures.items()}
+        for name in MEASURES:
+            np.subtract.at(measures[name], old['cell'][old_index], old[name][old_index])
+            np.add.at(measures[name], new['cell'], new[name])
+
+        facts = {}
+        for name, values in old.items():
+            merged = values.copy()
+            merged[old_index] = new[name][new_index]
+            facts[name] = np.concatenate([merged, new[name][appended].astype(values.dtype)])
+
+        meta = dict(self.meta, model_version=store.meta['model_version'], dataset_fingerprint=dataset_fp,
+                    rows=int(len(facts['employee_ids'])), built_at=time.time(),
+                    last_update={'mode': 'upsert', 'rows_touched': int(len(new['employee_ids'])),
+                                 'updated': int(len(old_index)), 'added': int(len(appended))})
+        return CohortCube(measures, facts, meta)
+
+    def is_current(self, current_model_version, current_dataset_fingerprint):
+        return (self.meta.get('model_version') == current_model_version and
+                self.meta.get('dataset_fingerprint') == current_dataset_fingerprint)
+
+    def query(self, group_by=(), **filters):
+        """
+        Slice + roll-up dari cube
+
+        Args:
+            group_by (list): Dimensi yang dipertahankan (sisanya di-sum)
+            **filters: dimensi -> nilai atau list nilai (OR di dalam satu dimensi)
+
+        Returns:
+            dict: totals untuk slice dan cells per kombinasi group_by (count > 0)
+        """
+        unknown = [dim for dim in list(group_by) + list(filters) if dim not in DIMENSIONS]
+        if unknown:
+            raise CohortQueryError(f"Unknown dimensions {unknown}, expected any of {list(DIMENSIONS)}")
+
+        selections = []
+        for dim in DIMENSIONS:
+            values = self.categories[dim]
+            wanted = filters.get(dim)
+            if not wanted:
+                selections.append(np.arange(len(values)))
+                continue
+            wanted = [wanted] if isinstance(wanted, str) else wanted
+            missing = [value for value in wanted if value not in values]
+            if missing:
+                raise CohortQueryError(f"Unknown {dim} values {missing}, expected any of {values}")
+            selections.append(np.array([values.index(value) for value in wanted]))
+
+        keep = [axis for axis, dim in enumerate(DIMENSIONS) if dim in group_by]
+        drop = tuple(axis for axis in range(len(DIMENSIONS)) if axis not in keep)
+        index = np.ix_(*selections)
+        rolled = {name: self.measures[name].reshape(self.shape)[index].sum(axis=drop) for name in MEASURES}
+
+        grouped_dims = [DIMENSIONS[axis] for axis in keep]
+        cells = []
+        for position in np.ndindex(rolled['count'].shape):
+            if rolled['count'][position] <= 0:
+                continue
+            cell = {dim: self.categories[dim][selections[axis][i]]
+                    for dim, axis, i in zip(grouped_dims, keep, position)}
+            cell.update(summarize({name: rolled[name][position] for name in MEASURES}))
+            cells.append(cell)
+
+        return {
+            "group_by": grouped_dims,
+            "filters": {dim: filters[dim] for dim in DIMENSIONS if filters.get(dim)},
+            "totals": summarize({name: rolled[name].sum() for name in MEASURES}),
+            "cells": cells,
+        }
+
+    def save(self, path):
+        """Tulis atomik (temp file + rename) supaya reader tidak pernah membaca file setengah jadi"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        arrays = {f"measure_{name}": values for name, values in self.measures.items()}
+        arrays.update({f"fact_{name}": values for name, values in self.facts.items()})
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        meta = json.loads(str(arrays.pop('meta')))
+        measures = {name[len('measure_'):]: values for name, values in arrays.items() if name.startswith('measure_')}
+        facts = {name[len('fact_'):]: values for name, values in arrays.items() if name.startswith('fact_')}
+        return cls(measures, facts, meta)
+
+
+def summarize(totals):
+    """Measure additive -> angka yang ditampilkan dashboard"""
+    count = int(round(totals['count']))
+    labeled = int(round(totals['labeled']))
+    return {
+        "count": count,
+        "attrition": int(round(totals['attrition'])),
+        "attrition_rate": float(totals['attrition'] / count) if count else None,
+        "labeled": labeled,
+        "observed_attrition_rate": float(totals['labeled_attrition'] / labeled) if labeled else None,
+        "high_risk": int(round(totals['high_risk'])),
+        "mean_risk": float(totals['risk_sum'] / count) if count else None,
+    }
+
+
+_CUBE = None
+_CUBE_LOCK = threading.Lock()
+
+
+def get_cohort_cube(dataset_path=None, cube_path=None, force=False):
+    """
+    Cohort cube per proses, di-update incremental kalau CSV atau model berubah
+
+    Urutan: cube di memori -> cube di cache dir -> refresh incremental -> rebuild penuh.
+    """
+    global _CUBE
+    dataset_path = Path(dataset_path or active_dataset_path())
+    cube_path = Path(cube_path or CACHE_DIR / CUBE_FILE)
+    store = get_score_store(dataset_path)
+    current = (store.meta['model_version'], dataset_fingerprint(dataset_path))
+
+    cube = _CUBE
+    if not force and cube is not None and cube.is_current(*current):
+        return cube
+
+    with _CUBE_LOCK:
+        if not force and _CUBE is not None and _CUBE.is_current(*current):
+            return _CUBE
+
+        cube = None if force else _CUBE
+        if cube is None and not force and cube_path.exists():
+            try:
+                cube = CohortCube.load(cube_path)
+            except Exception as e:
+                print(f"Failed to load cohort cube {cube_path}: {e}", file=sys.stderr)
+
+        if cube is None or not cube.is_current(*current):
+            df = load_dataset(dataset_path, columns=SOURCE_COLUMNS)
+            cube = cube.refresh(df, store, current[1]) if cube is not None else None
+            if cube is None:
+                cube = CohortCube.build(df, store, current[1])
+            try:
+                cube.save(cube_path)
+            except OSError as e:
+                print(f"Cohort cube not persisted ({e}), keeping in memory", file=sys.stderr)
+            print(f"Cohort cube {cube.meta['last_update']['mode']} update: "
+                  f"{cube.meta['last_update']['rows_touched']} rows touched", file=sys.stderr)
+
+        _CUBE = cube
+        return cube
+
+
+def update_cohort_cube(rows, store, dataset_fp, dataset_path=None, cube_path=None):
+    """Upsert delta row ke cube current dan simpan (dipanggil oleh ingest)"""
+    global _CUBE
+    cube_path = Path(cube_path or CACHE_DIR / CUBE_FILE)
+    with _CUBE_LOCK:
+        cube = _CUBE.upsert(rows, store, dataset_fp)
+        if cube is None:
+            cube = CohortCube.build(load_dataset(dataset_path or active_dataset_path(), columns=SOURCE_COLUMNS),
+                                    store, dataset_fp)
+        try:
+            cube.save(cube_path)
+        except OSError as e:
+            print(f"Cohort cube not persisted ({e}), keeping in memory", file=sys.stderr)
+        _CUBE = cube
+        return cube
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build / refresh cohort cube")
+    parser.add_argument('--dataset', help="Dataset CSV (default: active_dataset_path())")
+    parser.add_argument('--out', help=f"Output cube (default: {CACHE_DIR / CUBE_FILE})")
+    parser.add_argument('--force', action='store_true', help="Rebuild penuh")
+    args = parser.parse_args()
+
+    cube = get_cohort_cube(args.dataset, args.out, force=args.force)
+    result = cube.query(group_by=['Department'])
+    print(f"✅ Cube {' x '.join(str(n) for n in cube.shape)} ({cube.meta['rows']} rows, model {cube.meta['model_version']})")
+    for cell in result['cells']:
+        print(f"  {cell['Department']:25s} {cell['count']:5d} employees, attrition {cell['attrition_rate']:.1%}, "
+              f"mean risk {cell['mean_risk']:.3f}")
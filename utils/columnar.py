@@ -0,0 +1,302 @@
+"""
+Columnar binary format untuk dataset employee
+
+CSV dikonversi sekali ke satu directory berisi schema.json plus satu file .npy per kolom
+(kolom string di-dictionary-encode: codes integer + dictionary di schema), atau satu file
+Parquet kalau pyarrow tersedia. Reader memakai memory mapping dan hanya membuka kolom
+yang diminta, jadi load_dataset(columns=[...]) tidak mem-parse teks sama sekali.
+
+Schema menyimpan path dan fingerprint CSV sumber; load_dataset hanya memakai versi
+columnar kalau fingerprint-nya masih cocok dengan CSV.
+
+Converter:
+    python -m utils.columnar [--format npy|parquet] [--out DIR]
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.scoring import CACHE_DIR, active_dataset_path, dataset_fingerprint
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = 'schema.json'
+PARQUET_FILE = 'dataset.parquet'
+FORMATS = ('npy', 'parquet')
+
+COLUMNAR_DIR = Path(os.getenv('ATTRITION_COLUMNAR_DIR', CACHE_DIR / 'dataset_columnar'))
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _column_file(index):
+    return f"col_{index:03d}.npy"
+
+
+def write_columnar(df, out_dir=None, source_path=None, fmt='npy'):
+    """
+    Tulis DataFrame ke format columnar (directory baru di-swap secara atomik)
+
+    Args:
+        df (DataFrame): Dataset
+        out_dir (str): Directory output (default: COLUMNAR_DIR)
+        source_path (str): CSV sumber (untuk fingerprint di schema)
+        fmt (str): 'npy' (per-column .npy) atau 'parquet' (butuh pyarrow)
+
+    Returns:
+        dict: schema
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+    if fmt == 'parquet' and not parquet_available():
+        raise ValueError("Parquet format needs pyarrow (pip install pyarrow)")
+
+    out_dir = Path(out_dir or COLUMNAR_DIR)
+    source_path = Path(source_path or active_dataset_path())
+    tmp_dir = out_dir.with_name(f"{out_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    columns = []
+    for index, name in enumerate(df.columns):
+        series = df[name]
+        if series.dtype.kind in 'biuf':
+            entry = {'name': name, 'kind': 'numeric', 'dtype': series.dtype.str}
+            values = series.to_numpy()
+        else:
+            codes, dictionary = series.factorize(sort=True)
+            code_dtype = np.int16 if len(dictionary) < np.iinfo(np.int16).max else np.int32
+            entry = {'name': name, 'kind': 'categorical', 'dtype': np.dtype(code_dtype).str,
+                     'dictionary': [str(value) for value in dictionary]}
+            values = codes.astype(code_dtype)
+        if fmt == 'npy':
+            entry['file'] = _column_file(index)
+            np.save(tmp_dir / entry['file'], np.ascontiguousarray(values))
+        columns.append(entry)
+
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_dir / PARQUET_FILE)
+
+    schema = _schema(fmt, len(df), columns, source_path)
+    _publish(tmp_dir, out_dir, schema)
+    return schema
+
+
+def _schema(fmt, rows, columns, source_path=None):
+    return {
+        'format_version': FORMAT_VERSION,
+        'format': fmt,
+        'rows': int(rows),
+        'source_path': str(Path(source_path).resolve()) if source_path else None,
+        'source_fingerprint': dataset_fingerprint(source_path) if source_path else None,
+        'created_at': time.time(),
+        'columns': columns,
+    }
+
+
+def _publish(tmp_dir, out_dir, schema):
+    """Tulis schema lalu swap directory: reader yang sudah membuka file lama tetap valid (inode tetap ada)"""
+    with open(tmp_dir / SCHEMA_FILE, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=1)
+    old_dir = out_dir.with_name(f"{out_dir.name}.{os.getpid()}.old")
+    if out_dir.exists():
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class ColumnarWriter:
+    """
+    Streaming writer format npy untuk dataset yang tidak muat di memori
+
+    Jumlah row ditentukan di depan; setiap kolom adalah .npy memmap yang diisi per chunk.
+    Kolom kategori memakai dictionary tetap (nilai di luar dictionary ditulis sebagai -1).
+    """
+
+    def __init__(self, out_dir, columns, rows, source_path=None):
+        """
+        Args:
+            out_dir (str): Directory output (di-swap atomik saat close)
+            columns (list): [{'name', 'kind': 'numeric', 'dtype'} atau
+                {'name', 'kind': 'categorical', 'dictionary': [...]}]
+            rows (int): Total row yang akan ditulis
+            source_path (str): Dataset sumber (optional, untuk schema)
+        """
+        self.out_dir = Path(out_dir)
+        self.rows = int(rows)
+        self.source_path = source_path
+        self.offset = 0
+        self.tmp_dir = self.out_dir.with_name(f"{self.out_dir.name}.{os.getpid()}.tmp")
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        self.tmp_dir.mkdir(parents=True)
+
+        self.columns = []
+        self._arrays = []
+        for index, column in enumerate(columns):
+            entry = dict(column, file=_column_file(index))
+            if entry['kind'] == 'categorical':
+                size = len(entry['dictionary'])
+                entry['dtype'] = np.dtype(np.int16 if size < np.iinfo(np.int16).max else np.int32).str
+            self.columns.append(entry)
+            self._arrays.append(np.lib.format.open_memmap(self.tmp_dir / entry['file'], mode='w+',
+                                                          dtype=np.dtype(entry['dtype']), shape=(self.rows,)))
+
+    def write(self, df):
+        """Append satu chunk DataFrame (kolom sesuai schema)"""
+        import pandas as pd
+
+        end = self.offset + len(df)
+        if end > self.rows:
+            raise ValueError(f"Writer was opened for {self.rows} rows, got {end}")
+        for entry, array in zip(self.columns, self._arrays):
+            if entry['kind'] == 'numeric':
+                array[self.offset:end] = df[entry['name']].to_numpy(dtype=array.dtype)
+            else:
+                array[self.offset:end] = pd.Categorical(df[entry['name']], categories=entry['dictionary']).codes
+        self.offset = end
+
+    def close(self):
+        if self.offset != self.rows:
+            raise ValueError(f"Writer expected {self.rows} rows, got {self.offset}")
+        for array in self._arrays:
+            array.flush()
+        self._arrays = []
+        schema = _schema('npy', self.rows, self.columns, self.source_path)
+        _publish(self.tmp_dir, self.out_dir, schema)
+        return schema
+
+
+def convert(csv_path=None, out_dir=None, fmt='npy'):
+    """Konversi CSV ke format columnar"""
+    import pandas as pd
+
+    csv_path = Path(csv_path or active_dataset_path())
+    return write_columnar(pd.read_csv(csv_path), out_dir, csv_path, fmt)
+
+
+class ColumnarDataset:
+    """Reader lazy: setiap kolom di-memory-map saat pertama kali diakses"""
+
+    def __init__(self, directory, mmap=True):
+        self.directory = Path(directory)
+        with open(self.directory / SCHEMA_FILE, encoding='utf-8') as f:
+            self.schema = json.load(f)
+        if self.schema.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version {self.schema.get('format_version')}")
+        self.mmap = mmap
+        self.columns = [entry['name'] for entry in self.schema['columns']]
+        self._entries = {entry['name']: entry for entry in self.schema['columns']}
+        self._arrays = {}
+
+    def __len__(self):
+        return self.schema['rows']
+
+    def is_current(self, source_path=None):
+        source_path = Path(source_path or active_dataset_path())
+        return (self.schema.get('source_path') == str(source_path.resolve()) and
+                self.schema.get('source_fingerprint') == dataset_fingerprint(source_path))
+
+    def entry(self, name):
+        if name not in self._entries:
+            raise KeyError(f"Unknown column '{name}'")
+        return self._entries[name]
+
+    def raw(self, name):
+        """Array tersimpan apa adanya (codes untuk kolom kategori), memory-mapped"""
+        if name not in self._arrays:
+            entry = self.entry(name)
+            if self.schema['format'] == 'npy':
+                self._arrays[name] = np.load(self.directory / entry['file'], mmap_mode='r' if self.mmap else None)
+            else:
+                import pyarrow.parquet as pq
+                table = pq.read_table(self.directory / PARQUET_FILE, columns=[name], memory_map=self.mmap)
+                values = table.column(name).to_pandas()
+                self._arrays[name] = (values.to_numpy() if entry['kind'] == 'numeric'
+                                      else values.map({v: i for i, v in enumerate(entry['dictionary'])})
+                                      .fillna(-1).to_numpy(dtype=entry['dtype']))
+        return self._arrays[name]
+
+    def codes(self, name):
+        """Dictionary codes kolom kategori (-1 = kosong)"""
+        if self.entry(name)['kind'] != 'categorical':
+            raise ValueError(f"Column '{name}' is not categorical")
+        return self.raw(name)
+
+    def dictionary(self, name):
+        return self.entry(name)['dictionary']
+
+    def column(self, name):
+        """Nilai kolom: array numerik (mmap) atau string hasil decode dictionary"""
+        entry = self.entry(name)
+        values = self.raw(name)
+        if entry['kind'] == 'numeric':
+            return values
+        lookup = np.asarray(entry['dictionary'] + [np.nan], dtype=object)
+        return lookup[values]
+
+    def to_frame(self, columns=None):
+        """DataFrame dengan subset kolom (urutan mengikuti `columns` atau schema)"""
+        import pandas as pd
+
+        names = list(columns) if columns is not None else self.columns
+        data = {}
+        for name in names:
+            entry = self.entry(name)
+            if entry['kind'] == 'numeric':
+                data[name] = pd.Series(np.asarray(self.raw(name)), name=name)
+            else:
+                data[name] = pd.Series(self.column(name), name=name, dtype='str')
+        return pd.DataFrame(data, columns=names)
+
+
+def open_current(source_path=None, directory=None):
+    """ColumnarDataset untuk CSV ini kalau ada dan masih current, selain itu None"""
+    directory = Path(directory or COLUMNAR_DIR)
+    if not (directory / SCHEMA_FILE).exists():
+        return None
+    try:
+        dataset = ColumnarDataset(directory)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring columnar dataset {directory}: {e}", file=sys.stderr)
+        return None
+    return dataset if dataset.is_current(source_path) else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Konversi dataset CSV ke format columnar binary")
+    parser.add_argument('--dataset', help="Dataset CSV (default: active_dataset_path())")
+    parser.add_argument('--out', help=f"Output directory (default: {COLUMNAR_DIR})")
+    parser.add_argument('--format', choices=FORMATS, default='npy')
+    args = parser.parse_args()
+
+    csv_path = Path(args.dataset or active_dataset_path())
+    start = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    parse_s = time.perf_counter() - start
+    schema = write_columnar(df, args.out, csv_path, args.format)
+
+    dataset = ColumnarDataset(args.out or COLUMNAR_DIR)
+    start = time.perf_counter()
+    loaded = dataset.to_frame()
+    load_s = time.perf_counter() - start
+    pd.testing.assert_frame_equal(loaded, df, check_dtype=False)
+    print(f"✅ {schema['rows']} rows x {len(schema['columns'])} columns -> {args.out or COLUMNAR_DIR} ({args.format}); "
+          f"CSV parse {parse_s * 1000:.1f} ms, columnar load {load_s * 1000:.1f} ms")
@@ -0,0 +1,316 @@
+"""
+Counterfactual retention-action search
+
+Mencari perubahan realistis termurah (OverTime, kenaikan gaji, stock option, promosi, dsb.)
+yang menurunkan probabilitas will_leave sampai ke target band. Kandidat dibangkitkan per
+level (1 perubahan, 2 perubahan, ...), setiap batch di-score vectorized dalam satu
+predict_proba call, kandidat yang didominasi (lebih mahal dan tidak lebih rendah risikonya)
+dibuang, dan ekspansi yang biayanya sudah >= solusi terbaik tidak di-score sama sekali.
+Pencarian berhenti saat tidak ada kandidat tersisa atau time budget habis.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.scoring import encode_records, risk_level
+from utils.what_if import set_feature
+
+# Batas atas probabilitas untuk setiap target band
+TARGET_THRESHOLDS = {'Medium': 0.7, 'Low': 0.4}
+
+DEFAULT_TIME_BUDGET_MS = 500
+MAX_TIME_BUDGET_MS = 5000
+MAX_TOP_K = 50
+DEFAULT_MAX_CHANGES = 3
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_BEAM_WIDTH = 64
+
+
+class SearchError(ValueError):
+    """Parameter pencarian tidak valid (dikembalikan sebagai HTTP 400)"""
+
+
+@dataclass(frozen=True)
+class Change:
+    feature: str
+    before: object
+    after: object
+    cost: float
+    label: str
+
+
+@dataclass
+class Candidate:
+    changes: tuple
+    cost: float
+    last_action: int
+    will_leave: float = None
+
+
+def _numeric(record, name, default=0.0):
+    value = record.get(name)
+    return float(value) if value not in [None, ''] else default
+
+
+def _raise_options(record, weight):
+    income = _numeric(record, 'MonthlyIncome')
+    return [Change('MonthlyIncome', income, round(income * (1 + pct / 100.0)), weight * pct / 10.0,
+                   f"Raise MonthlyIncome {pct}%")
+            for pct in (5, 10, 15, 20, 30, 50)] if income > 0 else []
+
+
+def _step_options(name, per_step, maximum, label):
+    def options(record, weight):
+        current = _numeric(record, name)
+        # Nilai di luar skala (negatif) tidak menambah jumlah langkah di atas maximum
+        steps = int(maximum - min(max(current, 0.0), maximum))
+        return [Change(name, current, current + step, weight * per_step * step, f"{label} +{step}")
+                for step in range(1, steps + 1)]
+    return options
+
+
+def _category_options(name, moves):
+    def options(record, weight):
+        current = record.get(name)
+        return [Change(name, current, target, weight * cost, f"{name} {current} -> {target}")
+                for target, cost in moves.get(current, [])]
+    return options
+
+
+def _promotion_options(record, weight):
+    years = _numeric(record, 'YearsSinceLastPromotion')
+    return [Change('YearsSinceLastPromotion', years, 0.0, weight * 1.5, "Promote now (reset YearsSinceLastPromotion)")] \
+        if years > 0 else []
+
+
+# Actionable feature -> generator opsi (biaya dasar per opsi dikali cost weight)
+ACTIONS = {
+    'OverTime': _category_options('OverTime', {'Yes': [('No', 1.0)]}),
+    'MonthlyIncome': _raise_options,
+    'StockOptionLevel': _step_options('StockOptionLevel', 0.8, 3, "StockOptionLevel"),
+    'JobLevel': _step_options('JobLevel', 2.0, 5, "JobLevel"),
+    'YearsSinceLastPromotion': _promotion_options,
+    'BusinessTravel': _category_options('BusinessTravel', {
+        'Travel_Frequently': [('Travel_Rarely', 0.7), ('Non-Travel', 1.2)],
+        'Travel_Rarely': [('Non-Travel', 0.6)],
+    }),
+    'JobSatisfaction': _step_options('JobSatisfaction', 0.6, 4, "JobSatisfaction"),
+    'EnvironmentSatisfaction': _step_options('EnvironmentSatisfaction', 0.6, 4, "EnvironmentSatisfaction"),
+    'WorkLifeBalance': _step_options('WorkLifeBalance', 0.6, 4, "WorkLifeBalance"),
+    'TrainingTimesLastYear': _step_options('TrainingTimesLastYear', 0.3, 6, "TrainingTimesLastYear"),
+}
+
+
+def validate_cost_weights(cost_weights):
+    """Pengali biaya per action sebagai float; harus angka finite dan tidak negatif"""
+    if cost_weights is None:
+        return {}
+    if not isinstance(cost_weights, dict):
+        raise SearchError("cost_weights must be an object mapping action to weight")
+    weights = {}
+    for name, weight in cost_weights.items():
+        try:
+            weights[name] = float(weight)
+        except (TypeError, ValueError):
+            raise SearchError(f"Cost weight for '{name}' must be a number")
+        if not math.isfinite(weights[name]) or weights[name] < 0:
+            raise SearchError(f"Cost weight for '{name}' must be finite and non-negative")
+    return weights
+
+
+def action_options(record, actions=None, cost_weights=None):
+    """List of (feature, [Change, ...]) yang berlaku untuk employee ini"""
+    cost_weights = validate_cost_weights(cost_weights)
+    if actions is not None and (not isinstance(actions, list) or not all(isinstance(a, str) for a in actions)):
+        raise SearchError("actions must be a list of action names")
+    result = []
+    for name in actions or ACTIONS:
+        if name not in ACTIONS:
+            raise SearchError(f"Unknown action '{name}', expected one of {list(ACTIONS)}")
+        options = ACTIONS[name](record, cost_weights.get(name, 1.0))
+        if options:
+            result.append((name, options))
+    return result
+
+
+def _score_batch(engine, base_x, candidates):
+    X = np.tile(base_x, (len(candidates), 1))
+    for i, candidate in enumerate(candidates):
+        for change in candidate.changes:
+            set_feature(X, i, change.feature, change.after)
+    return engine.predict_proba(X)[:, 1]
+
+
+def _prune_dominated(candidates, beam_width):
+    """
+    Buang kandidat yang didominasi: kandidat lain dengan fitur yang sama punya biaya <= dan
+    probabilitas <= (mis. raise 30% yang tidak lebih baik dari raise 10%), lalu ambil
+    beam_width kandidat dengan probabilitas terendah untuk diekspansi
+    """
+    kept = []
+    best_probability = {}
+    for candidate in sorted(candidates, key=lambda c: (c.cost, c.will_leave)):
+        features = tuple(change.feature for change in candidate.changes)
+        if candidate.will_leave < best_probability.get(features, float('inf')):
+            kept.append(candidate)
+            best_probability[features] = candidate.will_leave
+    kept.sort(key=lambda c: c.will_leave)
+    return kept[:beam_width]
+
+
+def _int_param(value, name):
+    if isinstance(value, bool):
+        raise SearchError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise SearchError(f"{name} must be an integer") from None
+
+
+def _float_param(value, name):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise SearchError(f"{name} must be a number") from None
+    if not math.isfinite(value):
+        raise SearchError(f"{name} must be a finite number")
+    return value
+
+
+def encode_employee(record):
+    """Encode employee untuk search; input yang tidak bisa di-encode menjadi SearchError"""
+    try:
+        x = encode_records([record])[0]
+    except (TypeError, ValueError) as e:
+        raise SearchError(f"Invalid employee: {e}") from e
+    # Model memakai float32; nilai di luar rentangnya sama tidak validnya dengan inf
+    if not (np.isfinite(x) & (np.abs(x) <= np.finfo(np.float32).max)).all():
+        raise SearchError("Invalid employee: numeric fields must be finite")
+    return x
+
+
+def search(engine, record, target_risk='Medium', target_probability=None, actions=None,
+           cost_weights=None, max_changes=DEFAULT_MAX_CHANGES, time_budget_ms=DEFAULT_TIME_BUDGET_MS,
+           batch_size=DEFAULT_BATCH_SIZE, beam_width=DEFAULT_BEAM_WIDTH, top_k=5):
+    """
+    Cari kombinasi perubahan termurah yang membawa will_leave ke bawah target
+
+    Args:
+        engine: Scoring engine (lihat scoring.load_engine)
+        record (dict): Raw employee (format request predict)
+        target_risk (str): 'Medium' (keluar dari High) atau 'Low'
+        target_probability (float): Override threshold target (will_leave <= nilai ini)
+        actions (list): Subset ACTIONS yang boleh dipakai
+        cost_weights (dict): Pengali biaya per action
+        max_changes (int): Maksimum jumlah fitur yang diubah sekaligus
+        time_budget_ms (float): Batas waktu pencarian
+        batch_size (int): Jumlah kandidat per predict_proba call
+        beam_width (int): Maksimum kandidat non-target yang diekspansi per level
+        top_k (int): Jumlah solusi yang dikembalikan
+
+    Returns:
+        dict: base probability, solusi terurut biaya, dan statistik pencarian
+
+    Raises:
+        SearchError: parameter atau employee tidak valid (semua validasi input ada di sini)
+    """
+    started = time.perf_counter()
+    time_budget_ms = _float_param(time_budget_ms, 'time_budget_ms')
+    if not 0 < time_budget_ms <= MAX_TIME_BUDGET_MS:
+        raise SearchError(f"time_budget_ms must be between 0 and {MAX_TIME_BUDGET_MS}")
+    deadline = started + time_budget_ms / 1000.0
+    if target_probability is None:
+        if not isinstance(target_risk, str) or target_risk not in TARGET_THRESHOLDS:
+            raise SearchError(f"target_risk must be one of {list(TARGET_THRESHOLDS)}")
+        threshold = TARGET_THRESHOLDS[target_risk]
+    else:
+        threshold = _float_param(target_probability, 'target_probability')
+        if not 0.0 <= threshold <= 1.0:
+            raise SearchError("target_probability must be between 0 and 1")
+    max_changes = _int_param(max_changes, 'max_changes')
+    if not 1 <= max_changes <= len(ACTIONS):
+        raise SearchError(f"max_changes must be between 1 and {len(ACTIONS)}")
+    top_k = _int_param(top_k, 'top_k')
+    if not 1 <= top_k <= MAX_TOP_K:
+        raise SearchError(f"top_k must be between 1 and {MAX_TOP_K}")
+
+    base_x = encode_employee(record)
+    base_probability = float(engine.predict_proba(base_x[None, :])[0, 1])
+    options = action_options(record, actions, cost_weights)
+    min_option_cost = min((c.cost for _, opts in options for c in opts), default=0.0)
+
+    solutions = []
+    best_cost = float('inf')
+    explored = 0
+    batches = 0
+    stopped = 'exhausted'
+    frontier = [Candidate(changes=(), cost=0.0, last_action=-1, will_leave=base_probability)]
+
+    if base_probability <= threshold:
+        frontier = []
+        stopped = 'already_in_target'
+
+    for _ in range(max_changes):
+        if not frontier:
+            break
+
+        # Ekspansi: tambah satu perubahan pada action dengan index lebih besar (tanpa duplikat kombinasi)
+        expansions = []
+        for candidate in frontier:
+            if candidate.cost + min_option_cost >= best_cost:
+                continue
+            for action_index in range(candidate.last_action + 1, len(options)):
+                for change in options[action_index][1]:
+                    cost = candidate.cost + change.cost
+                    if cost < best_cost:
+                        expansions.append(Candidate(candidate.changes + (change,), cost, action_index))
+        expansions.sort(key=lambda c: c.cost)
+
+        scored = []
+        for start in range(0, len(expansions), batch_size):
+            if time.perf_counter() >= deadline:
+                stopped = 'time_budget'
+                break
+            batch = [c for c in expansions[start:start + batch_size] if c.cost < best_cost]
+            if not batch:
+                break
+            for candidate, probability in zip(batch, _score_batch(engine, base_x, batch)):
+                candidate.will_leave = float(probability)
+                if probability <= threshold:
+                    solutions.append(candidate)
+                    best_cost = min(best_cost, candidate.cost)
+                else:
+                    scored.append(candidate)
+            explored += len(batch)
+            batches += 1
+
+        if stopped == 'time_budget':
+            break
+        frontier = _prune_dominated(scored, beam_width)
+
+    solutions.sort(key=lambda c: (c.cost, c.will_leave))
+    return {
+        "base_probability": base_probability,
+        "base_risk_level": risk_level(base_probability),
+        "target_risk": target_risk,
+        "target_probability": threshold,
+        "reached": bool(solutions) or stopped == 'already_in_target',
+        "suggestions": [
+            {
+                "changes": [{"feature": c.feature, "from": c.before, "to": c.after,
+                             "cost": round(c.cost, 4), "action": c.label} for c in solution.changes],
+                "cost": round(solution.cost, 4),
+                "will_leave": solution.will_leave,
+                "risk_level": risk_level(solution.will_leave),
+            }
+            for solution in solutions[:top_k]
+        ],
+        "explored": explored,
+        "batches": batches,
+        "stopped": stopped,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
@@ -0,0 +1,442 @@
+"""
+Streaming feature-drift monitor untuk payload prediksi
+
+Setiap request meng-update sketch berukuran tetap per fitur:
+- Numerik: histogram dengan bin tetap dari quantile dataset training (searchsorted +
+  bincount per batch, langsung di matrix hasil encode_records)
+- Kategorikal (kolom asli di CATEGORICAL_MAPPINGS): counter per kategori yang dikenal plus
+  bucket "unknown" untuk nilai yang tidak ada di mapping (termasuk field kosong / tidak
+  dikirim); nilai seperti itu di-encode menjadi semua-nol (sama dengan kategori baseline)
+  tanpa error, jadi hanya terlihat di sini
+
+PSI dan KS dihitung terhadap reference profile (histogram yang sama dari dataset CSV). KS
+dihitung dari CDF per bin, jadi merupakan batas bawah KS exact. Evaluasi berkala
+(ATTRITION_DRIFT_INTERVAL detik) mencatat fitur yang melewati batas PSI ke stderr.
+
+Reference profile tidak pernah dihitung di dalam request: di-load dari artifact JSON
+(python -m utils.drift --build-reference, ikut di-deploy bersama model). Kalau artifact
+tidak ada, reference dibangun sekali di background thread (dan disimpan di CACHE_DIR);
+sampai selesai, update dari request di-skip.
+
+Konfigurasi (env):
+    ATTRITION_DRIFT_MONITOR=0          matikan monitor (default aktif)
+    ATTRITION_DRIFT_REFERENCE=path     artifact reference (default: MODEL_DIR/drift_reference.json)
+    ATTRITION_DRIFT_INTERVAL=300       interval evaluasi berkala (detik)
+    ATTRITION_DRIFT_PSI_ALERT=0.25     batas PSI untuk alert
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.artifacts import load_artifact, save_artifact
+from utils.scoring import (CACHE_DIR, CATEGORICAL_MAPPINGS, CONSTANT_COLUMNS, FEATURE_INDEX, MODEL_DIR,
+                           NUMERICAL_COLUMNS, active_dataset_path, dataset_fingerprint, encode_frame,
+                           encode_records, load_dataset)
+
+DRIFT_ENABLED = os.getenv('ATTRITION_DRIFT_MONITOR', '1').lower() not in ('0', 'false', 'no')
+EVAL_INTERVAL_S = float(os.getenv('ATTRITION_DRIFT_INTERVAL', '300'))
+PSI_ALERT = float(os.getenv('ATTRITION_DRIFT_PSI_ALERT', '0.25'))
+REFERENCE_PATH = Path(os.getenv('ATTRITION_DRIFT_REFERENCE', MODEL_DIR / 'drift_reference.json'))
+# Reference yang dibangun di background disimpan di sini (MODEL_DIR bisa read-only)
+CACHED_REFERENCE_PATH = CACHE_DIR / 'drift_reference.json'
+
+# Kolom konstan dan identifier tidak dimonitor
+DRIFT_NUMERICAL_COLUMNS = [col for col in NUMERICAL_COLUMNS
+                           if col not in CONSTANT_COLUMNS and col != 'EmployeeId']
+NUM_BINS = 20
+# Jumlah nilai unknown berbeda yang disimpan sebagai contoh per kolom
+MAX_UNKNOWN_SAMPLES = 10
+# Smoothing proporsi kosong untuk PSI
+PSI_EPSILON = 1e-4
+
+
+def numeric_edges(values, num_bins=NUM_BINS):
+    """
+    Batas bin interior untuk satu kolom numerik reference
+
+    Kolom dengan <= num_bins nilai unik (rating 1-4, level, dst.) mendapat satu bin per
+    nilai; kolom lain dibagi per quantile. Bin pertama / terakhir terbuka ke -inf / +inf.
+    """
+    unique = np.unique(values)
+    if len(unique) <= num_bins:
+        return unique.astype(np.float64)
+    quantiles = np.quantile(values, np.linspace(0, 1, num_bins + 1)[1:-1])
+    return np.unique(np.concatenate([[unique[0]], quantiles]))
+
+
+def psi(reference, current):
+    """Population Stability Index antara dua histogram count"""
+    p = np.maximum(reference / max(reference.sum(), 1), PSI_EPSILON)
+    q = np.maximum(current / max(current.sum(), 1), PSI_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_binned(reference, current):
+    """Statistik KS dari CDF per bin (batas bawah KS exact)"""
+    p = np.cumsum(reference) / max(reference.sum(), 1)
+    q = np.cumsum(current) / max(current.sum(), 1)
+    return float(np.abs(p - q).max())
+
+
+class FeatureSketch:
+    """Histogram numerik + counter kategorikal berukuran tetap"""
+
+    def __init__(self, edges, categories):
+        """
+        Args:
+            edges (dict): Kolom numerik -> batas bin interior (np.ndarray)
+            categories (dict): Kolom kategorikal -> list kategori yang dikenal
+        """
+        self.edges = edges
+        self.categories = categories
+        self.category_index = {col: {value: i for i, value in enumerate(values)}
+                               for col, values in categories.items()}
+        self.columns = np.array([FEATURE_INDEX[col] for col in edges])
+        # Batas bin semua kolom numerik dalam satu matrix (padding +inf), supaya bin index satu
+        # batch dihitung dengan satu perbandingan broadcast: jumlah batas <= nilai
+        width = max(len(e) for e in edges.values())
+        self.edge_matrix = np.full((len(edges), width), np.inf)
+        for i, e in enumerate(edges.values()):
+            self.edge_matrix[i, :len(e)] = e
+        self.bin_counts = np.array([len(e) + 1 for e in edges.values()])
+        self.counts = np.zeros((len(edges), width + 1), dtype=np.int64)
+        # Slot terakhir = unknown
+        self.category_counts = {col: np.zeros(len(values) + 1, dtype=np.int64)
+                                for col, values in categories.items()}
+        self.unknown_samples = {col: {} for col in categories}
+        self.rows = 0
+
+    def update(self, X, records=None, frame=None):
+        """
+        Tambah satu batch
+
+        Args:
+            X (np.ndarray): Matrix (n, 47) hasil encode_records / encode_frame
+            records (list): Raw input dicts (untuk kategori), atau
+            frame (pd.DataFrame): Raw rows dengan kolom kategorikal asli
+        """
+        values = X[:, self.columns]
+        bins = (values[:, :, None] >= self.edge_matrix[None]).sum(axis=2)
+        np.minimum(bins, self.bin_counts - 1, out=bins)
+        bins += np.arange(len(self.columns)) * self.counts.shape[1]
+        self.counts += np.bincount(bins.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+        for col, index in self.category_index.items():
+            if frame is not None:
+                if col in frame.columns:
+                    value_counts = frame[col].value_counts(dropna=False)
+                    observed = [(None if value != value else value, int(count))
+                                for value, count in value_counts.items()]
+                else:
+                    observed = [(None, len(frame))]
+            else:
+                tally = {}
+                for record in records:
+                    value = record.get(col)
+                    if not isinstance(value, (str, int, float, type(None))):
+                        value = str(value)
+                    tally[value] = tally.get(value, 0) + 1
+                observed = tally.items()
+            counts = self.category_counts[col]
+            for value, count in observed:
+                slot = index.get(value)
+                if slot is None:
+                    slot = len(counts) - 1
+                    samples = self.unknown_samples[col]
+                    if value in samples or len(samples) < MAX_UNKNOWN_SAMPLES:
+                        samples[value] = samples.get(value, 0) + count
+                counts[slot] += count
+
+        self.rows += len(X)
+
+    @property
+    def numeric_counts(self):
+        """Kolom numerik -> count per bin (tanpa padding)"""
+        return {col: self.counts[i, :n] for i, (col, n) in enumerate(zip(self.edges, self.bin_counts))}
+
+    def histograms(self):
+        return {
+            'numeric': {col: counts.tolist() for col, counts in self.numeric_counts.items()},
+            'categorical': {col: counts.tolist() for col, counts in self.category_counts.items()},
+        }
+
+    @classmethod
+    def from_histograms(cls, edges, categories, histograms, rows):
+        """Kebalikan histograms(): sketch dari edges + count yang disimpan sebagai JSON"""
+        sketch = cls({col: np.asarray(e, dtype=np.float64) for col, e in edges.items()}, categories)
+        for i, col in enumerate(sketch.edges):
+            counts = histograms['numeric'][col]
+            sketch.counts[i, :len(counts)] = counts
+        for col, counts in histograms['categorical'].items():
+            sketch.category_counts[col][:] = counts
+        sketch.rows = int(rows)
+        return sketch
+
+
+def build_reference(dataset_path=None):
+    """
+    Reference profile dari dataset training (CSV / columnar)
+
+    Returns:
+        FeatureSketch berisi histogram dataset, dengan atribut dataset_fingerprint
+    """
+    df = load_dataset(dataset_path)
+    X = encode_frame(df)
+    edges = {col: numeric_edges(X[:, FEATURE_INDEX[col]]) for col in DRIFT_NUMERICAL_COLUMNS}
+    categories = {col: list(mapping) for col, mapping in CATEGORICAL_MAPPINGS.items()}
+    reference = FeatureSketch(edges, categories)
+    reference.update(X, frame=df)
+    reference.dataset_fingerprint = dataset_fingerprint(dataset_path or active_dataset_path())
+    return reference
+
+
+def save_reference(reference, path=REFERENCE_PATH):
+    """Simpan reference profile sebagai artifact JSON (edges + count, beberapa KB)"""
+    meta = {'dataset_fingerprint': getattr(reference, 'dataset_fingerprint', None),
+            'rows': reference.rows, 'num_bins': NUM_BINS}
+    save_artifact(path, meta, {
+        'edges': {col: edges.tolist() for col, edges in reference.edges.items()},
+        'categories': reference.categories,
+        'histograms': reference.histograms(),
+    })
+
+
+def load_reference(path=REFERENCE_PATH):
+    """
+    Load reference profile dari artifact JSON (tanpa pandas / dataset)
+
+    Returns:
+        FeatureSketch, atau None kalau artifact tidak ada / rusak / beda konfigurasi bin
+    """
+    artifact = load_artifact(path, num_bins=NUM_BINS)
+    if artifact is None:
+        return None
+    try:
+        reference = FeatureSketch.from_histograms(artifact['edges'], artifact['categories'],
+                                                  artifact['histograms'], artifact['meta']['rows'])
+    except (KeyError, ValueError, TypeError):
+        return None
+    if set(reference.edges) != set(DRIFT_NUMERICAL_COLUMNS):
+        return None
+    reference.dataset_fingerprint = artifact['meta'].get('dataset_fingerprint')
+    return reference
+
+
+class DriftMonitor:
+    """
+    Sketch payload serving + perbandingan PSI / KS terhadap reference
+
+    update() dipanggil per request (atau batch) dari handler; report() bisa dipanggil kapan
+    saja. Memori tetap: ukuran sketch tidak bergantung pada jumlah request.
+    """
+
+    def __init__(self, reference, interval=EVAL_INTERVAL_S, psi_alert=PSI_ALERT):
+        self.reference = reference
+        self.interval = interval
+        self.psi_alert = psi_alert
+        self.current = FeatureSketch(reference.edges, reference.categories)
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.last_evaluated = time.monotonic()
+        self.last_report = None
+        self.update_s = 0.0
+
+    def update(self, records=None, X=None, frame=None):
+        """
+        Tambah satu request / batch
+
+        Args:
+            records (list): Raw input dicts (payload request), atau
+            X (np.ndarray): Hasil encode_records / encode_frame kalau sudah ada
+            frame (pd.DataFrame): Raw rows (misalnya chunk CSV) sebagai ganti records
+        """
+        started = time.perf_counter()
+        if X is None:
+            X = encode_frame(frame) if frame is not None else encode_records(records)
+        with self._lock:
+            self.current.update(X, records=records, frame=frame)
+            self.update_s += time.perf_counter() - started
+            due = time.monotonic() - self.last_evaluated >= self.interval
+            if due:
+                self.last_evaluated = time.monotonic()
+        if due:
+            self.evaluate()
+
+    def report(self):
+        """PSI / KS per fitur terhadap reference, diurutkan dari PSI tertinggi"""
+        with self._lock:
+            numeric = {col: counts.copy() for col, counts in self.current.numeric_counts.items()}
+            categorical = {col: counts.copy() for col, counts in self.current.category_counts.items()}
+            unknown_samples = {col: dict(samples) for col, samples in self.current.unknown_samples.items() if samples}
+            rows, update_s = self.current.rows, self.update_s
+
+        features = {}
+        for col, counts in numeric.items():
+            reference = self.reference.numeric_counts[col]
+            features[col] = {'type': 'numeric', 'psi': psi(reference, counts), 'ks': ks_binned(reference, counts)}
+        for col, counts in categorical.items():
+            reference = self.reference.category_counts[col]
+            features[col] = {
+                'type': 'categorical',
+                'psi': psi(reference, counts),
+                'unknown_rate': float(counts[-1] / rows) if rows else 0.0,
+            }
+        ranked = dict(sorted(features.items(), key=lambda item: -item[1]['psi']))
+        return {
+            'rows': rows,
+            'reference_rows': self.reference.rows,
+            'reference_fingerprint': getattr(self.reference, 'dataset_fingerprint', None),
+            'started_at': self.started_at,
+            'update_us_per_row': update_s / rows * 1e6 if rows else None,
+            'psi_alert': self.psi_alert,
+            'alerts': [col for col, stats in ranked.items() if rows and stats['psi'] > self.psi_alert],
+            'unknown_categories': unknown_samples,
+            'features': ranked,
+        }
+
+    def evaluate(self):
+        """Evaluasi berkala: simpan laporan terakhir dan log fitur yang drift"""
+        report = self.report()
+        report['evaluated_at'] = time.time()
+        self.last_report = report
+        if report['alerts']:
+            print(f"Feature drift (PSI > {self.psi_alert}) over {report['rows']} rows: "
+                  f"{', '.join(report['alerts'])}", file=sys.stderr)
+        if report['unknown_categories']:
+            print(f"Unknown categories encoded as baseline: {report['unknown_categories']}", file=sys.stderr)
+        return report
+
+    def histograms(self):
+        """Count mentah sketch serving dan reference (untuk dibandingkan / digabung antar proses)"""
+        with self._lock:
+            current = self.current.histograms()
+        return {
+            'edges': {col: edges.tolist() for col, edges in self.reference.edges.items()},
+            'categories': self.reference.categories,
+            'reference': self.reference.histograms(),
+            'current': current,
+        }
+
+
+_MONITOR = None
+# 'disabled', 'building', 'ready' atau 'failed'
+_MONITOR_STATE = None
+_MONITOR_LOCK = threading.Lock()
+
+
+def _build_monitor_in_background():
+    """Bangun reference dari dataset di luar request, lalu aktifkan monitor"""
+    global _MONITOR, _MONITOR_STATE
+    try:
+        reference = build_reference()
+        try:
+            save_reference(reference, CACHED_REFERENCE_PATH)
+        except OSError as e:
+            print(f"Drift reference not cached: {e}", file=sys.stderr)
+        _MONITOR = DriftMonitor(reference)
+        _MONITOR_STATE = 'ready'
+    except Exception as e:
+        _MONITOR_STATE = 'failed'
+        print(f"Drift monitor disabled: {type(e).__name__}: {e}", file=sys.stderr)
+
+
+def get_drift_monitor():
+    """
+    DriftMonitor per proses, atau None kalau dimatikan / reference belum siap
+
+    Reference di-load dari artifact JSON; kalau tidak ada, dibangun di background thread
+    dan panggilan berikutnya me-return None sampai selesai (request tidak pernah menunggu).
+    """
+    global _MONITOR, _MONITOR_STATE
+    if _MONITOR_STATE is None:
+        with _MONITOR_LOCK:
+            if _MONITOR_STATE is None:
+                if not DRIFT_ENABLED:
+                    _MONITOR_STATE = 'disabled'
+                    return None
+                reference = load_reference(REFERENCE_PATH) or load_reference(CACHED_REFERENCE_PATH)
+                if reference is not None:
+                    _MONITOR = DriftMonitor(reference)
+                    _MONITOR_STATE = 'ready'
+                else:
+                    _MONITOR_STATE = 'building'
+                    threading.Thread(target=_build_monitor_in_background, name='drift-reference',
+                                     daemon=True).start()
+    return _MONITOR
+
+
+def drift_status():
+    """Status monitor untuk endpoint GET: laporan kalau siap, selain itu state-nya"""
+    monitor = get_drift_monitor()
+    if monitor is not None:
+        return monitor.report()
+    return {'status': _MONITOR_STATE}
+
+
+def _iter_input_batches(path, chunk_rows=5000):
+    """Batch (records, frame) dari CSV atau prediction log JSONL"""
+    path = Path(path)
+    if path.suffix == '.csv':
+        import pandas as pd
+
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield None, chunk
+        return
+
+    from utils.prediction_log import read_prediction_log
+
+    records = []
+    for entry in read_prediction_log(path):
+        request = entry.get('request')
+        records.extend(r for r in (request if isinstance(request, list) else [request]) if isinstance(r, dict))
+        if len(records) >= chunk_rows:
+            yield records, None
+            records = []
+    if records:
+        yield records, None
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Drift fitur data input terhadap dataset training")
+    parser.add_argument('--input', help="CSV atau prediction log JSONL (.jsonl / .gz)")
+    parser.add_argument('--dataset', help="Dataset reference (default: active_dataset_path())")
+    parser.add_argument('--json', action='store_true', help="Print laporan lengkap sebagai JSON")
+    parser.add_argument('--build-reference', action='store_true',
+                        help="Tulis artifact reference untuk serving (ATTRITION_DRIFT_REFERENCE)")
+    parser.add_argument('--output', default=str(REFERENCE_PATH), help="Path artifact untuk --build-reference")
+    args = parser.parse_args()
+
+    if args.build_reference:
+        reference = build_reference(args.dataset)
+        save_reference(reference, args.output)
+        print(f"✅ Drift reference ({reference.rows} rows, {len(reference.edges)} numeric features) "
+              f"written to {args.output}")
+        if not args.input:
+            sys.exit(0)
+    elif not args.input:
+        parser.error("--input or --build-reference is required")
+
+    monitor = DriftMonitor(build_reference(args.dataset), interval=float('inf'))
+    for records, frame in _iter_input_batches(args.input):
+        monitor.update(records, frame=frame)
+    report = monitor.report()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"✅ {report['rows']} rows vs {report['reference_rows']} reference rows")
+        for col, stats in list(report['features'].items())[:15]:
+            flag = '  ⚠️' if col in report['alerts'] else ''
+            extra = f"ks={stats['ks']:.3f}" if stats['type'] == 'numeric' else f"unknown={stats['unknown_rate']:.1%}"
+            print(f"  {col:28s} psi={stats['psi']:.4f}  {extra}{flag}")
+        if report['unknown_categories']:
+            print(f"Unknown categories: {report['unknown_categories']}")
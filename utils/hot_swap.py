@@ -0,0 +1,431 @@
+"""
+Hot model swap tanpa downtime untuk proses serving
+
+Engine yang melayani request dipegang oleh HotSwapEngine. Watcher (thread background)
+mem-poll sumber model; begitu ada versi baru, model di-load dan di-warm-up di thread itu,
+divalidasi dengan canary set dari dataset, lalu pointer engine di-swap secara atomik.
+Request yang sedang berjalan tetap selesai dengan engine lama (acquire() menghitung
+referensi); engine lama baru dilepas setelah semua referensinya selesai (drain).
+
+Sumber model:
+- ModelDirSource   : rf_model.pkl + scaler.pkl di MODEL_DIR (ganti file via rename atomik)
+- ManifestSource   : versi tertinggi di manifest LOCAL_MODELS_DIR (utils/model_store.py)
+  untuk satu model name + stage, hasil download MLflowModelManager. Dengan
+  ATTRITION_ENGINE=numpy/mmap, forest di-export sekali ke rf_model_numpy/ di directory
+  versi itu; kalau directory tidak bisa ditulis, engine sklearn dipakai (ada warning)
+
+Semua endpoint yang men-score (predict, what_if, counterfactual, similar, ingest, score
+store) memakai HotSwapEngine yang sama lewat scoring.get_engine(), jadi setelah swap tidak
+ada endpoint yang masih memakai model lama.
+
+Konfigurasi (env):
+    ATTRITION_HOT_SWAP=1                  aktifkan watcher di handler predict
+    ATTRITION_HOT_SWAP_INTERVAL=30        interval poll (detik)
+    ATTRITION_LOCAL_MODELS_DIR=models     pakai ManifestSource (default: ModelDirSource)
+    ATTRITION_MODEL_NAME / ATTRITION_MODEL_STAGE
+    ATTRITION_CANARY_ROWS=200, ATTRITION_CANARY_MAX_DELTA=0.25
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.scoring import (DEFAULT_ENGINE, ENGINES, MODEL_DIR, NUMPY_ARTIFACT_DIR, encode_frame,
+                           load_dataset, load_engine, model_version, risk_level_codes)
+
+HOT_SWAP_ENABLED = os.getenv('ATTRITION_HOT_SWAP', '').lower() in ('1', 'true', 'yes')
+POLL_INTERVAL_S = float(os.getenv('ATTRITION_HOT_SWAP_INTERVAL', '30'))
+CANARY_ROWS = int(os.getenv('ATTRITION_CANARY_ROWS', '200'))
+# Rata-rata |selisih will_leave| maksimum terhadap model yang sedang aktif di canary set
+CANARY_MAX_DELTA = float(os.getenv('ATTRITION_CANARY_MAX_DELTA', '0.25'))
+WARMUP_ROUNDS = 3
+
+
+class CanaryError(ValueError):
+    """Model kandidat gagal validasi canary (tidak di-swap)"""
+
+
+class EngineHandle:
+    """Satu generasi engine + jumlah request yang sedang memakainya"""
+
+    def __init__(self, engine, source_key=None):
+        self.engine = engine
+        self.version = engine.version
+        self.source_key = source_key
+        self.active = 0
+        self.retired = False
+        self.loaded_at = time.time()
+
+
+class HotSwapEngine:
+    """
+    Pointer ke engine aktif yang bisa di-swap saat serving
+
+    Atribut engine (predict_proba, classes_, version, timings, ...) didelegasikan ke engine
+    aktif, jadi bisa dipakai di tempat engine biasa. Untuk request yang memakai beberapa
+    atribut sekaligus, pakai `with hot.acquire() as engine:` supaya semuanya berasal dari
+    engine yang sama dan engine itu tidak dilepas di tengah request.
+    """
+
+    def __init__(self, engine, source_key=None):
+        self._current = EngineHandle(engine, source_key)
+        self._lock = threading.Lock()
+        self._draining = []
+        self.swaps = 0
+        self.released = 0
+        self.history = []
+
+    def __getattr__(self, name):
+        return getattr(self._current.engine, name)
+
+    @property
+    def current(self):
+        return self._current
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            handle = self._current
+            handle.active += 1
+        try:
+            yield handle.engine
+        finally:
+            with self._lock:
+                handle.active -= 1
+                if handle.retired and handle.active == 0:
+                    self._release(handle)
+
+    def swap(self, engine, source_key=None, report=None):
+        """Ganti engine aktif; engine lama dilepas setelah request yang memakainya selesai"""
+        new_handle = EngineHandle(engine, source_key)
+        with self._lock:
+            old_handle = self._current
+            self._current = new_handle
+            old_handle.retired = True
+            self.swaps += 1
+            self.history.append({'from': old_handle.version, 'to': new_handle.version,
+                                 'swapped_at': time.time(), 'report': report})
+            del self.history[:-20]
+            if old_handle.active == 0:
+                self._release(old_handle)
+            else:
+                self._draining.append(old_handle)
+        print(f"Swapped model {old_handle.version} -> {new_handle.version}", file=sys.stderr)
+        return old_handle
+
+    def _release(self, handle):
+        """Dipanggil dengan lock dipegang"""
+        if handle in self._draining:
+            self._draining.remove(handle)
+        engine, handle.engine = handle.engine, None
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            close()
+        self.released += 1
+
+    def status(self):
+        with self._lock:
+            return {
+                'version': self._current.version,
+                'source_key': self._current.source_key,
+                'loaded_at': self._current.loaded_at,
+                'active_requests': self._current.active,
+                'draining': [{'version': h.version, 'active_requests': h.active} for h in self._draining],
+                'swaps': self.swaps,
+                'released': self.released,
+                'history': list(self.history),
+            }
+
+
+class ModelDirSource:
+    """rf_model.pkl + scaler.pkl di satu directory; key = checksum file (model_version)"""
+
+    def __init__(self, model_dir=None, kind=None):
+        self.model_dir = Path(model_dir or MODEL_DIR)
+        self.kind = kind
+
+    def poll(self):
+        version = model_version(self.model_dir)
+        return None if version == 'unknown' else version
+
+    def version(self, key):
+        return key
+
+    def load(self, key):
+        return load_engine(self.kind, self.model_dir)
+
+
+def numpy_engine(engine, artifact_dir, mmap=False):
+    """
+    NumpyForest untuk SklearnEngine hasil load_engine_from_dir
+
+    Artifact di-export sekali ke artifact_dir dan di-reuse selama versinya sama. Kalau export
+    gagal (mis. directory read-only), engine sklearn yang dikembalikan.
+    """
+    from utils.numpy_forest import NumpyForest, export_forest
+
+    try:
+        try:
+            forest = NumpyForest.load(artifact_dir, mmap=mmap)
+        except FileNotFoundError:
+            forest = None
+        if forest is None or forest.version != engine.version:
+            export_forest(engine.model, engine.scaler, artifact_dir, engine.version)
+            forest = NumpyForest.load(artifact_dir, mmap=mmap)
+    except OSError as e:
+        print(f"NumPy forest export to {artifact_dir} failed ({e}), serving sklearn engine", file=sys.stderr)
+        return engine
+    forest.metadata = engine.metadata
+    return forest
+
+
+class ManifestSource:
+    """Versi tertinggi (optional: stage tertentu) untuk satu model di manifest lokal"""
+
+    def __init__(self, models_dir, model_name, stage='Production', kind=None):
+        from utils.model_store import ModelManifest
+
+        self.manifest = ModelManifest(models_dir)
+        self.model_name = model_name
+        self.stage = stage or None
+        self.kind = kind or DEFAULT_ENGINE
+        if self.kind not in ENGINES:
+            raise ValueError(f"Unknown engine '{self.kind}', expected one of {ENGINES}")
+        self._entries = {}
+
+    def poll(self):
+        entry = self.manifest.latest(self.model_name, stage=self.stage)
+        if entry is None:
+            return None
+        # content_id tidak berubah saat model.pkl di-recompress (checksum file berubah)
+        identity = entry.get('content_id') or entry.get('checksum') or entry['local_directory']
+        key = f"{entry.get('version')}:{identity}"
+        self._entries[key] = entry
+        return key
+
+    def version(self, key):
+        """Versi engine untuk key tanpa load model (None kalau metadata belum punya content_id)"""
+        content_id = self._entries[key].get('content_id')
+        return content_id[:12] if content_id else None
+
+    def load(self, key):
+        from utils.model_store import load_engine_from_dir
+
+        local_dir = Path(self._entries[key]['local_directory'])
+        engine = load_engine_from_dir(local_dir)
+        if self.kind == 'sklearn':
+            return engine
+        return numpy_engine(engine, local_dir / NUMPY_ARTIFACT_DIR, mmap=(self.kind == 'mmap'))
+
+
+def canary_matrix(rows=CANARY_ROWS, seed=0):
+    """Canary input set: sample row dataset (ter-encode) untuk warm-up dan validasi"""
+    df = load_dataset()
+    return encode_frame(df.sample(min(rows, len(df)), random_state=seed))
+
+
+def warm_up(engine, X):
+    """Panggil predict_proba beberapa kali (single row + batch) sebelum engine melayani request"""
+    timings = {}
+    for name, batch in (('single', X[:1]), ('batch', X)):
+        latencies = []
+        for _ in range(WARMUP_ROUNDS):
+            start = time.perf_counter()
+            engine.predict_proba(batch)
+            latencies.append(time.perf_counter() - start)
+        timings[f'{name}_ms'] = min(latencies) * 1000
+    return timings
+
+
+def validate_candidate(engine, X, reference=None, max_mean_delta=CANARY_MAX_DELTA):
+    """
+    Validasi engine kandidat di canary set
+
+    Args:
+        engine: Engine kandidat
+        X (np.ndarray): Canary matrix
+        reference: Engine yang sedang aktif (optional, untuk batas perubahan output)
+        max_mean_delta (float): Batas rata-rata |selisih will_leave| terhadap reference
+
+    Returns:
+        dict: laporan validasi
+
+    Raises:
+        CanaryError: output tidak valid atau berubah terlalu jauh dari reference
+    """
+    if [int(c) for c in engine.classes_] != [0, 1]:
+        raise CanaryError(f"Unexpected classes {[int(c) for c in engine.classes_]}, expected [0, 1]")
+    proba = np.asarray(engine.predict_proba(X))
+    if proba.shape != (len(X), 2):
+        raise CanaryError(f"predict_proba returned shape {proba.shape}, expected {(len(X), 2)}")
+    if not np.isfinite(proba).all() or (proba < 0).any() or (proba > 1).any():
+        raise CanaryError("predict_proba returned values outside [0, 1]")
+    if np.abs(proba.sum(axis=1) - 1).max() > 1e-6:
+        raise CanaryError("predict_proba rows do not sum to 1")
+
+    report = {'rows': int(len(X)), 'mean_will_leave': float(proba[:, 1].mean())}
+    if reference is not None:
+        reference_proba = np.asarray(reference.predict_proba(X))
+        delta = np.abs(proba[:, 1] - reference_proba[:, 1])
+        report.update(
+            mean_delta=float(delta.mean()),
+            max_delta=float(delta.max()),
+            risk_flip_rate=float((risk_level_codes(proba[:, 1]) != risk_level_codes(reference_proba[:, 1])).mean()),
+        )
+        if report['mean_delta'] > max_mean_delta:
+            raise CanaryError(f"Mean will_leave delta {report['mean_delta']:.3f} exceeds {max_mean_delta}")
+    return report
+
+
+class ModelWatcher:
+    """
+    Thread background: poll sumber, load + warm-up + canary, lalu swap
+
+    Key yang gagal divalidasi tidak dicoba ulang sampai sumber berubah lagi.
+    """
+
+    def __init__(self, hot_engine, source, interval=POLL_INTERVAL_S, canary_rows=CANARY_ROWS):
+        self.hot_engine = hot_engine
+        self.source = source
+        self.interval = interval
+        self.canary_rows = canary_rows
+        self._canary = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_poll = None
+        self.last_error = None
+        self.failed_key = None
+
+    def canary(self):
+        if self._canary is None:
+            self._canary = canary_matrix(self.canary_rows)
+        return self._canary
+
+    def check(self):
+        """Satu siklus poll; return True kalau engine di-swap"""
+        self.last_poll = time.time()
+        key = self.source.poll()
+        if key is None or key == self.hot_engine.current.source_key or key == self.failed_key:
+            return False
+
+        started = time.perf_counter()
+        try:
+            engine = self.source.load(key)
+            X = self.canary()
+            report = {'warmup': warm_up(engine, X)}
+            with self.hot_engine.acquire() as reference:
+                report['canary'] = validate_candidate(engine, X, reference)
+        except Exception as e:
+            self.failed_key = key
+            self.last_error = {'key': key, 'error': f"{type(e).__name__}: {e}", 'at': time.time()}
+            print(f"Model candidate {key} rejected: {self.last_error['error']}", file=sys.stderr)
+            return False
+
+        report['prepare_s'] = time.perf_counter() - started
+        self.hot_engine.swap(engine, source_key=key, report=report)
+        self.failed_key = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = {'error': f"{type(e).__name__}: {e}", 'at': time.time()}
+                print(f"Model watcher error: {self.last_error['error']}", file=sys.stderr)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self):
+        return {
+            'interval_s': self.interval,
+            'last_poll': self.last_poll,
+            'last_error': self.last_error,
+            'running': self._thread is not None and self._thread.is_alive(),
+        }
+
+
+def default_source(kind=None):
+    """ManifestSource kalau ATTRITION_LOCAL_MODELS_DIR diset, selain itu ModelDirSource"""
+    models_dir = os.getenv('ATTRITION_LOCAL_MODELS_DIR')
+    if models_dir:
+        return ManifestSource(models_dir, os.getenv('ATTRITION_MODEL_NAME', 'attrition_model'),
+                              os.getenv('ATTRITION_MODEL_STAGE', 'Production'), kind)
+    return ModelDirSource(kind=kind)
+
+
+_SERVING = None
+_SERVING_LOCK = threading.Lock()
+
+
+def get_serving_engine(kind=None):
+    """
+    HotSwapEngine per proses untuk semua handler yang men-score
+
+    Engine awal di-load dari sumber default (kalau sumber belum punya model, fallback ke
+    MODEL_DIR); watcher hanya jalan kalau ATTRITION_HOT_SWAP aktif.
+
+    Returns:
+        tuple: (HotSwapEngine, ModelWatcher atau None)
+    """
+    global _SERVING
+    if _SERVING is None:
+        with _SERVING_LOCK:
+            if _SERVING is None:
+                source = default_source(kind)
+                key = source.poll()
+                if key is not None:
+                    engine = source.load(key)
+                else:
+                    engine, key = load_engine(kind), None
+                hot_engine = HotSwapEngine(engine, source_key=key)
+                watcher = ModelWatcher(hot_engine, source).start() if HOT_SWAP_ENABLED else None
+                _SERVING = (hot_engine, watcher)
+    return _SERVING
+
+
+def serving_model_version(kind=None):
+    """
+    Versi model yang dilayani proses ini, tanpa load engine kalau bisa
+
+    Engine aktif kalau sudah di-load; selain itu versi yang akan di-load get_serving_engine()
+    dari sumber default. Dipakai untuk cek staleness artifact (score store, PDP, importance).
+    """
+    if _SERVING is not None:
+        return _SERVING[0].version
+    source = default_source(kind)
+    key = source.poll()
+    if key is None:
+        return model_version()
+    version = source.version(key)
+    return version if version is not None else get_serving_engine(kind)[0].version
+
+
+def load_serving_model(kind=None, model_dir=None):
+    """
+    Engine untuk offline job (score store, PDP, permutation importance)
+
+    model_dir kalau diberikan; selain itu versi terbaru dari sumber default, jadi artifact
+    job di-key dengan versi yang sama dengan yang dilayani (serving_model_version()).
+    """
+    if model_dir:
+        return load_engine(kind, model_dir)
+    source = default_source(kind)
+    key = source.poll()
+    return source.load(key) if key is not None else load_engine(kind)
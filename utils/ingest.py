@@ -0,0 +1,217 @@
+"""
+Incremental ingest untuk delta data HR (upsert berdasarkan EmployeeId)
+
+Delta di-merge ke dataset dan hasilnya ditulis atomik ke INGEST_DATASET_PATH (salinan di
+CACHE_DIR, bukan CSV statis yang ikut di-deploy; filesystem serverless read-only). Setelah
+ingest pertama, active_dataset_path() menunjuk ke salinan itu untuk semua reader. Setiap
+turunan di-update hanya dengan row yang benar-benar berubah:
+- score store: hanya row berubah/baru yang di-score ulang
+- cohort cube: kontribusi lama dikurangi, kontribusi baru ditambahkan
+- analytics aggregates: counter dan sum di-update dengan delta
+
+Semua turunan disimpan dengan fingerprint dataset yang baru, jadi proses lain langsung
+memakai hasilnya tanpa recompute.
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from numbers import Number
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.analytics_store import get_analytics_aggregates, update_analytics_aggregates
+from utils.cohort_cube import get_cohort_cube, update_cohort_cube
+from utils.columnar import COLUMNAR_DIR, SCHEMA_FILE, ColumnarDataset, write_columnar
+from utils.score_store import get_score_store, update_score_store
+from utils.scoring import (CATEGORICAL_MAPPINGS, CONSTANT_COLUMNS, INGEST_DATASET_PATH, NUMERICAL_COLUMNS,
+                           active_dataset_path, dataset_fingerprint, get_engine, load_dataset)
+
+MAX_INGEST_ROWS = int(os.getenv('ATTRITION_MAX_INGEST_ROWS', '5000'))
+# Field yang dibaca model: row baru tanpa field ini akan di-score dengan nilai 0 / kategori baseline
+NEW_ROW_REQUIRED_COLUMNS = [col for col in NUMERICAL_COLUMNS if col not in CONSTANT_COLUMNS] + list(CATEGORICAL_MAPPINGS)
+
+_INGEST_LOCK = threading.Lock()
+
+
+class IngestError(ValueError):
+    """Delta tidak valid (dikembalikan sebagai HTTP 400)"""
+
+
+def validate_records(records, df):
+    """
+    Validasi delta dan gabungkan duplikat EmployeeId (record terakhir menang per field)
+
+    Field bernilai null dianggap tidak dikirim (update parsial), bukan menghapus nilai. Row
+    dengan EmployeeId baru harus membawa semua field yang dibaca model.
+
+    Returns:
+        dict: EmployeeId -> field yang di-set
+    """
+    if not isinstance(records, list) or not records:
+        raise IngestError("Provide a non-empty list of employee rows")
+    if len(records) > MAX_INGEST_ROWS:
+        raise IngestError(f"Too many rows ({len(records)}), maximum is {MAX_INGEST_ROWS}")
+
+    numeric = {col for col in df.columns if df[col].dtype.kind in 'if'}
+    integer = {col for col in df.columns if df[col].dtype.kind == 'i'}
+    existing_ids = set(df['EmployeeId'].dropna().astype(int))
+    required = [col for col in NEW_ROW_REQUIRED_COLUMNS if col in df.columns]
+    updates = {}
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise IngestError(f"Row {i} must be a JSON object")
+        employee_id = record.get('EmployeeId')
+        if (isinstance(employee_id, bool) or not isinstance(employee_id, (int, float))
+                or not math.isfinite(employee_id) or int(employee_id) != employee_id):
+            raise IngestError(f"Row {i} needs an integer EmployeeId")
+        unknown = [key for key in record if key not in df.columns]
+        if unknown:
+            raise IngestError(f"Row {i} has unknown columns {unknown}")
+        record = {key: value for key, value in record.items() if value is not None}
+        for key, value in record.items():
+            if key in numeric and (isinstance(value, bool) or not isinstance(value, Number)):
+                raise IngestError(f"Row {i}: {key} must be numeric")
+            if key in numeric and not math.isfinite(value):
+                raise IngestError(f"Row {i}: {key} must be a finite number")
+            if key in integer and int(value) != value:
+                raise IngestError(f"Row {i}: {key} must be an integer")
+            if key not in numeric and not isinstance(value, str):
+                raise IngestError(f"Row {i}: {key} must be a string")
+        updates.setdefault(int(employee_id), {}).update(record, EmployeeId=int(employee_id))
+
+    for employee_id, fields in updates.items():
+        if employee_id in existing_ids:
+            continue
+        missing = [col for col in required if col not in fields]
+        if missing:
+            raise IngestError(f"New EmployeeId {employee_id} is missing required fields {missing}")
+        # Kolom konstan (EmployeeCount, StandardHours) diisi seperti di encoding prediksi
+        for col, value in CONSTANT_COLUMNS.items():
+            if col in df.columns and col not in fields:
+                fields[col] = int(value) if col in integer else value
+    return updates
+
+
+def restore_integer_columns(frame, df):
+    """
+    Kembalikan kolom yang integer di dataset asli ke integer (in-place)
+
+    Kolom yang punya nilai kosong (row baru tanpa field itu) memakai nullable Int64, supaya
+    CSV tetap menulis 1444, bukan 1444.0, untuk semua row lain.
+    """
+    for col in df.columns:
+        if df[col].dtype.kind == 'i' and frame[col].dtype.kind != 'i':
+            frame[col] = frame[col].astype(df[col].dtype if frame[col].notna().all() else 'Int64')
+
+
+def merge_delta(df, updates):
+    """
+    Terapkan delta ke dataset
+
+    Returns:
+        tuple: (merged DataFrame, old_rows, new_rows, stats) dengan old_rows = versi lama row
+            yang berubah dan new_rows = versi baru row yang berubah + row baru
+    """
+    import pandas as pd
+
+    indexed = df.set_index('EmployeeId', drop=False)
+    if not indexed.index.is_unique:
+        raise IngestError("Dataset has duplicate EmployeeIds, cannot upsert")
+
+    existing_ids = [employee_id for employee_id in updates if employee_id in indexed.index]
+    inserted_ids = [employee_id for employee_id in updates if employee_id not in indexed.index]
+
+    old_rows = indexed.loc[existing_ids].copy()
+    updated = old_rows.copy()
+    for employee_id in existing_ids:
+        for key, value in updates[employee_id].items():
+            updated.at[employee_id, key] = value
+
+    # Row yang field-nya tidak benar-benar berubah tidak perlu disentuh
+    same = (updated == old_rows) | (updated.isna() & old_rows.isna())
+    changed = ~same.all(axis=1).to_numpy()
+    old_rows, updated = old_rows[changed], updated[changed]
+
+    inserted = pd.DataFrame([updates[employee_id] for employee_id in inserted_ids], columns=df.columns)
+    merged = indexed.copy()
+    merged.loc[updated.index] = updated
+    merged = pd.concat([merged, inserted], ignore_index=True) if len(inserted) else merged.reset_index(drop=True)
+    new_rows = pd.concat([updated.reset_index(drop=True), inserted], ignore_index=True)
+
+    for frame in (merged, new_rows):
+        restore_integer_columns(frame, df)
+
+    stats = {
+        'received': len(updates),
+        'updated': int(changed.sum()),
+        'inserted': len(inserted_ids),
+        'unchanged': int(len(existing_ids) - changed.sum()),
+    }
+    return merged, old_rows.reset_index(drop=True), new_rows, stats
+
+
+def write_dataset(df, path):
+    """Tulis CSV atomik (temp file + rename), lalu refresh versi columnar kalau dipakai"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    if (COLUMNAR_DIR / SCHEMA_FILE).exists():
+        columnar = ColumnarDataset(COLUMNAR_DIR)
+        if columnar.schema.get('source_path') == str(path.resolve()):
+            write_columnar(df, COLUMNAR_DIR, path, columnar.schema['format'])
+
+
+def ingest(records, dataset_path=None):
+    """
+    Upsert delta row dan update score store, cohort cube dan analytics aggregates incremental
+
+    Args:
+        records (list): Row employee (EmployeeId wajib; field lain optional untuk update parsial)
+        dataset_path (str): Dataset CSV yang di-update di tempat (default: baca
+            active_dataset_path(), tulis ke INGEST_DATASET_PATH)
+
+    Returns:
+        dict: statistik ingest (updated, inserted, unchanged, rescored, ...)
+    """
+    started = time.perf_counter()
+
+    # Rescore dengan engine serving; engine ini tidak di-swap sampai ingest selesai
+    with _INGEST_LOCK, get_engine().acquire() as engine:
+        source_path = Path(dataset_path) if dataset_path else active_dataset_path()
+        dataset_path = Path(dataset_path) if dataset_path else INGEST_DATASET_PATH
+        df = load_dataset(source_path)
+        updates = validate_records(records, df)
+
+        # Pastikan semua turunan current terhadap dataset sebelum delta
+        get_score_store(source_path)
+        get_cohort_cube(source_path)
+        get_analytics_aggregates(source_path)
+
+        merged, old_rows, new_rows, stats = merge_delta(df, updates)
+        if len(new_rows) == 0:
+            return dict(stats, rescored=0, dataset_fingerprint=dataset_fingerprint(source_path),
+                        elapsed_ms=(time.perf_counter() - started) * 1000)
+
+        write_dataset(merged, dataset_path)
+        fingerprint = dataset_fingerprint(dataset_path)
+
+        store = update_score_store(engine, new_rows, fingerprint)
+        cube = update_cohort_cube(new_rows, store, fingerprint, dataset_path)
+        aggregates = update_analytics_aggregates(old_rows, new_rows, fingerprint)
+
+    return dict(
+        stats,
+        rescored=int(len(new_rows)),
+        rows=int(len(merged)),
+        dataset_fingerprint=fingerprint,
+        model_version=store.meta['model_version'],
+        cube_update=cube.meta['last_update'],
+        analytics=aggregates.summary(),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
@@ -0,0 +1,81 @@
+"""
+Metric evaluasi model (NumPy-only, tanpa sklearn.metrics)
+"""
+
+import numpy as np
+
+
+def roc_auc(y_true, y_score):
+    """ROC AUC via Mann-Whitney U (rank rata-rata untuk ties)"""
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return float('nan')
+
+    order = np.argsort(y_score, kind='mergesort')
+    sorted_scores = y_score[order]
+    ranks = np.empty(len(y_score), dtype=np.float64)
+    # Rank rata-rata per grup nilai yang sama
+    _, first, counts = np.unique(sorted_scores, return_index=True, return_counts=True)
+    average_ranks = first + (counts + 1) / 2.0
+    ranks[order] = np.repeat(average_ranks, counts)
+    return float((ranks[y_true].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+
+def accuracy(y_true, y_score, threshold=0.5):
+    """Accuracy dengan prediction = score > threshold (sama dengan predict endpoint)"""
+    return float(np.mean((np.asarray(y_score) > threshold) == np.asarray(y_true).astype(bool)))
+
+
+def log_loss(y_true, y_score, eps=1e-15):
+    y_true = np.asarray(y_true, dtype=np.float64)
+    p = np.clip(np.asarray(y_score, dtype=np.float64), eps, 1 - eps)
+    return float(-np.mean(y_true * np.log(p) + (1 - y_true) * np.log(1 - p)))
+
+
+METRICS = {
+    'auc': roc_auc,
+    'accuracy': accuracy,
+    'log_loss': log_loss,
+}
+
+# Metric di mana nilai lebih kecil lebih baik
+LOWER_IS_BETTER = {'log_loss'}
+
+
+def brier_score(y_true, y_score):
+    """Mean squared error probabilitas terhadap label 0/1"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    return float(np.mean((np.asarray(y_score, dtype=np.float64) - y_true) ** 2))
+
+
+def calibration_bins(y_true, y_score, n_bins=10):
+    """
+    Reliability table dengan bin lebar sama di [0, 1]
+
+    Returns:
+        list: per bin yang terisi {'low', 'high', 'count', 'mean_score', 'observed_rate'}
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    edges = np.linspace(0.0, 1.0, n_bins + 1)
+    index = np.clip(np.searchsorted(edges, y_score, side='right') - 1, 0, n_bins - 1)
+    counts = np.bincount(index, minlength=n_bins)
+    score_sums = np.bincount(index, weights=y_score, minlength=n_bins)
+    label_sums = np.bincount(index, weights=y_true, minlength=n_bins)
+    return [{
+        'low': float(edges[i]),
+        'high': float(edges[i + 1]),
+        'count': int(counts[i]),
+        'mean_score': float(score_sums[i] / counts[i]),
+        'observed_rate': float(label_sums[i] / counts[i]),
+    } for i in range(n_bins) if counts[i]]
+
+
+def expected_calibration_error(y_true, y_score, n_bins=10):
+    """ECE: rata-rata |mean score - observed rate| per bin, dibobot jumlah row"""
+    bins = calibration_bins(y_true, y_score, n_bins)
+    total = sum(b['count'] for b in bins)
+    return float(sum(b['count'] * abs(b['mean_score'] - b['observed_rate']) for b in bins) / total) if total else float('nan')
@@ -0,0 +1,267 @@
+"""
+Evaluasi paralel beberapa versi model lokal di dataset berlabel
+
+Row berlabel di-encode sekali ke satu matrix dan ditulis sebagai .npy; setiap worker
+process membuka file itu dengan mmap_mode='r', jadi semua worker membaca halaman memori
+yang sama tanpa re-encode atau copy. Satu versi model per task: worker me-load model
+(dicatat sebagai load time), menskor matrix, mengukur latency per row (batch dan single
+row), lalu mengirim balik probabilitas untuk metric kualitas di parent.
+
+Versi yang dievaluasi berasal dari manifest LOCAL_MODELS_DIR (isi yang sama dengan
+MLflowModelManager.list_local_models, tanpa meng-import mlflow), plus model serving di
+MODEL_DIR sebagai pembanding. Latency hanya sebanding antar versi kalau jumlah worker
+tidak melebihi jumlah CPU (default).
+
+Offline job:
+    python -m utils.model_eval [--models-dir models] [--model-name attrition_model]
+        [--versions 3 4] [--stage Production] [--workers 4] [--json report.json]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.metrics import (accuracy, brier_score, calibration_bins, expected_calibration_error, log_loss,
+                           roc_auc)
+from utils.model_pool import engine_nbytes
+from utils.model_store import MODEL_FILE, ModelManifest, load_engine_from_dir
+from utils.permutation_importance import LABEL_COLUMN, labeled_matrix
+from utils.scoring import MODEL_FILE as SERVING_MODEL_FILE
+from utils.scoring import (MODEL_DIR, RISK_LEVELS, SCALER_FILE, active_dataset_path, dataset_fingerprint,
+                           load_dataset, load_engine, risk_level_codes)
+
+SERVING_LABEL = 'serving'
+# Jumlah prediksi single-row untuk latency per request
+SINGLE_ROW_SAMPLES = 200
+BATCH_REPEATS = 3
+
+
+def select_versions(models_dir, model_name=None, versions=None, stage=None, include_serving=True):
+    """
+    Daftar kandidat {'label', 'path', 'metadata'} dari manifest lokal (+ model serving)
+
+    Args:
+        models_dir (str): LOCAL_MODELS_DIR hasil MLflowModelManager.download_model
+        model_name (str): Hanya model ini (optional)
+        versions (list): Hanya versi registry ini (optional)
+        stage (str): Hanya stage ini (optional)
+        include_serving (bool): Tambahkan model di MODEL_DIR
+    """
+    candidates = []
+    if include_serving:
+        candidates.append({'label': SERVING_LABEL, 'path': None, 'metadata': {'model_dir': str(MODEL_DIR)}})
+
+    models_dir = Path(models_dir)
+    if models_dir.exists():
+        versions = {str(v) for v in versions} if versions else None
+        entries = sorted(ModelManifest(models_dir).entries().values(),
+                         key=lambda entry: entry.get('download_timestamp', ''), reverse=True)
+        for entry in entries:
+            if ((model_name and entry.get('model_name') != model_name)
+                    or (versions and str(entry.get('version')) not in versions)
+                    or (stage and entry.get('stage') != stage)):
+                continue
+            candidates.append({
+                'label': f"{entry.get('model_name')}/{entry.get('version')}",
+                'path': entry['local_directory'],
+                'metadata': entry,
+            })
+    return candidates
+
+
+def _load(candidate):
+    if candidate['path'] is None:
+        return load_engine('sklearn', MODEL_DIR), MODEL_DIR / SERVING_MODEL_FILE
+    return load_engine_from_dir(candidate['path']), Path(candidate['path']) / MODEL_FILE
+
+
+def _scaler_path(candidate):
+    if candidate['path'] is not None and (Path(candidate['path']) / SCALER_FILE).exists():
+        return Path(candidate['path']) / SCALER_FILE
+    return MODEL_DIR / SCALER_FILE
+
+
+def evaluate_candidate(candidate, matrix_path, seed=0):
+    """
+    Load satu versi dan skor matrix bersama (dijalankan di worker process)
+
+    Returns:
+        dict: probabilitas will_leave + ukuran, load time dan latency
+    """
+    import joblib  # noqa: F401 - import tidak dihitung sebagai load time model
+    import sklearn.ensemble  # noqa: F401
+
+    X = np.load(matrix_path, mmap_mode='r')
+
+    start = time.perf_counter()
+    engine, model_file = _load(candidate)
+    load_s = time.perf_counter() - start
+
+    # Panggilan pertama dipisah (warm-up), lalu ambil waktu terbaik dari beberapa repeat
+    proba = np.asarray(engine.predict_proba(X))[:, 1]
+    batch_s = []
+    for _ in range(BATCH_REPEATS):
+        start = time.perf_counter()
+        engine.predict_proba(X)
+        batch_s.append(time.perf_counter() - start)
+
+    rows = np.random.default_rng(seed).choice(len(X), size=min(SINGLE_ROW_SAMPLES, len(X)), replace=False)
+    single_s = []
+    for i in rows:
+        row = np.array(X[i:i + 1])
+        start = time.perf_counter()
+        engine.predict_proba(row)
+        single_s.append(time.perf_counter() - start)
+
+    return {
+        'label': candidate['label'],
+        'model_version': engine.version,
+        'proba': proba,
+        'file_bytes': model_file.stat().st_size + _scaler_path(candidate).stat().st_size,
+        'resident_bytes': engine_nbytes(engine),
+        'load_s': load_s,
+        'batch_us_per_row': min(batch_s) / len(X) * 1e6,
+        'single_row_ms_p50': float(np.percentile(single_s, 50) * 1000),
+        'single_row_ms_p99': float(np.percentile(single_s, 99) * 1000),
+    }
+
+
+def quality(y, proba, reference_proba=None):
+    """Metric kualitas dari probabilitas will_leave"""
+    risk = risk_level_codes(proba)
+    report = {
+        'auc': roc_auc(y, proba),
+        'accuracy': accuracy(y, proba),
+        'log_loss': log_loss(y, proba),
+        'brier': brier_score(y, proba),
+        'ece': expected_calibration_error(y, proba),
+        'calibration': calibration_bins(y, proba),
+        # Per risk level: jumlah row, jumlah yang benar-benar keluar dan attrition rate
+        'risk_level_by_label': {
+            level: {
+                'rows': int((risk == i).sum()),
+                'attrition': int(y[risk == i].sum()),
+                'attrition_rate': float(y[risk == i].mean()) if (risk == i).any() else None,
+            } for i, level in enumerate(RISK_LEVELS)
+        },
+    }
+    if reference_proba is not None:
+        reference_risk = risk_level_codes(reference_proba)
+        confusion = np.zeros((len(RISK_LEVELS), len(RISK_LEVELS)), dtype=np.int64)
+        np.add.at(confusion, (reference_risk, risk), 1)
+        report['risk_level_vs_reference'] = {
+            ref: {level: int(confusion[i, j]) for j, level in enumerate(RISK_LEVELS)}
+            for i, ref in enumerate(RISK_LEVELS)
+        }
+        report['risk_flip_rate'] = float((reference_risk != risk).mean())
+    return report
+
+
+def evaluate_models(candidates, dataset_path=None, workers=None, label=LABEL_COLUMN, reference=SERVING_LABEL):
+    """
+    Evaluasi semua kandidat secara paralel
+
+    Args:
+        candidates (list): Hasil select_versions
+        dataset_path (str): Dataset berlabel (default: active_dataset_path())
+        workers (int): Jumlah worker process; 1 = in-process tanpa pool
+        label (str): Kolom label
+        reference (str): Label kandidat pembanding untuk risk_level_vs_reference
+
+    Returns:
+        dict: {'meta': ..., 'models': [...]} dengan urutan sama dengan candidates
+    """
+    if not candidates:
+        raise ValueError("No model versions to evaluate")
+    workers = min(workers or os.cpu_count() or 1, len(candidates))
+
+    start = time.perf_counter()
+    X, y = labeled_matrix(load_dataset(dataset_path), label)
+    tmp_dir = Path(tempfile.mkdtemp(prefix='model_eval_'))
+    try:
+        matrix_path = tmp_dir / 'labeled.npy'
+        np.save(matrix_path, X)
+        if workers == 1:
+            results = [evaluate_candidate(candidate, matrix_path) for candidate in candidates]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(evaluate_candidate, candidates, [matrix_path] * len(candidates)))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    reference_proba = next((r['proba'] for r in results if r['label'] == reference), None)
+    models = []
+    for candidate, result in zip(candidates, results):
+        proba = result.pop('proba')
+        metadata = candidate['metadata']
+        models.append(dict(
+            result,
+            registry_version=metadata.get('version'),
+            stage=metadata.get('stage'),
+            path=candidate['path'],
+            **quality(y, proba, reference_proba if result['label'] != reference else None),
+        ))
+
+    return {
+        'meta': {
+            'dataset_fingerprint': dataset_fingerprint(dataset_path or active_dataset_path()),
+            'label': label,
+            'labeled_rows': int(len(y)),
+            'positives': int(y.sum()),
+            'reference': reference if reference_proba is not None else None,
+            'workers': workers,
+            'elapsed_s': round(time.perf_counter() - start, 3),
+        },
+        'models': models,
+    }
+
+
+def format_table(report):
+    header = (f"{'model':28s} {'version':>12s} {'auc':>6s} {'acc':>6s} {'logloss':>8s} {'brier':>6s} "
+              f"{'ece':>6s} {'flip':>6s} {'file MB':>8s} {'mem MB':>7s} {'load s':>7s} {'us/row':>7s} {'1-row ms':>8s}")
+    lines = [header, '-' * len(header)]
+    for m in report['models']:
+        flip = f"{m['risk_flip_rate']:6.1%}" if 'risk_flip_rate' in m else f"{'-':>6s}"
+        lines.append(
+            f"{m['label'][:28]:28s} {m['model_version']:>12s} {m['auc']:6.3f} {m['accuracy']:6.3f} "
+            f"{m['log_loss']:8.4f} {m['brier']:6.4f} {m['ece']:6.3f} {flip} {m['file_bytes'] / 1e6:8.2f} "
+            f"{m['resident_bytes'] / 1e6:7.2f} {m['load_s']:7.3f} {m['batch_us_per_row']:7.2f} "
+            f"{m['single_row_ms_p50']:8.2f}"
+        )
+    meta = report['meta']
+    lines.append(f"({meta['labeled_rows']} labeled rows, {meta['positives']} positives; "
+                 f"flip = risk_level berbeda dari '{meta['reference']}')")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Evaluasi paralel versi model lokal di dataset berlabel")
+    parser.add_argument('--models-dir', default=os.getenv('ATTRITION_LOCAL_MODELS_DIR', 'models'),
+                        help="Directory model hasil download MLflow (default: models)")
+    parser.add_argument('--model-name', help="Hanya model ini")
+    parser.add_argument('--versions', nargs='+', help="Hanya versi registry ini")
+    parser.add_argument('--stage', help="Hanya stage ini")
+    parser.add_argument('--no-serving', action='store_true', help="Jangan ikutkan model di MODEL_DIR")
+    parser.add_argument('--dataset', help="Dataset CSV (default: active_dataset_path())")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: jumlah CPU)")
+    parser.add_argument('--json', help="Tulis laporan lengkap (calibration, confusion) ke file JSON")
+    args = parser.parse_args()
+
+    candidates = select_versions(args.models_dir, args.model_name, args.versions, args.stage,
+                                 include_serving=not args.no_serving)
+    report = evaluate_models(candidates, args.dataset, workers=args.workers)
+    print(format_table(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved to {args.json}")
@@ -0,0 +1,308 @@
+"""
+Multi-model serving: pilih model per request, cache versi yang sudah di-load dalam LRU
+
+Request tanpa pilihan model dilayani engine default (HotSwapEngine dari utils/hot_swap.py)
+yang selalu resident (pinned). Request dengan pilihan model (header X-Model-Name /
+X-Model-Version / X-Model-Stage atau field body "model") di-resolve lewat manifest
+LOCAL_MODELS_DIR yang ditulis MLflowModelManager.download_model, lalu di-load sekali dan
+disimpan di LRU. Batas LRU adalah total byte array model yang resident (bukan jumlah
+model), termasuk model default; versi yang paling lama tidak dipakai di-evict duluan.
+
+Konfigurasi (env):
+    ATTRITION_LOCAL_MODELS_DIR=models     directory model hasil download MLflow
+    ATTRITION_MODEL_NAME=attrition_model  nama default kalau request hanya memilih versi
+    ATTRITION_MODEL_POOL_MB=256           batas total byte model resident
+    ATTRITION_MODEL_DOWNLOAD=1            versi yang belum ada di lokal didownload lewat
+                                          MLflowModelManager (butuh mlflow + kredensial)
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.hot_swap import get_serving_engine
+from utils.model_store import ModelManifest, load_engine_from_dir
+
+LOCAL_MODELS_DIR = os.getenv('ATTRITION_LOCAL_MODELS_DIR', 'models')
+DEFAULT_MODEL_NAME = os.getenv('ATTRITION_MODEL_NAME', 'attrition_model')
+POOL_MAX_BYTES = int(float(os.getenv('ATTRITION_MODEL_POOL_MB', '256')) * 1024 * 1024)
+DOWNLOAD_MISSING = os.getenv('ATTRITION_MODEL_DOWNLOAD', '').lower() in ('1', 'true', 'yes')
+
+SELECTOR_HEADERS = {'name': 'X-Model-Name', 'version': 'X-Model-Version', 'stage': 'X-Model-Stage'}
+
+
+class ModelSelectionError(ValueError):
+    """Pilihan model di request tidak valid"""
+
+
+class ModelNotFoundError(ModelSelectionError):
+    """Model / versi yang dipilih tidak ada di lokal (dan tidak bisa didownload)"""
+
+
+def model_selector(headers=None, body=None):
+    """
+    Pilihan model dari header dan/atau field body "model"
+
+    Field body boleh string ("attrition_model" atau "attrition_model/3", seperti URI
+    models:/<name>/<version>) atau object {"name", "version", "stage"}; nilainya menimpa
+    header. Batch request (body list) hanya bisa memilih lewat header.
+
+    Returns:
+        dict {'name', 'version', 'stage'} atau None kalau request tidak memilih model
+    """
+    selector = {}
+    if headers is not None:
+        for key, header in SELECTOR_HEADERS.items():
+            value = headers.get(header)
+            if value:
+                selector[key] = value.strip()
+
+    choice = body.get('model') if isinstance(body, dict) else None
+    if isinstance(choice, str) and choice.strip():
+        name, _, version = choice.strip().partition('/')
+        selector['name'] = name
+        if version:
+            selector['version'] = version
+    elif isinstance(choice, dict):
+        for key in SELECTOR_HEADERS:
+            if choice.get(key) not in (None, ''):
+                selector[key] = str(choice[key])
+    elif choice is not None:
+        raise ModelSelectionError('Field "model" must be a string or an object with name/version/stage')
+
+    if not selector:
+        return None
+    selector.setdefault('name', DEFAULT_MODEL_NAME)
+    if selector.get('version', '').lower() == 'latest':
+        del selector['version']
+    return selector
+
+
+def engine_nbytes(engine):
+    """
+    Perkiraan byte resident engine: array node tree + scaler (sklearn) atau array NumPy forest
+
+    Array memory-mapped ikut dihitung (page cache tetap memakai memori saat di-scan).
+    """
+    model = getattr(engine, 'model', None)
+    if model is not None and hasattr(model, 'estimators_'):
+        total = 0
+        for estimator in model.estimators_:
+            state = estimator.tree_.__getstate__()
+            total += state['nodes'].nbytes + state['values'].nbytes
+        scaler = getattr(engine, 'scaler', None)
+        for name in ('mean_', 'scale_', 'var_'):
+            value = getattr(scaler, name, None)
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+        return total
+    return sum(value.nbytes for value in vars(engine).values() if isinstance(value, np.ndarray))
+
+
+class PoolEntry:
+    """Satu versi model yang resident di pool"""
+
+    def __init__(self, key, engine, metadata, nbytes, load_s):
+        self.key = key
+        self.engine = engine
+        self.metadata = metadata
+        self.nbytes = nbytes
+        self.load_s = load_s
+        self.hits = 0
+        self.last_used = time.time()
+
+    def info(self):
+        return model_info(self.metadata, self.engine.version)
+
+
+def model_info(metadata, version):
+    return {
+        'model_name': metadata.get('model_name'),
+        'registry_version': metadata.get('version'),
+        'stage': metadata.get('stage'),
+        'model_version': version,
+    }
+
+
+class ModelPool:
+    """
+    LRU engine per versi model, dibatasi total byte resident
+
+    Engine default (pinned) tidak pernah di-evict; byte-nya mengurangi budget LRU. Versi yang
+    lebih besar dari sisa budget tetap dilayani (semua versi lain di-evict dulu). Engine yang
+    di-evict hanya dilepas dari pool: request yang masih memakainya tetap selesai normal.
+    """
+
+    def __init__(self, default_engine, models_dir=LOCAL_MODELS_DIR, max_bytes=POOL_MAX_BYTES,
+                 loader=load_engine_from_dir):
+        self.default_engine = default_engine
+        self.models_dir = Path(models_dir)
+        self.manifest = ModelManifest(self.models_dir)
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._pinned = (None, 0)  # (versi engine default, byte)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.load_s = 0.0
+
+    def pinned_bytes(self):
+        version = self.default_engine.version
+        if self._pinned[0] != version:
+            self._pinned = (version, engine_nbytes(self.default_engine))
+        return self._pinned[1]
+
+    def resolve(self, selector):
+        """
+        Entry manifest untuk selector {'name', 'version', 'stage'}
+
+        Tanpa version: versi tertinggi (optional: pada stage tertentu).
+
+        Raises:
+            ModelNotFoundError: tidak ada versi lokal yang cocok
+        """
+        name, version, stage = selector['name'], selector.get('version'), selector.get('stage')
+        if self.models_dir.exists():
+            entry = self.manifest.latest(name, stage=stage, version=version)
+            if entry is not None:
+                return entry
+
+        if DOWNLOAD_MISSING:
+            from utils.model_util import MLflowModelManager
+
+            metadata = MLflowModelManager(local_models_dir=self.models_dir).download_model(
+                name, version=version, stage=stage)
+            return dict(metadata, local_directory=metadata['local_path'])
+
+        label = f"{name}/{version}" if version else name
+        if stage:
+            label += f" ({stage})"
+        raise ModelNotFoundError(f"Model {label} is not available locally")
+
+    def get(self, selector):
+        """
+        Engine untuk selector (None = engine default)
+
+        Returns:
+            tuple: (engine, info dict atau None untuk engine default)
+        """
+        if selector is None:
+            return self.default_engine, None
+
+        resolved = self.resolve(selector)
+        # Versi yang dipilih sama dengan engine default: pakai engine pinned, tidak di-load ulang
+        default_metadata = getattr(self.default_engine, 'metadata', None) or {}
+        identity_key = 'content_id' if resolved.get('content_id') and default_metadata.get('content_id') else 'checksum'
+        if resolved.get(identity_key) and resolved.get(identity_key) == default_metadata.get(identity_key):
+            with self._lock:
+                self.hits += 1
+            return self.default_engine, model_info(resolved, self.default_engine.version)
+
+        key = resolved['local_directory']
+        with self._lock:
+            entry = self._hit(key)
+            if entry is None:
+                load_lock = self._loading.setdefault(key, threading.Lock())
+        if entry is not None:
+            return entry.engine, entry.info()
+
+        # Satu load per versi walaupun banyak request concurrent memilih versi yang sama
+        with load_lock:
+            try:
+                with self._lock:
+                    entry = self._hit(key)
+                if entry is None:
+                    entry = self._load(key)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return entry.engine, entry.info()
+
+    @contextmanager
+    def acquire(self, selector=None):
+        """Seperti HotSwapEngine.acquire(): yield (engine, info) untuk satu request"""
+        engine, info = self.get(selector)
+        if engine is self.default_engine:
+            with engine.acquire() as engine:
+                yield engine, info
+        else:
+            yield engine, info
+
+    def _hit(self, key):
+        """Dipanggil dengan lock dipegang"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            entry.last_used = time.time()
+            self.hits += 1
+        return entry
+
+    def _load(self, key):
+        start = time.perf_counter()
+        engine = self.loader(key)
+        load_s = time.perf_counter() - start
+        entry = PoolEntry(key, engine, getattr(engine, 'metadata', {}), engine_nbytes(engine), load_s)
+        budget = self.max_bytes - self.pinned_bytes()
+        with self._lock:
+            self.misses += 1
+            self.load_s += load_s
+            self._entries[key] = entry
+            resident = sum(e.nbytes for e in self._entries.values())
+            while resident > budget and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                resident -= evicted.nbytes
+                self.evictions += 1
+                self.evicted_bytes += evicted.nbytes
+                print(f"Evicted model {evicted.key} ({evicted.nbytes / 1e6:.1f} MB)", file=sys.stderr)
+        print(f"Loaded model {key} ({entry.nbytes / 1e6:.1f} MB) in {load_s:.3f}s", file=sys.stderr)
+        return entry
+
+    def status(self):
+        pinned = self.pinned_bytes()
+        with self._lock:
+            entries = [{
+                'key': entry.key,
+                **entry.info(),
+                'bytes': entry.nbytes,
+                'hits': entry.hits,
+                'load_s': entry.load_s,
+                'last_used': entry.last_used,
+            } for entry in reversed(self._entries.values())]
+            return {
+                'max_bytes': self.max_bytes,
+                'pinned_bytes': pinned,
+                'resident_bytes': pinned + sum(entry['bytes'] for entry in entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+                'load_s': self.load_s,
+                'entries': entries,
+            }
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_model_pool(kind=None):
+    """ModelPool per proses dengan engine serving (get_serving_engine) sebagai default pinned"""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                hot_engine, _ = get_serving_engine(kind)
+                _POOL = ModelPool(hot_engine)
+    return _POOL
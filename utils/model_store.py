@@ -0,0 +1,487 @@
+"""
+Penyimpanan lokal model yang didownload dari MLflow (tanpa dependency MLflow)
+
+Satu directory per versi model berisi model.pkl + metadata.json (checksum SHA-256 file untuk
+integrity check, dan content_id: hash isi model yang tidak bergantung codec, dipakai sebagai
+identitas / model_version), dan
+satu manifest (.index/manifest.json) sebagai index semua directory. Dipisah dari
+utils/model_util.py supaya proses serving bisa membaca manifest dan me-load model
+tanpa meng-import mlflow / dagshub.
+
+model.pkl bisa ditulis dengan beberapa codec (dicatat di metadata.json): 'none' paling
+cepat di-load dan dipakai untuk versi yang di-serve, codec rasio tinggi (zstd / lzma)
+untuk versi lama yang diarsipkan. lz4 dan zstd hanya tersedia kalau package-nya terinstall.
+"""
+
+import io
+import json
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.scoring import MODEL_DIR, SCALER_FILE, SklearnEngine
+
+try:
+    import fcntl
+except ImportError:  # Windows: manifest hanya dikunci antar thread
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "model.pkl"
+METADATA_FILE = "metadata.json"
+# Suffix directory sementara (download yang belum selesai / directory lama yang sedang diganti)
+TRANSIENT_SUFFIXES = ('.tmp', '.old')
+# Subdirectory internal (diawali titik, tidak dianggap model): manifest dan staging download
+INDEX_DIR = ".index"
+STAGING_DIR = ".staging"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2
+
+CODECS = ('none', 'zlib', 'lz4', 'zstd', 'lzma')
+# Level default per codec (cepat), dan level untuk arsip (rasio maksimum)
+CODEC_LEVELS = {'none': None, 'zlib': 3, 'lz4': 3, 'zstd': 3, 'lzma': 6}
+ARCHIVE_LEVELS = {'none': None, 'zlib': 9, 'lz4': 12, 'zstd': 19, 'lzma': 9}
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class ModelIntegrityError(ValueError):
+    """model.pkl lokal tidak cocok dengan checksum di metadata.json"""
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """SHA-256 dari isi file (dibaca per chunk)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _ContentPickler(pickle.Pickler):
+    """Pickler untuk hashing: array structured (record node tree) ditulis per field"""
+
+    def reducer_override(self, obj):
+        # Record node sklearn punya byte padding yang isinya acak; hash hanya nilai field-nya
+        if isinstance(obj, np.ndarray) and obj.dtype.names:
+            return tuple, (tuple((name, np.ascontiguousarray(obj[name])) for name in obj.dtype.names),)
+        return NotImplemented
+
+
+class _HashWriter:
+    def __init__(self, digest):
+        self.write = digest.update
+
+
+def model_content_id(model):
+    """
+    SHA-256 isi model (parameter + array hasil training), tidak bergantung codec model.pkl
+
+    Model yang sama yang ditulis ulang dengan codec lain punya content_id yang sama, sedangkan
+    checksum file-nya berubah.
+    """
+    digest = hashlib.sha256()
+    _ContentPickler(_HashWriter(digest), protocol=4).dump(model)
+    return digest.hexdigest()
+
+
+def available_codecs():
+    """Codec yang bisa dipakai di environment ini (lz4 / zstd butuh package tambahan)"""
+    codecs = []
+    for codec in CODECS:
+        module = {'lz4': 'lz4.frame', 'zstd': 'zstandard'}.get(codec)
+        if module is not None:
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+        codecs.append(codec)
+    return codecs
+
+
+def default_archive_codec():
+    """Codec rasio tertinggi yang tersedia: zstd kalau ada, selain itu lzma (stdlib)"""
+    return 'zstd' if 'zstd' in available_codecs() else 'lzma'
+
+
+MODEL_CODEC = os.getenv('ATTRITION_MODEL_CODEC', 'none')
+ARCHIVE_CODEC = os.getenv('ATTRITION_ARCHIVE_CODEC') or default_archive_codec()
+
+
+def dump_model(model, path, codec='none', level=None):
+    """
+    Tulis model ke path dengan codec tertentu
+
+    zlib / lz4 / lzma memakai kompresi bawaan joblib (di-detect otomatis saat load); zstd
+    tidak didukung joblib, jadi pickle joblib dikompresi utuh dengan zstandard.
+
+    Returns:
+        dict: {'codec', 'codec_level', 'content_id'} untuk metadata.json
+    """
+    if codec not in available_codecs():
+        raise ValueError(f"Codec '{codec}' not available, expected one of {available_codecs()}")
+    level = CODEC_LEVELS[codec] if level is None else level
+    if codec == 'none':
+        joblib.dump(model, path)
+    elif codec == 'zstd':
+        import zstandard
+
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        with open(path, 'wb') as f:
+            f.write(zstandard.ZstdCompressor(level=level).compress(buffer.getvalue()))
+    else:
+        joblib.dump(model, path, compress=(codec, level))
+    return {'codec': codec, 'codec_level': level, 'content_id': model_content_id(model)}
+
+
+def load_model_file(path, codec=None):
+    """Load model.pkl dengan codec apa pun (codec None = detect dari isi file)"""
+    if codec is None:
+        with open(path, 'rb') as f:
+            codec = 'zstd' if f.read(4) == ZSTD_MAGIC else 'joblib'
+    if codec == 'zstd':
+        import zstandard
+
+        with open(path, 'rb') as f:
+            return joblib.load(io.BytesIO(zstandard.ZstdDecompressor().decompress(f.read())))
+    return joblib.load(path)
+
+
+def benchmark_codecs(model, codecs=None, archive_levels=True, repeats=3, work_dir=None):
+    """
+    Ukuran file, waktu tulis dan waktu load (decompress + unpickle) per codec untuk satu model
+
+    Args:
+        model: Model yang diukur
+        codecs (list): Codec yang diukur (default: semua yang tersedia)
+        archive_levels (bool): Ukur juga level arsip (ARCHIVE_LEVELS) per codec
+        repeats (int): Load diulang, diambil waktu tercepat
+        work_dir (str): Directory untuk file sementara (default: temp dir)
+
+    Returns:
+        list: dict {'codec', 'codec_level', 'bytes', 'dump_s', 'load_s'} per kombinasi
+    """
+    import tempfile
+
+    codecs = codecs or available_codecs()
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        for codec in codecs:
+            levels = [CODEC_LEVELS[codec]]
+            if archive_levels and ARCHIVE_LEVELS[codec] != CODEC_LEVELS[codec]:
+                levels.append(ARCHIVE_LEVELS[codec])
+            for level in levels:
+                path = Path(tmp_dir) / f"{codec}_{level}.pkl"
+                start = time.perf_counter()
+                dump_model(model, path, codec, level)
+                dump_s = time.perf_counter() - start
+                load_times = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    load_model_file(path, codec)
+                    load_times.append(time.perf_counter() - start)
+                results.append({'codec': codec, 'codec_level': level, 'bytes': path.stat().st_size,
+                                'dump_s': dump_s, 'load_s': min(load_times)})
+                path.unlink()
+    return results
+
+
+def choose_codec(results, purpose='serving', load_tolerance=0.10):
+    """
+    Pilih codec dari hasil benchmark_codecs
+
+    serving: load tercepat; di antara codec yang load-nya dalam load_tolerance dari yang
+    tercepat, pilih file terkecil. archive: file terkecil.
+    """
+    if purpose == 'archive':
+        return min(results, key=lambda r: (r['bytes'], r['load_s']))
+    fastest = min(r['load_s'] for r in results)
+    candidates = [r for r in results if r['load_s'] <= fastest * (1 + load_tolerance)]
+    return min(candidates, key=lambda r: (r['bytes'], r['load_s']))
+
+
+def _version_key(entry):
+    version = str(entry.get('version', ''))
+    return (int(version) if version.isdigit() else -1, entry.get('download_timestamp', ''))
+
+
+def read_model_dir(model_dir):
+    """Entry manifest untuk satu directory model (metadata.json atau info dasar)"""
+    model_dir = Path(model_dir)
+    metadata_file = model_dir / METADATA_FILE
+    if metadata_file.exists():
+        with open(metadata_file, 'r') as f:
+            metadata = json.load(f)
+    else:
+        # Basic info if no metadata
+        metadata = {
+            'model_name': model_dir.name,
+            'download_timestamp': 'unknown',
+            'version': 'unknown'
+        }
+    metadata['local_directory'] = str(model_dir)
+    return metadata
+
+
+class ModelManifest:
+    """
+    Index semua directory model di LOCAL_MODELS_DIR
+
+    Manifest menyimpan mtime directory models dan (mtime, size) metadata.json setiap
+    directory versi saat terakhir ditulis. Perubahan isi directory models (download, hapus
+    manual, copy) maupun edit metadata.json di dalam directory versi (recompress, edit manual)
+    mengubah salah satunya, jadi manifest yang tidak konsisten dengan disk terdeteksi dengan
+    satu stat per directory dan di-rebuild otomatis. Manifest dan staging ada di subdirectory
+    sendiri supaya penulisannya tidak mengubah mtime tersebut.
+    """
+
+    def __init__(self, models_dir):
+        self.models_dir = Path(models_dir)
+        self.index_dir = self.models_dir / INDEX_DIR
+        self.path = self.index_dir / MANIFEST_FILE
+        self._lock = threading.Lock()
+        self._cache = None  # (manifest mtime_ns, models dir mtime_ns, metadata stats, entries)
+
+    def _models_dir_mtime(self):
+        return self.models_dir.stat().st_mtime_ns
+
+    def _metadata_stats(self, names):
+        """[mtime_ns, size] metadata.json per directory model (None kalau tidak ada)"""
+        stats = {}
+        for name in names:
+            try:
+                stat = (self.models_dir / name / METADATA_FILE).stat()
+                stats[name] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                stats[name] = None
+        return stats
+
+    @contextmanager
+    def _locked(self):
+        """Lock antar thread + antar proses (flock) untuk read-modify-write manifest"""
+        with self._lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_dir / "manifest.lock", 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        """Entries dari file manifest, atau None kalau tidak ada / rusak / stale"""
+        try:
+            manifest_mtime = self.path.stat().st_mtime_ns
+            models_mtime = self._models_dir_mtime()
+        except OSError:
+            return None
+        cache = self._cache
+        if cache is not None and cache[0] == manifest_mtime and cache[1] == models_mtime:
+            if cache[2] == self._metadata_stats(cache[3]):
+                return cache[3]
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Unreadable model manifest, rebuilding: {str(e)}")
+            return None
+        if data.get('format_version') != MANIFEST_VERSION or data.get('models_dir_mtime_ns') != models_mtime:
+            return None
+        if data.get('metadata_stats') != self._metadata_stats(data['entries']):
+            return None
+        self._cache = (manifest_mtime, models_mtime, data['metadata_stats'], data['entries'])
+        return data['entries']
+
+    def _write(self, entries):
+        tmp_path = self.path.with_name(f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'format_version': MANIFEST_VERSION,
+                'models_dir_mtime_ns': self._models_dir_mtime(),
+                'metadata_stats': self._metadata_stats(entries),
+                'entries': entries
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._cache = None
+
+    def _scan(self):
+        entries = {}
+        for model_dir in self.models_dir.iterdir():
+            if (model_dir.is_dir() and not model_dir.name.startswith('.')
+                    and not model_dir.name.endswith(TRANSIENT_SUFFIXES)):
+                try:
+                    entries[model_dir.name] = read_model_dir(model_dir)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"⚠️  Skipping unreadable model directory {model_dir}: {str(e)}")
+        return entries
+
+    def rebuild(self):
+        """Scan ulang semua directory model dan tulis manifest baru"""
+        with self._locked():
+            entries = self._scan()
+            self._write(entries)
+        logger.info(f"🗂️  Rebuilt model manifest ({len(entries)} models)")
+        return entries
+
+    def entries(self):
+        """dict nama directory -> metadata; rebuild otomatis kalau manifest stale"""
+        entries = self._read()
+        if entries is None:
+            entries = self.rebuild()
+        return entries
+
+    @contextmanager
+    def transaction(self):
+        """
+        Read-modify-write manifest secara atomik
+
+        Perubahan directory model (rename / hapus) dilakukan di dalam block ini, lalu dict
+        entries yang di-yield diubah sesuai; manifest ditulis dengan mtime directory terbaru
+        saat block selesai tanpa error.
+        """
+        with self._locked():
+            entries = self._read()
+            entries = dict(entries) if entries is not None else self._scan()
+            yield entries
+            self._write(entries)
+
+    def latest(self, model_name, stage=None, version=None):
+        """Entry versi tertinggi untuk model (optional: hanya stage / versi tertentu), atau None"""
+        candidates = [entry for entry in self.entries().values()
+                      if entry.get('model_name') == model_name
+                      and (stage is None or entry.get('stage') == stage)
+                      and (version is None or str(entry.get('version')) == str(version))]
+        return max(candidates, key=_version_key) if candidates else None
+
+    def to_evict(self, keep_latest, entries=None):
+        """Entry di luar N download terbaru per model name (entries: dict dari transaction())"""
+        groups = {}
+        for entry in (entries if entries is not None else self.entries()).values():
+            groups.setdefault(entry.get('model_name', 'unknown'), []).append(entry)
+        evict = []
+        for models in groups.values():
+            models.sort(key=lambda x: x.get('download_timestamp', ''), reverse=True)
+            evict.extend(models[keep_latest:])
+        return evict
+
+
+def load_model_dir(local_path, verify=True):
+    """
+    Load model.pkl + metadata.json dari satu directory model
+
+    Args:
+        local_path (str): Path to local model directory
+        verify (bool): Cek checksum model.pkl terhadap metadata.json sebelum unpickle
+
+    Returns:
+        tuple: (model, metadata)
+    """
+    local_path = Path(local_path)
+
+    model_file = local_path / MODEL_FILE
+    if not model_file.exists():
+        raise FileNotFoundError(f"Model file not found: {model_file}")
+
+    metadata_file = local_path / METADATA_FILE
+    metadata = {}
+    if metadata_file.exists():
+        with open(metadata_file, 'r') as f:
+            metadata = json.load(f)
+
+    if verify and metadata.get('checksum') and file_checksum(model_file) != metadata['checksum']:
+        raise ModelIntegrityError(f"Checksum mismatch for {model_file}, re-download the model")
+
+    return load_model_file(model_file, metadata.get('codec')), metadata
+
+
+def _write_metadata(model_dir, metadata):
+    tmp_path = Path(model_dir) / f"{METADATA_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, Path(model_dir) / METADATA_FILE)
+
+
+def recompress_model_dir(model_dir, codec, level=None, staging_dir=None, extra_metadata=None):
+    """
+    Tulis ulang model.pkl satu directory model dengan codec lain
+
+    Directory baru (model.pkl + metadata.json dengan checksum baru) disiapkan di staging
+    lalu ditukar dengan rename, jadi model.pkl dan checksum tidak pernah tidak konsisten.
+    Untuk directory di LOCAL_MODELS_DIR, panggil di dalam ModelManifest.transaction() dan
+    update entry-nya dengan metadata yang di-return.
+
+    Args:
+        extra_metadata (dict): Field tambahan untuk metadata.json (misalnya hasil benchmark)
+
+    Returns:
+        dict: metadata baru (tidak berubah kalau codec + level sudah sama)
+    """
+    model_dir = Path(model_dir)
+    level = CODEC_LEVELS[codec] if level is None else level
+    model, metadata = load_model_dir(model_dir)
+    metadata.update(extra_metadata or {})
+    # Identitas model tetap sama setelah recompress (hanya checksum file yang berubah)
+    content_id = metadata.get('content_id') or model_content_id(model)
+    if metadata.get('codec', 'none') == codec and metadata.get('codec_level') == level:
+        if extra_metadata or 'codec' not in metadata or 'content_id' not in metadata:
+            metadata.update(codec=codec, codec_level=level, content_id=content_id)
+            _write_metadata(model_dir, metadata)
+        return metadata
+
+    staging_dir = Path(staging_dir or model_dir.parent / STAGING_DIR)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    token = f"{model_dir.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+    tmp_path = staging_dir / f"{token}.tmp"
+    shutil.copytree(model_dir, tmp_path, ignore=shutil.ignore_patterns(MODEL_FILE))
+    try:
+        metadata.update(dump_model(model, tmp_path / MODEL_FILE, codec, level), content_id=content_id)
+        metadata['checksum'] = file_checksum(tmp_path / MODEL_FILE)
+        metadata['model_bytes'] = (tmp_path / MODEL_FILE).stat().st_size
+        _write_metadata(tmp_path, metadata)
+
+        old_path = staging_dir / f"{token}.old"
+        os.rename(model_dir, old_path)
+        os.rename(tmp_path, model_dir)
+        shutil.rmtree(old_path, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return metadata
+
+
+def load_engine_from_dir(local_path, scaler_path=None):
+    """
+    Scoring engine (SklearnEngine) dari directory model hasil download MLflow
+
+    Scaler diambil dari scaler.pkl di directory yang sama kalau ada, selain itu dari
+    scaler serving (MODEL_DIR) karena model dilatih dengan encoding 47 fitur yang sama.
+
+    Returns:
+        SklearnEngine dengan .metadata (isi metadata.json); version = content_id[:12], jadi
+        tidak berubah kalau model.pkl ditulis ulang dengan codec lain
+    """
+    local_path = Path(local_path)
+    model, metadata = load_model_dir(local_path)
+    if scaler_path is None:
+        scaler_path = local_path / SCALER_FILE
+        if not scaler_path.exists():
+            scaler_path = MODEL_DIR / SCALER_FILE
+    content_id = metadata.get('content_id') or model_content_id(model)
+    engine = SklearnEngine(model, joblib.load(scaler_path), content_id[:12])
+    engine.metadata = metadata
+    return engine
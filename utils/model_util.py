@@ -1,8 +1,30 @@
 """
 MLflow Model Utility untuk mendownload dan manage model dari DagsHub
+
+Model yang didownload disimpan sebagai cache content-addressed: satu directory per
+(model name, version, identitas artifact di registry). Download versi yang sama di-skip kalau
+directory-nya sudah ada dan checksum model.pkl masih cocok.
+
+Query registry memakai satu MlflowClient per manager (koneksi HTTP di-pool oleh session
+MLflow) dan hasilnya di-cache dengan TTL (MLFLOW_REGISTRY_CACHE_TTL, detik) supaya
+deploy script dan health check tidak mengirim query identik berulang kali.
+
+Isi LOCAL_MODELS_DIR dicatat di satu manifest (.index/manifest.json) yang di-update
+secara transaksional saat download dan cleanup, jadi list / latest / eviction tidak perlu
+membaca metadata.json setiap directory.
+
+Download ditulis dengan codec cepat (ATTRITION_MODEL_CODEC, default tanpa kompresi);
+cleanup menulis ulang versi lama dengan codec arsip (ATTRITION_ARCHIVE_CODEC) sebelum
+akhirnya dihapus.
 """
 
 import os
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import mlflow
 import mlflow.sklearn
 import dagshub
@@ -16,6 +38,21 @@ from pathlib import Path
 import json
 import sys
 sys.path.append('..')
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.model_store import (
+    MODEL_FILE,
+    METADATA_FILE,
+    STAGING_DIR,
+    MODEL_CODEC,
+    ARCHIVE_CODEC,
+    ARCHIVE_LEVELS,
+    ModelManifest,
+    dump_model,
+    file_checksum,
+    load_model_dir,
+    recompress_model_dir
+)
 
 from config.mlflow_config import (
     DAGSHUB_REPO_OWNER, 
@@ -23,40 +60,133 @@ from config.mlflow_config import (
     MLFLOW_TRACKING_URI,
     DAGSHUB_USERNAME,
     DAGSHUB_TOKEN,
-    DEFAULT_MODEL_NAME
+    DEFAULT_MODEL_NAME,
+    LOCAL_MODELS_DIR
 )
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+REGISTRY_CACHE_TTL = float(os.getenv('MLFLOW_REGISTRY_CACHE_TTL', '60'))
+REGISTRY_MAX_WORKERS = int(os.getenv('MLFLOW_REGISTRY_MAX_WORKERS', '8'))
+
+
+def is_local_tracking_uri(uri):
+    """True untuk tracking store lokal (file:, sqlite: atau path biasa), yang tidak butuh DagsHub"""
+    uri = str(uri or '')
+    return uri.startswith(('file:', 'sqlite:')) or '://' not in uri
+
+
+class TTLCache:
+    """
+    Cache hasil query registry dengan TTL dan invalidation eksplisit
+    
+    Miss yang bersamaan untuk key yang sama hanya menjalankan loader sekali (thread lain
+    menunggu hasilnya). Value di-deepcopy saat dikembalikan supaya caller bebas mengubahnya.
+    """
+    
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._values = {}  # key -> (expires_at, value)
+        self._loading = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+    
+    def get_or_load(self, key, loader):
+        while True:
+            with self._lock:
+                cached = self._values.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    return copy.deepcopy(cached[1])
+                event = self._loading.get(key)
+                if event is None:
+                    event = self._loading[key] = threading.Event()
+                    break
+            event.wait()
+        
+        try:
+            value = loader()
+            with self._lock:
+                if self.ttl > 0:
+                    self._values[key] = (time.monotonic() + self.ttl, value)
+            return copy.deepcopy(value)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+    
+    def invalidate(self, model_name=None):
+        """Hapus semua entry, atau hanya entry untuk satu model (+ listing semua model)"""
+        with self._lock:
+            if model_name is None:
+                self._values.clear()
+                return
+            for key in list(self._values):
+                if key[0] == 'registered_models' or (len(key) > 1 and key[1] == model_name):
+                    del self._values[key]
+
+
 class MLflowModelManager:
     """
     Utility class untuk mengambil model ML dari MLflow dan menyimpan ke lokal
     """
     
-    def __init__(self, dagshub_repo_owner=None, dagshub_repo_name=None, mlflow_tracking_uri=None):
+    def __init__(self, dagshub_repo_owner=None, dagshub_repo_name=None, mlflow_tracking_uri=None,
+                 local_models_dir=None, client=None, model_codec=None):
         """
         Initialize MLflow Model Manager
         
         Args:
             dagshub_repo_owner (str): Owner/username DagsHub repository
             dagshub_repo_name (str): Nama repository DagsHub
-            mlflow_tracking_uri (str): MLflow tracking URI (optional)
+            mlflow_tracking_uri (str): MLflow tracking URI (optional). URI lokal
+                (file:///path/mlruns, sqlite:///...) dipakai tanpa DagsHub
+            local_models_dir (str): Directory cache model lokal (default: LOCAL_MODELS_DIR)
+            client (MlflowClient): Client registry yang sudah dibuat (optional, misalnya
+                stand-in untuk registry lokal)
+            model_codec (str): Codec model.pkl hasil download (default: ATTRITION_MODEL_CODEC)
         """
         self.dagshub_repo_owner = dagshub_repo_owner or DAGSHUB_REPO_OWNER
         self.dagshub_repo_name = dagshub_repo_name or DAGSHUB_REPO_NAME
         self.mlflow_tracking_uri = mlflow_tracking_uri or MLFLOW_TRACKING_URI
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._registry_cache = TTLCache(REGISTRY_CACHE_TTL)
+        self.model_codec = model_codec or MODEL_CODEC
         
         # Create models directory
-        self.local_models_dir = Path("models")
-        self.local_models_dir.mkdir(exist_ok=True)
+        self.local_models_dir = Path(local_models_dir or LOCAL_MODELS_DIR)
+        self.local_models_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = ModelManifest(self.local_models_dir)
         
         # Setup MLflow connection
         self._setup_mlflow_connection()
     
+    def _get_client(self):
+        """Client registry: yang di-inject di constructor, atau satu MlflowClient yang dipakai ulang"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = mlflow.tracking.MlflowClient(tracking_uri=self.mlflow_tracking_uri)
+        return self._client
+    
+    def invalidate_registry_cache(self, model_name=None):
+        """
+        Buang metadata registry yang di-cache (misalnya setelah register / transition stage)
+        
+        Args:
+            model_name (str): Hanya untuk model ini (optional, default: semua)
+        """
+        self._registry_cache.invalidate(model_name)
+    
     def _setup_mlflow_connection(self):
         """Setup connection ke DagsHub MLflow"""
+        if is_local_tracking_uri(self.mlflow_tracking_uri):
+            # Registry lokal (file store / sqlite): tidak perlu credentials maupun DagsHub
+            mlflow.set_tracking_uri(self.mlflow_tracking_uri)
+            logger.info(f"✅ Using local MLflow store at: {mlflow.get_tracking_uri()}")
+            return
+        
         try:
             # Set credentials if available
             if DAGSHUB_USERNAME and DAGSHUB_TOKEN:
@@ -87,7 +217,7 @@ class MLflowModelManager:
     def _test_connection(self):
         """Test MLflow connection"""
         try:
-            client = mlflow.tracking.MlflowClient()
+            client = self._get_client()
             experiments = client.search_experiments(max_results=1)
             logger.info(f"🔗 Connection test successful - Found {len(experiments)} experiments")
         except Exception as e:
@@ -101,18 +231,7 @@ class MLflowModelManager:
             list: List of registered model names
         """
         try:
-            client = mlflow.tracking.MlflowClient()
-            registered_models = client.search_registered_models()
-            
-            model_info = []
-            for model in registered_models:
-                model_info.append({
-                    'name': model.name,
-                    'description': model.description or 'No description',
-                    'creation_timestamp': model.creation_timestamp,
-                    'last_updated_timestamp': model.last_updated_timestamp,
-                    'tags': dict(model.tags) if model.tags else {}
-                })
+            model_info = self._registry_cache.get_or_load(('registered_models',), self._fetch_registered_models)
             
             logger.info(f"📋 Found {len(model_info)} registered models")
             
@@ -125,6 +244,46 @@ class MLflowModelManager:
             logger.error(f"❌ Error listing models: {str(e)}")
             return []
     
+    def _fetch_registered_models(self):
+        client = self._get_client()
+        return [{
+            'name': model.name,
+            'description': model.description or 'No description',
+            'creation_timestamp': model.creation_timestamp,
+            'last_updated_timestamp': model.last_updated_timestamp,
+            'tags': dict(model.tags) if model.tags else {}
+        } for model in client.search_registered_models()]
+    
+    @staticmethod
+    def _version_info(version):
+        return {
+            'version': version.version,
+            'stage': version.current_stage,
+            'status': version.status,
+            'creation_timestamp': version.creation_timestamp,
+            'last_updated_timestamp': version.last_updated_timestamp,
+            'run_id': version.run_id,
+            'source': version.source,
+            'description': version.description or 'No description'
+        }
+    
+    def _fetch_model_versions(self, model_name):
+        client = self._get_client()
+        version_info = [self._version_info(version) for version in client.search_model_versions(f"name='{model_name}'")]
+        # Sort by version number (descending)
+        version_info.sort(key=lambda x: int(x['version']), reverse=True)
+        return version_info
+    
+    def _fetch_registered_model(self, model_name):
+        model = self._get_client().get_registered_model(model_name)
+        return {
+            'name': model.name,
+            'description': model.description or 'No description',
+            'tags': dict(model.tags) if model.tags else {},
+            'creation_timestamp': model.creation_timestamp,
+            'last_updated_timestamp': model.last_updated_timestamp
+        }
+    
     def get_model_versions(self, model_name):
         """
         Get all versions of a specific model
@@ -136,24 +295,8 @@ class MLflowModelManager:
             list: List of model versions with metadata
         """
         try:
-            client = mlflow.tracking.MlflowClient()
-            versions = client.search_model_versions(f"name='{model_name}'")
-            
-            version_info = []
-            for version in versions:
-                version_info.append({
-                    'version': version.version,
-                    'stage': version.current_stage,
-                    'status': version.status,
-                    'creation_timestamp': version.creation_timestamp,
-                    'last_updated_timestamp': version.last_updated_timestamp,
-                    'run_id': version.run_id,
-                    'source': version.source,
-                    'description': version.description or 'No description'
-                })
-            
-            # Sort by version number (descending)
-            version_info.sort(key=lambda x: int(x['version']), reverse=True)
+            version_info = self._registry_cache.get_or_load(
+                ('versions', model_name), lambda: self._fetch_model_versions(model_name))
             
             logger.info(f"📊 Found {len(version_info)} versions for model '{model_name}'")
             return version_info
@@ -162,42 +305,136 @@ class MLflowModelManager:
             logger.error(f"❌ Error getting model versions: {str(e)}")
             return []
     
-    def download_model(self, model_name, version=None, stage=None, local_path=None):
+    def get_versions_for_models(self, model_names=None):
+        """
+        Versi untuk beberapa model sekaligus; lookup yang belum di-cache dijalankan concurrent
+        
+        Args:
+            model_names (list): Nama model (default: semua registered model)
+            
+        Returns:
+            dict: model name -> list versi (format get_model_versions)
+        """
+        if model_names is None:
+            model_names = [model['name'] for model in self.list_registered_models()]
+        if not model_names:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(REGISTRY_MAX_WORKERS, len(model_names))) as executor:
+            return dict(zip(model_names, executor.map(self.get_model_versions, model_names)))
+    
+    def get_model_version_details(self, model_name, versions):
+        """
+        Detail beberapa versi spesifik (get_model_version per versi, concurrent + cached)
+        
+        Args:
+            model_name (str): Name of the registered model
+            versions (list): Nomor versi
+            
+        Returns:
+            dict: version -> metadata versi (None kalau tidak ditemukan)
+        """
+        def fetch(version):
+            try:
+                return self._registry_cache.get_or_load(
+                    ('version', model_name, str(version)),
+                    lambda: self._version_info(self._get_client().get_model_version(model_name, str(version))))
+            except Exception as e:
+                logger.warning(f"⚠️  Could not get {model_name} v{version}: {str(e)}")
+                return None
+        
+        versions = [str(version) for version in versions]
+        if not versions:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(REGISTRY_MAX_WORKERS, len(versions))) as executor:
+            return dict(zip(versions, executor.map(fetch, versions)))
+    
+    def _resolve_model_version(self, model_name, version=None, stage=None):
+        """
+        Resolve version / stage / latest ke satu model version konkret di registry
+        
+        Returns:
+            ModelVersion: entity MLflow (name, version, current_stage, run_id, source)
+        """
+        client = self._get_client()
+        if version:
+            return client.get_model_version(model_name, str(version))
+        if stage:
+            versions = client.get_latest_versions(model_name, stages=[stage])
+        else:
+            versions = client.search_model_versions(f"name='{model_name}'")
+        if not versions:
+            raise ValueError(f"No versions found for model '{model_name}'" + (f" in stage '{stage}'" if stage else ""))
+        return max(versions, key=lambda v: int(v.version))
+    
+    def _artifact_checksum(self, model_version):
+        """
+        Key cache untuk artifact model, hanya dari identitas versi di registry
+
+        Versi registry immutable, jadi name + version + source + run_id cukup untuk mendeteksi
+        artifact yang sama. Tidak memakai listing artifact: listing yang gagal sementara tidak
+        boleh menghasilkan key (dan directory) lain untuk versi yang sama.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{model_version.name}\0{model_version.version}\0{model_version.source}\0{model_version.run_id}".encode())
+        return digest.hexdigest()
+    
+    def _cached_metadata(self, local_path, cache_key):
+        """Metadata entry cache kalau directory ada, key cocok dan model.pkl lolos integrity check"""
+        metadata_file = local_path / METADATA_FILE
+        if not metadata_file.exists():
+            return None
+        try:
+            with open(metadata_file, 'r') as f:
+                metadata = json.load(f)
+            if metadata.get('cache_key') != cache_key:
+                return None
+            if file_checksum(local_path / MODEL_FILE) != metadata.get('checksum'):
+                logger.warning(f"⚠️  Cached model failed integrity check, re-downloading: {local_path}")
+                return None
+            return metadata
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable cached model {local_path}: {str(e)}")
+            return None
+    
+    def download_model(self, model_name, version=None, stage=None, local_path=None, force=False):
         """
         Download model from MLflow dan simpan ke lokal
         
+        Hasil di-cache per (model name, version, identitas artifact): kalau versi yang sama sudah
+        ada di lokal dan model.pkl lolos integrity check, download di-skip. Directory ditulis
+        ke temp dir lalu di-rename, jadi download concurrent tidak pernah meninggalkan
+        model.pkl setengah jadi.
+        
         Args:
             model_name (str): Name of the registered model
             version (str): Specific version to download (optional)
             stage (str): Stage to download ('Production', 'Staging', etc.) (optional)
             local_path (str): Custom local path to save model (optional)
+            force (bool): Download ulang walaupun ada di cache
             
         Returns:
-            dict: Information about downloaded model
+            dict: Information about downloaded model (cache_hit=True kalau dari cache)
         """
         try:
-            # Determine model URI
-            if version:
-                model_uri = f"models:/{model_name}/{version}"
-                version_identifier = f"v{version}"
-            elif stage:
-                model_uri = f"models:/{model_name}/{stage}"
-                version_identifier = f"stage_{stage}"
-            else:
-                model_uri = f"models:/{model_name}/latest"
-                version_identifier = "latest"
-            
-            logger.info(f"📥 Downloading model from: {model_uri}")
+            model_version = self._resolve_model_version(model_name, version=version, stage=stage)
+            artifact_checksum = self._artifact_checksum(model_version)
+            cache_key = f"{model_name}/{model_version.version}/{artifact_checksum}"
             
             # Set local path
             if local_path is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                local_path = self.local_models_dir / f"{model_name}_{version_identifier}_{timestamp}"
+                local_path = self.local_models_dir / f"{model_name}_v{model_version.version}_{artifact_checksum[:12]}"
             else:
                 local_path = Path(local_path)
             
-            # Create directory if not exists
-            local_path.mkdir(parents=True, exist_ok=True)
+            if not force:
+                cached = self._cached_metadata(local_path, cache_key)
+                if cached is not None:
+                    logger.info(f"♻️  Model {model_name} v{model_version.version} already cached at: {local_path}")
+                    return dict(cached, cache_hit=True)
+            
+            # Selalu download versi yang sudah di-resolve (stage bisa pindah di tengah download)
+            model_uri = f"models:/{model_name}/{model_version.version}"
+            logger.info(f"📥 Downloading model from: {model_uri}")
             
             # Download model using MLflow
             try:
@@ -213,87 +450,116 @@ class MLflowModelManager:
                     logger.error(f"❌ Failed to load model: {str(e)}")
                     raise
             
-            # Save model using joblib
-            model_file_path = local_path / "model.pkl"
-            joblib.dump(model, model_file_path)
-            
-            # Get model metadata
-            client = mlflow.tracking.MlflowClient()
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            # Staging di dalam directory model (filesystem sama, rename atomik) tapi di luar
+            # listing, supaya download yang sedang berjalan tidak membuat manifest stale
+            staging_dir = self._staging_dir(local_path)
+            staging_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = staging_dir / f"{local_path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+            tmp_path.mkdir()
             try:
-                if version:
-                    model_version = client.get_model_version(model_name, version)
+                # Save model using joblib (codec cepat untuk serving)
+                codec_info = dump_model(model, tmp_path / MODEL_FILE, self.model_codec)
+                
+                # Prepare metadata
+                model_file_path = local_path / MODEL_FILE
+                metadata = {
+                    'model_name': model_name,
+                    'version': str(model_version.version),
+                    'stage': model_version.current_stage or 'None',
+                    'run_id': model_version.run_id or 'unknown',
+                    'model_type': model_type,
+                    'download_timestamp': datetime.now().isoformat(),
+                    'local_path': str(local_path),
+                    'model_file': str(model_file_path),
+                    'mlflow_uri': model_uri,
+                    'source': model_version.source,
+                    'cache_key': cache_key,
+                    'artifact_checksum': artifact_checksum,
+                    'checksum': file_checksum(tmp_path / MODEL_FILE),
+                    'model_bytes': (tmp_path / MODEL_FILE).stat().st_size,
+                    **codec_info,
+                    'dagshub_repo': f"{self.dagshub_repo_owner}/{self.dagshub_repo_name}",
+                    'tracking_uri': self.mlflow_tracking_uri
+                }
+                
+                # Save metadata to JSON
+                with open(tmp_path / METADATA_FILE, 'w') as f:
+                    json.dump(metadata, f, indent=2)
+                
+                # Create a simple info file
+                with open(tmp_path / "model_info.txt", 'w') as f:
+                    f.write(f"Model: {model_name}\n")
+                    f.write(f"Version: {metadata['version']}\n")
+                    f.write(f"Stage: {metadata['stage']}\n")
+                    f.write(f"Downloaded: {metadata['download_timestamp']}\n")
+                    f.write(f"MLflow URI: {model_uri}\n")
+                    f.write(f"DagsHub Repo: {metadata['dagshub_repo']}\n")
+                
+                if self._is_managed(local_path):
+                    with self.manifest.transaction() as entries:
+                        metadata = self._publish_model_dir(tmp_path, local_path, cache_key, metadata)
+                        entries[local_path.name] = dict(metadata, local_directory=str(local_path))
                 else:
-                    latest_versions = client.get_latest_versions(model_name, stages=["Production", "Staging", "None"])
-                    model_version = latest_versions[0] if latest_versions else None
-            except:
-                model_version = None
-                logger.warning("⚠️  Could not retrieve model version metadata")
-            
-            # Prepare metadata
-            metadata = {
-                'model_name': model_name,
-                'version': model_version.version if model_version else 'unknown',
-                'stage': model_version.current_stage if model_version else 'unknown',
-                'run_id': model_version.run_id if model_version else 'unknown',
-                'model_type': model_type,
-                'download_timestamp': datetime.now().isoformat(),
-                'local_path': str(local_path),
-                'model_file': str(model_file_path),
-                'mlflow_uri': model_uri,
-                'dagshub_repo': f"{self.dagshub_repo_owner}/{self.dagshub_repo_name}",
-                'tracking_uri': self.mlflow_tracking_uri
-            }
-            
-            # Save metadata to JSON
-            metadata_file = local_path / "metadata.json"
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            # Create a simple info file
-            info_file = local_path / "model_info.txt"
-            with open(info_file, 'w') as f:
-                f.write(f"Model: {model_name}\n")
-                f.write(f"Version: {metadata['version']}\n")
-                f.write(f"Stage: {metadata['stage']}\n")
-                f.write(f"Downloaded: {metadata['download_timestamp']}\n")
-                f.write(f"MLflow URI: {model_uri}\n")
-                f.write(f"DagsHub Repo: {metadata['dagshub_repo']}\n")
+                    metadata = self._publish_model_dir(tmp_path, local_path, cache_key, metadata)
+            finally:
+                shutil.rmtree(tmp_path, ignore_errors=True)
             
             logger.info(f"✅ Model downloaded successfully to: {local_path}")
-            logger.info(f"📄 Model metadata saved to: {metadata_file}")
+            logger.info(f"📄 Model metadata saved to: {local_path / METADATA_FILE}")
             
-            return metadata
+            return dict(metadata, cache_hit=False)
             
         except Exception as e:
             logger.error(f"❌ Error downloading model: {str(e)}")
             raise
     
-    def load_local_model(self, local_path):
+    def _is_managed(self, local_path):
+        """True kalau local_path adalah directory model langsung di bawah local_models_dir"""
+        return Path(local_path).resolve().parent == self.local_models_dir.resolve()
+    
+    def _staging_dir(self, local_path):
+        if self._is_managed(local_path):
+            return self.local_models_dir / STAGING_DIR
+        return Path(local_path).parent
+    
+    def _publish_model_dir(self, tmp_path, local_path, cache_key, metadata):
+        """
+        Rename temp dir ke local_path secara atomik
+        
+        Kalau proses lain sudah menulis entry valid untuk key yang sama, entry itu yang dipakai;
+        directory lama yang rusak / beda versi diganti.
+        """
+        try:
+            os.rename(tmp_path, local_path)
+            return metadata
+        except OSError:
+            pass
+        
+        existing = self._cached_metadata(local_path, cache_key)
+        if existing is not None:
+            logger.info(f"♻️  Concurrent download already published: {local_path}")
+            return existing
+        
+        old_path = tmp_path.with_name(f"{local_path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.old")
+        os.rename(local_path, old_path)
+        os.rename(tmp_path, local_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return metadata
+    
+    def load_local_model(self, local_path, verify=True):
         """
         Load model dari local path
         
         Args:
             local_path (str): Path to local model directory
+            verify (bool): Cek checksum model.pkl terhadap metadata.json sebelum unpickle
             
         Returns:
             tuple: (model, metadata)
         """
         try:
-            local_path = Path(local_path)
-            
-            # Load model
-            model_file = local_path / "model.pkl"
-            if not model_file.exists():
-                raise FileNotFoundError(f"Model file not found: {model_file}")
-            
-            model = joblib.load(model_file)
-            
-            # Load metadata
-            metadata_file = local_path / "metadata.json"
-            metadata = {}
-            if metadata_file.exists():
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
+            model, metadata = load_model_dir(local_path, verify=verify)
             
             logger.info(f"✅ Model loaded successfully from: {local_path}")
             return model, metadata
@@ -310,24 +576,7 @@ class MLflowModelManager:
             list: List of local model directories with metadata
         """
         try:
-            local_models = []
-            
-            for model_dir in self.local_models_dir.iterdir():
-                if model_dir.is_dir():
-                    metadata_file = model_dir / "metadata.json"
-                    if metadata_file.exists():
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                        metadata['local_directory'] = str(model_dir)
-                        local_models.append(metadata)
-                    else:
-                        # Basic info if no metadata
-                        local_models.append({
-                            'local_directory': str(model_dir),
-                            'model_name': model_dir.name,
-                            'download_timestamp': 'unknown',
-                            'version': 'unknown'
-                        })
+            local_models = [dict(entry) for entry in self.manifest.entries().values()]
             
             # Sort by download timestamp (newest first)
             local_models.sort(key=lambda x: x.get('download_timestamp', ''), reverse=True)
@@ -339,44 +588,74 @@ class MLflowModelManager:
             logger.error(f"❌ Error listing local models: {str(e)}")
             return []
     
-    def cleanup_old_models(self, keep_latest=3):
+    def cleanup_old_models(self, keep_latest=3, keep_archived=10, archive_codec=ARCHIVE_CODEC):
         """
         Cleanup old local models, keep only latest N versions
         
+        Versi di luar N terbaru tidak langsung dihapus: model.pkl ditulis ulang dengan codec
+        arsip (lebih kecil, load lebih lambat). Hanya versi di luar keep_archived arsip
+        terbaru yang dihapus.
+        
         Args:
             keep_latest (int): Number of latest models to keep per model name
+            keep_archived (int): Jumlah versi arsip per model name (None = simpan semua)
+            archive_codec (str): Codec arsip; None = hapus tanpa arsip
         """
         try:
-            local_models = self.list_local_models()
-            
-            # Group by model name
-            model_groups = {}
-            for model in local_models:
-                name = model.get('model_name', 'unknown')
-                if name not in model_groups:
-                    model_groups[name] = []
-                model_groups[name].append(model)
-            
             deleted_count = 0
+            archived_count = 0
+            saved_bytes = 0
+            archived_per_model = {}
             
-            # Sort and cleanup each group
-            for model_name, models in model_groups.items():
-                # Sort by download timestamp (newest first)
-                models.sort(key=lambda x: x.get('download_timestamp', ''), reverse=True)
-                
-                # Remove old models
-                for old_model in models[keep_latest:]:
+            with self.manifest.transaction() as entries:
+                # to_evict: per model name, dari yang terbaru
+                for old_model in self.manifest.to_evict(keep_latest, entries):
                     old_path = Path(old_model['local_directory'])
+                    model_name = old_model.get('model_name', 'unknown')
+                    archived = archived_per_model.get(model_name, 0)
+                    keep = archive_codec is not None and (keep_archived is None or archived < keep_archived)
+                    
+                    if keep and (old_path / MODEL_FILE).exists():
+                        try:
+                            before = (old_path / MODEL_FILE).stat().st_size
+                            metadata = recompress_model_dir(old_path, archive_codec,
+                                                            ARCHIVE_LEVELS[archive_codec],
+                                                            self.local_models_dir / STAGING_DIR)
+                            entries[old_path.name] = dict(metadata, local_directory=str(old_path))
+                            archived_per_model[model_name] = archived + 1
+                            if before != metadata.get('model_bytes', before):
+                                saved_bytes += before - metadata['model_bytes']
+                                archived_count += 1
+                                logger.info(f"🗜️ Archived old model with {archive_codec}: {old_path}")
+                            continue
+                        except (OSError, ValueError) as e:
+                            logger.warning(f"⚠️  Could not archive {old_path}, removing: {str(e)}")
+                    
                     if old_path.exists():
                         shutil.rmtree(old_path)
                         logger.info(f"🗑️ Removed old model: {old_path}")
                         deleted_count += 1
+                    entries.pop(old_path.name, None)
             
-            logger.info(f"✅ Cleanup completed, removed {deleted_count} old models, kept latest {keep_latest} versions per model")
+            logger.info(f"✅ Cleanup completed, archived {archived_count} models ({saved_bytes / 1e6:.1f} MB saved), "
+                        f"removed {deleted_count} old models, kept latest {keep_latest} versions per model")
             
         except Exception as e:
             logger.error(f"❌ Error during cleanup: {str(e)}")
     
+    def get_latest_local_model(self, model_name=None, stage=None):
+        """
+        Metadata versi lokal tertinggi untuk model (dari manifest, tanpa scan directory)
+        
+        Args:
+            model_name (str): Name of the model (default: DEFAULT_MODEL_NAME)
+            stage (str): Hanya versi dengan stage ini (optional)
+            
+        Returns:
+            dict: Metadata (dengan local_directory), atau None kalau tidak ada
+        """
+        return self.manifest.latest(model_name or DEFAULT_MODEL_NAME, stage=stage)
+    
     def get_model_info(self, model_name):
         """
         Get comprehensive info about a model
@@ -388,17 +667,22 @@ class MLflowModelManager:
             dict: Model information
         """
         try:
-            client = mlflow.tracking.MlflowClient()
-            
-            # Get registered model info
-            try:
-                registered_model = client.get_registered_model(model_name)
-            except:
-                logger.error(f"❌ Model '{model_name}' not found in registry")
-                return None
-            
-            # Get versions
-            versions = self.get_model_versions(model_name)
+            # Registered model dan daftar versi adalah dua query independen: jalankan bersamaan
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                registered_future = executor.submit(
+                    self._registry_cache.get_or_load, ('registered_model', model_name),
+                    lambda: self._fetch_registered_model(model_name))
+                versions_future = executor.submit(self.get_model_versions, model_name)
+                
+                # Get registered model info
+                try:
+                    registered_model = registered_future.result()
+                except:
+                    logger.error(f"❌ Model '{model_name}' not found in registry")
+                    return None
+                
+                # Get versions
+                versions = versions_future.result()
             
             # Get latest production model
             production_versions = [v for v in versions if v['stage'] == 'Production']
@@ -407,17 +691,13 @@ class MLflowModelManager:
             # Get latest model
             latest_version = versions[0] if versions else None
             
-            model_info = {
-                'name': registered_model.name,
-                'description': registered_model.description or 'No description',
-                'tags': dict(registered_model.tags) if registered_model.tags else {},
-                'creation_timestamp': registered_model.creation_timestamp,
-                'last_updated_timestamp': registered_model.last_updated_timestamp,
+            model_info = dict(registered_model)
+            model_info.update({
                 'total_versions': len(versions),
                 'latest_version': latest_version,
                 'latest_production_version': latest_production,
                 'all_versions': versions
-            }
+            })
             
             return model_info
             
@@ -437,13 +717,23 @@ def quick_download_model(model_name, version=None, stage=None):
         logger.error(f"❌ Quick download failed: {str(e)}")
         raise
 
-def quick_load_model(local_path):
+def quick_load_model(local_path=None, model_name=None, stage=None, local_models_dir=None):
     """
     Quick function to load local model
+    
+    Tanpa local_path, versi lokal tertinggi untuk model_name (default: DEFAULT_MODEL_NAME)
+    di-resolve lewat manifest; tidak perlu koneksi ke MLflow.
     """
     try:
-        manager = MLflowModelManager()  
-        return manager.load_local_model(local_path)
+        if local_path is None:
+            manifest = ModelManifest(local_models_dir or LOCAL_MODELS_DIR)
+            entry = manifest.latest(model_name or DEFAULT_MODEL_NAME, stage=stage)
+            if entry is None:
+                raise FileNotFoundError(f"No local model found for '{model_name or DEFAULT_MODEL_NAME}'")
+            local_path = entry['local_directory']
+        model, metadata = load_model_dir(local_path)
+        logger.info(f"✅ Model loaded successfully from: {local_path}")
+        return model, metadata
     except Exception as e:
         logger.error(f"❌ Quick load failed: {str(e)}")
         raise
@@ -0,0 +1,158 @@
+"""
+NumPy-only Random Forest engine
+
+Semua tree dari RandomForestClassifier di-flatten menjadi array node global sehingga
+serving tidak perlu import sklearn/pandas. Artifact berupa directory `.npy` + `meta.json`
+yang bisa di-load biasa atau memory-mapped (halaman array dibaca saat dibutuhkan).
+
+Export artifact dari model yang ada:
+    python -m utils.numpy_forest [model_dir]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ARRAY_NAMES = ('left', 'right', 'feature', 'threshold', 'value', 'roots',
+               'scaler_mean', 'scaler_scale', 'feature_importances', 'classes')
+
+
+class NumpyForest:
+    """Scaler + forest traversal dengan NumPy saja"""
+
+    model_type = "Random Forest ML Model (47 Features, NumPy engine)"
+
+    def __init__(self, arrays, meta):
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.scaler_mean = arrays['scaler_mean']
+        self.scaler_scale = arrays['scaler_scale']
+        self.feature_importances_ = arrays['feature_importances']
+        self.classes_ = arrays['classes']
+        self.max_depth = int(meta['max_depth'])
+        self.version = meta.get('model_version', 'unknown')
+        self.kind = 'mmap' if isinstance(self.left, np.memmap) else 'numpy'
+        self.timings = {}
+
+    @classmethod
+    def load(cls, artifact_dir, mmap=False):
+        """
+        Load artifact hasil export_forest
+
+        Args:
+            artifact_dir (str): Directory artifact
+            mmap (bool): Memory-map array (mmap_mode='r') daripada membaca semuanya
+        """
+        artifact_dir = Path(artifact_dir)
+        meta_file = artifact_dir / 'meta.json'
+        if not meta_file.exists():
+            raise FileNotFoundError(f"NumPy forest artifact not found: {artifact_dir}")
+
+        with open(meta_file, 'r') as f:
+            meta = json.load(f)
+
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(artifact_dir / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(arrays, meta)
+
+    def scale(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+
+    def apply(self, X_scaled):
+        """Return global leaf index (n, n_trees) untuk setiap row dan tree"""
+        # sklearn membandingkan fitur sebagai float32 terhadap threshold float64
+        X32 = np.asarray(X_scaled, dtype=np.float32)
+        n = X32.shape[0]
+        rows = np.arange(n)[:, None]
+        nodes = np.broadcast_to(np.asarray(self.roots), (n, len(self.roots))).copy()
+
+        for _ in range(self.max_depth):
+            left = self.left[nodes]
+            internal = left >= 0
+            if not internal.any():
+                break
+            go_left = X32[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.right[nodes]), nodes)
+
+        return nodes
+
+    def predict_proba(self, X):
+        """Predict probabilitas (n, n_classes), identik dengan RandomForestClassifier.predict_proba"""
+        leaves = self.apply(self.scale(X))
+        return self.value[leaves].mean(axis=1)
+
+
+def export_forest(model, scaler, artifact_dir, model_version='unknown'):
+    """
+    Flatten fitted RandomForestClassifier + StandardScaler ke artifact NumPy
+
+    Args:
+        model: Fitted RandomForestClassifier
+        scaler: Fitted StandardScaler
+        artifact_dir (str): Directory tujuan
+        model_version (str): Versi model sumber (lihat scoring.model_version)
+
+    Returns:
+        Path: Directory artifact
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        node_value = tree.value[:, 0, :]
+        value.append(node_value / node_value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'feature_importances': np.asarray(model.feature_importances_, dtype=np.float64),
+        'classes': np.asarray(model.classes_),
+    }
+    for name, array in arrays.items():
+        np.save(artifact_dir / f"{name}.npy", array)
+
+    meta = {
+        'model_version': model_version,
+        'n_trees': len(model.estimators_),
+        'n_nodes': offset,
+        'max_depth': max_depth,
+        'n_features': int(model.n_features_in_),
+    }
+    with open(artifact_dir / 'meta.json', 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return artifact_dir
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from utils.scoring import MODEL_DIR, NUMPY_ARTIFACT_DIR, load_engine
+
+    model_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else MODEL_DIR
+    source = load_engine('sklearn', model_dir)
+    out_dir = export_forest(source.model, source.scaler, model_dir / NUMPY_ARTIFACT_DIR, source.version)
+    print(f"✅ NumPy forest artifact written to: {out_dir}")
@@ -0,0 +1,220 @@
+"""
+Partial dependence (PDP) dan ICE summary per fitur
+
+Untuk setiap fitur, seluruh dataset di-encode sekali lalu fitur tersebut di-set ke setiap
+nilai grid (numerik: unique values atau quantile grid, kategori: semua kategori) dan di-score
+vectorized per batch. Hasilnya curve rata-rata (PDP), quantile ICE per titik grid, dan
+sample ICE curve. Fitur dibagi ke process pool; hasilnya disimpan sebagai artifact JSON
+per model version + parameter job sehingga endpoint cukup membaca file (endpoint tidak pernah
+menghitung; tanpa artifact response-nya 503). Artifact ditulis ke ARTIFACT_DIR
+(api/python/models/artifacts) dan di-commit supaya ikut ter-deploy.
+
+Offline job:
+    python -m utils.pdp [--workers 4] [--grid-size 20] [--force] [--output-dir DIR]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.artifacts import ARTIFACT_DIR, ServedArtifact, artifact_path, load_artifact, save_artifact
+from utils.hot_swap import load_serving_model, serving_model_version
+from utils.scoring import (
+    CATEGORICAL_MAPPINGS, active_dataset_path, dataset_fingerprint, encode_frame, load_dataset,
+    model_version
+)
+from utils.what_if import SWEEPABLE_NUMERIC, set_feature
+
+ARTIFACT_NAME = 'pdp'
+FEATURES = SWEEPABLE_NUMERIC + list(CATEGORICAL_MAPPINGS)
+DEFAULT_GRID_SIZE = 20
+DEFAULT_ICE_SAMPLE = 20
+ICE_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Jumlah row encoded per predict_proba call (membatasi memori matrix yang di-tile)
+SCORE_BATCH_ROWS = 50000
+
+# Digit desimal yang disimpan di artifact
+PRECISION = 5
+
+
+def feature_grid(df, name, grid_size=DEFAULT_GRID_SIZE):
+    """Nilai grid: semua kategori, unique values (kalau sedikit) atau quantile 5%-95%"""
+    if name in CATEGORICAL_MAPPINGS:
+        return list(CATEGORICAL_MAPPINGS[name])
+    values = df[name].dropna().to_numpy(dtype=np.float64)
+    uniques = np.unique(values)
+    if len(uniques) <= grid_size:
+        return uniques.tolist()
+    return np.unique(np.quantile(values, np.linspace(0.05, 0.95, grid_size))).tolist()
+
+
+def ice_matrix(engine, X, name, grid):
+    """Probabilitas will_leave dengan shape (n_rows, n_grid): satu ICE curve per row"""
+    n = len(X)
+    ice = np.empty((n, len(grid)), dtype=np.float64)
+    values_per_batch = max(1, SCORE_BATCH_ROWS // max(n, 1))
+    for start in range(0, len(grid), values_per_batch):
+        values = grid[start:start + values_per_batch]
+        Xg = np.tile(X, (len(values), 1))
+        for k, value in enumerate(values):
+            set_feature(Xg, slice(k * n, (k + 1) * n), name, value)
+        ice[:, start:start + len(values)] = engine.predict_proba(Xg)[:, 1].reshape(len(values), n).T
+    return ice
+
+
+def feature_curves(engine, X, df, name, grid_size=DEFAULT_GRID_SIZE, sample_rows=None):
+    """PDP + ICE summary untuk satu fitur"""
+    grid = feature_grid(df, name, grid_size)
+    ice = ice_matrix(engine, X, name, grid)
+    pdp = ice.mean(axis=0)
+
+    def compact(values):
+        return np.round(values, PRECISION).tolist()
+
+    return {
+        "name": name,
+        "kind": "categorical" if name in CATEGORICAL_MAPPINGS else "numeric",
+        "grid": grid,
+        "pdp": compact(pdp),
+        "pdp_range": round(float(pdp.max() - pdp.min()), PRECISION),
+        "ice_std": compact(ice.std(axis=0)),
+        "ice_quantiles": {str(q): compact(np.quantile(ice, q, axis=0)) for q in ICE_QUANTILES},
+        "ice_sample": compact(ice[sample_rows]) if sample_rows is not None else [],
+    }
+
+
+# State per worker process: engine dan encoded matrix di-load sekali oleh initializer
+_WORKER = {}
+
+
+def _init_worker(engine_kind, model_dir, dataset_path):
+    df = load_dataset(dataset_path)
+    _WORKER.update(engine=load_serving_model(engine_kind, model_dir), df=df, X=encode_frame(df))
+
+
+def _worker_curves(name, grid_size, sample_rows):
+    return feature_curves(_WORKER['engine'], _WORKER['X'], _WORKER['df'], name, grid_size, sample_rows)
+
+
+def compute_pdp(dataset_path=None, model_dir=None, engine_kind=None, workers=None,
+                grid_size=DEFAULT_GRID_SIZE, ice_sample=DEFAULT_ICE_SAMPLE, features=None, seed=0):
+    """
+    Hitung PDP/ICE untuk semua fitur
+
+    Args:
+        dataset_path (str): Dataset CSV (default: active_dataset_path())
+        model_dir (str): Directory artifact model (default: model yang dilayani, lihat hot_swap)
+        engine_kind (str): Scoring engine untuk job ('sklearn', 'numpy', 'mmap')
+        workers (int): Jumlah worker process; 1 = in-process tanpa pool
+        grid_size (int): Maksimum titik grid untuk fitur numerik
+        ice_sample (int): Jumlah ICE curve mentah yang disimpan per fitur
+        features (list): Subset fitur (default: FEATURES)
+        seed (int): Seed untuk pemilihan sample ICE
+
+    Returns:
+        tuple: (meta, {"features": {name: curves}})
+    """
+    dataset_path = Path(dataset_path or active_dataset_path())
+    features = features or FEATURES
+    unknown = [name for name in features if name not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown features {unknown}, expected a subset of {FEATURES}")
+    workers = workers or min(len(features), os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    df = load_dataset(dataset_path)
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(len(df), size=min(ice_sample, len(df)), replace=False))
+
+    if workers == 1:
+        engine = load_serving_model(engine_kind, model_dir)
+        X = encode_frame(df)
+        curves = [feature_curves(engine, X, df, name, grid_size, sample_rows) for name in features]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(engine_kind, model_dir, dataset_path)) as pool:
+            curves = list(pool.map(_worker_curves, features, [grid_size] * len(features),
+                                   [sample_rows] * len(features)))
+
+    meta = {
+        'model_version': model_version(model_dir) if model_dir else serving_model_version(engine_kind),
+        'dataset_fingerprint': dataset_fingerprint(dataset_path),
+        'rows': int(len(df)),
+        'grid_size': grid_size,
+        'ice_sample': ice_sample,
+        'seed': seed,
+        'ice_quantiles': list(ICE_QUANTILES),
+        'ice_sample_employee_ids': df['EmployeeId'].to_numpy()[sample_rows].tolist(),
+        'workers': workers,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+    }
+    return meta, {"features": {c['name']: c for c in curves}}
+
+
+def job_params(meta):
+    """Parameter job yang menentukan hasil (bagian dari nama file artifact)"""
+    return {key: meta[key] for key in ('grid_size', 'ice_sample', 'seed')}
+
+
+def build_pdp(dataset_path=None, model_dir=None, artifact_dir=None, **kwargs):
+    """Offline job: hitung PDP dan simpan artifact (default di ARTIFACT_DIR) untuk model version + parameter job"""
+    meta, payload = compute_pdp(dataset_path, model_dir, **kwargs)
+    path = artifact_path(ARTIFACT_NAME, meta['model_version'], artifact_dir, **job_params(meta))
+    save_artifact(path, meta, payload)
+    print(f"PDP artifact written: {path} ({len(payload['features'])} features, {meta['elapsed_s']}s)",
+          file=sys.stderr)
+    return {'meta': meta, **payload}
+
+
+_SERVED = ServedArtifact(ARTIFACT_NAME, 'python -m utils.pdp')
+
+
+def get_pdp(dataset_path=None, model_dir=None, artifact_dir=None):
+    """
+    Artifact PDP precomputed (parameter default) untuk model yang sedang dilayani (hot_swap)
+
+    Tidak pernah menghitung di dalam request. Kalau dataset berubah sejak job terakhir,
+    artifact terakhir tetap dilayani dengan 'stale': True.
+
+    Raises:
+        ArtifactUnavailable: belum ada artifact untuk model ini (jalankan python -m utils.pdp)
+    """
+    dataset_path = Path(dataset_path or active_dataset_path())
+    version = model_version(model_dir) if model_dir else serving_model_version()
+    return _SERVED.get(version, {'dataset_fingerprint': dataset_fingerprint(dataset_path)},
+                       artifact_dir, grid_size=DEFAULT_GRID_SIZE, ice_sample=DEFAULT_ICE_SAMPLE, seed=0)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute partial dependence / ICE curves")
+    parser.add_argument('--dataset', help="Dataset CSV (default: active_dataset_path())")
+    parser.add_argument('--engine', help="Scoring engine (default: ATTRITION_ENGINE)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: jumlah CPU)")
+    parser.add_argument('--grid-size', type=int, default=DEFAULT_GRID_SIZE)
+    parser.add_argument('--ice-sample', type=int, default=DEFAULT_ICE_SAMPLE)
+    parser.add_argument('--output-dir', default=str(ARTIFACT_DIR),
+                        help="Directory artifact (default: ARTIFACT_DIR, ikut ter-deploy; commit hasilnya)")
+    parser.add_argument('--force', action='store_true', help="Hitung ulang walaupun artifact masih current")
+    args = parser.parse_args()
+
+    params = {'grid_size': args.grid_size, 'ice_sample': args.ice_sample, 'seed': 0}
+    version = serving_model_version(args.engine)
+    path = artifact_path(ARTIFACT_NAME, version, args.output_dir, **params)
+    current = {'model_version': version, 'dataset_fingerprint': dataset_fingerprint(args.dataset or active_dataset_path()),
+               **params}
+    if not args.force and load_artifact(path, **current):
+        print(f"✅ PDP artifact already current: {path}")
+    else:
+        artifact = build_pdp(args.dataset, artifact_dir=args.output_dir, engine_kind=args.engine,
+                             workers=args.workers, grid_size=args.grid_size, ice_sample=args.ice_sample)
+        top = sorted(artifact['features'].values(), key=lambda c: -c['pdp_range'])[:5]
+        print(f"✅ {len(artifact['features'])} features in {artifact['meta']['elapsed_s']}s; largest PDP range: " +
+              ", ".join(f"{c['name']} {c['pdp_range']:.3f}" for c in top))
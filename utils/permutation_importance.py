@@ -0,0 +1,234 @@
+"""
+Permutation importance pada row berlabel di dataset
+
+Row dengan label `Attrition` di-encode sekali ke satu matrix. Untuk setiap fitur dan repeat,
+kolom fitur (atau seluruh kolom one-hot untuk fitur kategori) di-shuffle in place, di-score,
+lalu dikembalikan, tanpa re-encode. Pasangan (fitur, repeat) dibagi ke process pool; setiap
+worker memegang salinan matrix sendiri. Hasil (mean drop, std, confidence interval)
+disimpan sebagai artifact per model version + parameter job (metric, n_repeats, seed);
+endpoint hanya membaca artifact itu dan tidak pernah menjalankan job. Artifact ditulis ke
+ARTIFACT_DIR (api/python/models/artifacts) dan di-commit supaya ikut ter-deploy.
+
+Offline job:
+    python -m utils.permutation_importance [--repeats 10] [--metric auc] [--workers 4] [--force] [--output-dir DIR]
+"""
+
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.artifacts import ARTIFACT_DIR, ServedArtifact, artifact_path, load_artifact, save_artifact
+from utils.hot_swap import load_serving_model, serving_model_version
+from utils.metrics import LOWER_IS_BETTER, METRICS
+from utils.scoring import (
+    CATEGORICAL_MAPPINGS, CONSTANT_COLUMNS, FEATURE_INDEX, NUMERICAL_COLUMNS, active_dataset_path,
+    dataset_fingerprint, encode_frame, load_dataset, model_version
+)
+
+ARTIFACT_NAME = 'permutation_importance'
+LABEL_COLUMN = 'Attrition'
+DEFAULT_METRIC = 'auc'
+DEFAULT_REPEATS = 10
+CONFIDENCE = 0.95
+
+# Kolom konstan tidak berubah saat di-shuffle, jadi tidak dievaluasi
+FEATURES = [c for c in NUMERICAL_COLUMNS if c not in CONSTANT_COLUMNS] + list(CATEGORICAL_MAPPINGS)
+
+
+def feature_columns(name):
+    """Index kolom encoded untuk satu fitur raw (grup one-hot untuk fitur kategori)"""
+    if name in CATEGORICAL_MAPPINGS:
+        return [FEATURE_INDEX[col] for col in CATEGORICAL_MAPPINGS[name].values() if col]
+    return [FEATURE_INDEX[name]]
+
+
+def labeled_matrix(df, label=LABEL_COLUMN):
+    """Encoded matrix dan label untuk row yang punya label"""
+    labeled = df[df[label].notna()]
+    return encode_frame(labeled), labeled[label].to_numpy(dtype=np.int8)
+
+
+def permuted_score(engine, X, y, name, seed, metric=DEFAULT_METRIC):
+    """Score setelah kolom fitur di-shuffle in place; X dikembalikan ke kondisi semula"""
+    columns = feature_columns(name)
+    original = X[:, columns].copy()
+    X[:, columns] = original[np.random.default_rng(seed).permutation(len(X))]
+    try:
+        return METRICS[metric](y, engine.predict_proba(X)[:, 1])
+    finally:
+        X[:, columns] = original
+
+
+def t_critical(confidence, dof):
+    """Critical value Student t (scipy kalau ada, fallback normal approximation)"""
+    try:
+        from scipy import stats
+        return float(stats.t.ppf((1 + confidence) / 2, dof))
+    except ImportError:
+        return 1.959963984540054
+
+
+def summarize(drops, confidence=CONFIDENCE):
+    drops = np.asarray(drops, dtype=np.float64)
+    mean = float(drops.mean())
+    std = float(drops.std(ddof=1)) if len(drops) > 1 else 0.0
+    half_width = t_critical(confidence, len(drops) - 1) * std / math.sqrt(len(drops)) if len(drops) > 1 else 0.0
+    return {
+        "mean": mean,
+        "std": std,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "drops": drops.round(6).tolist(),
+    }
+
+
+# State per worker process: engine, matrix berlabel (milik worker, boleh dimutasi) dan label
+_WORKER = {}
+
+
+def _init_worker(engine_kind, model_dir, dataset_path, label):
+    X, y = labeled_matrix(load_dataset(dataset_path), label)
+    _WORKER.update(engine=load_serving_model(engine_kind, model_dir), X=X, y=y)
+
+
+def _worker_score(task):
+    name, seed, metric = task
+    return permuted_score(_WORKER['engine'], _WORKER['X'], _WORKER['y'], name, seed, metric)
+
+
+def compute_permutation_importance(dataset_path=None, model_dir=None, engine_kind=None, workers=None,
+                                   n_repeats=DEFAULT_REPEATS, metric=DEFAULT_METRIC, seed=0,
+                                   label=LABEL_COLUMN):
+    """
+    Hitung permutation importance untuk semua fitur
+
+    Args:
+        dataset_path (str): Dataset CSV (default: active_dataset_path())
+        model_dir (str): Directory artifact model (default: model yang dilayani, lihat hot_swap)
+        engine_kind (str): Scoring engine untuk job ('sklearn', 'numpy', 'mmap')
+        workers (int): Jumlah worker process; 1 = in-process tanpa pool
+        n_repeats (int): Jumlah shuffle per fitur
+        metric (str): 'auc', 'accuracy' atau 'log_loss'
+        seed (int): Seed; shuffle untuk (fitur, repeat) deterministik
+        label (str): Kolom label
+
+    Returns:
+        tuple: (meta, {"baseline": ..., "features": {name: summary}})
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {list(METRICS)}")
+    dataset_path = Path(dataset_path or active_dataset_path())
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    engine = load_serving_model(engine_kind, model_dir)
+    X, y = labeled_matrix(load_dataset(dataset_path), label)
+    baseline = METRICS[metric](y, engine.predict_proba(X)[:, 1])
+
+    # Seed per (fitur, repeat) supaya hasil tidak tergantung pembagian kerja antar worker
+    tasks = [(name, [seed, i, r], metric) for i, name in enumerate(FEATURES) for r in range(n_repeats)]
+    if workers == 1:
+        scores = [permuted_score(engine, X, y, *task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(engine_kind, model_dir, dataset_path, label)) as pool:
+            scores = list(pool.map(_worker_score, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    # Importance = penurunan kualitas setelah fitur di-shuffle (positif = fitur berguna)
+    sign = -1.0 if metric in LOWER_IS_BETTER else 1.0
+    scores = np.asarray(scores).reshape(len(FEATURES), n_repeats)
+    features = {name: summarize(sign * (baseline - scores[i])) for i, name in enumerate(FEATURES)}
+    # Impurity importance (bawaan forest) per fitur raw sebagai pembanding, dari model yang sama
+    impurity = np.asarray(engine.feature_importances_)
+    for name, summary in features.items():
+        summary['impurity_importance'] = float(impurity[feature_columns(name)].sum())
+
+    meta = {
+        'model_version': engine.version,
+        'dataset_fingerprint': dataset_fingerprint(dataset_path),
+        'label': label,
+        'labeled_rows': int(len(y)),
+        'positives': int(y.sum()),
+        'metric': metric,
+        'n_repeats': n_repeats,
+        'seed': seed,
+        'confidence': CONFIDENCE,
+        'workers': workers,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+    }
+    return meta, {"baseline": baseline, "features": features}
+
+
+def job_params(meta):
+    """Parameter job yang menentukan hasil (bagian dari nama file artifact dan ETag)"""
+    return {key: meta[key] for key in ('metric', 'n_repeats', 'seed')}
+
+
+def build_permutation_importance(dataset_path=None, model_dir=None, artifact_dir=None, **kwargs):
+    """Offline job: hitung dan simpan artifact (default di ARTIFACT_DIR) untuk model version + parameter job"""
+    meta, payload = compute_permutation_importance(dataset_path, model_dir, **kwargs)
+    path = artifact_path(ARTIFACT_NAME, meta['model_version'], artifact_dir, **job_params(meta))
+    save_artifact(path, meta, payload)
+    print(f"Permutation importance written: {path} ({meta['elapsed_s']}s)", file=sys.stderr)
+    return {'meta': meta, **payload}
+
+
+_SERVED = ServedArtifact(ARTIFACT_NAME, 'python -m utils.permutation_importance')
+
+
+def get_permutation_importance(dataset_path=None, model_dir=None, artifact_dir=None, metric=DEFAULT_METRIC,
+                               n_repeats=DEFAULT_REPEATS, seed=0):
+    """
+    Artifact permutation importance precomputed untuk model yang sedang dilayani (hot_swap)
+
+    Tidak pernah menghitung di dalam request. Kalau dataset berubah sejak job terakhir,
+    artifact terakhir tetap dilayani dengan 'stale': True.
+
+    Raises:
+        ArtifactUnavailable: belum ada artifact untuk model + parameter ini
+    """
+    dataset_path = Path(dataset_path or active_dataset_path())
+    version = model_version(model_dir) if model_dir else serving_model_version()
+    return _SERVED.get(version, {'dataset_fingerprint': dataset_fingerprint(dataset_path)},
+                       artifact_dir, metric=metric, n_repeats=n_repeats, seed=seed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Permutation importance pada row berlabel")
+    parser.add_argument('--dataset', help="Dataset CSV (default: active_dataset_path())")
+    parser.add_argument('--engine', help="Scoring engine (default: ATTRITION_ENGINE)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: jumlah CPU)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--metric', default=DEFAULT_METRIC, choices=list(METRICS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-dir', default=str(ARTIFACT_DIR),
+                        help="Directory artifact (default: ARTIFACT_DIR, ikut ter-deploy; commit hasilnya)")
+    parser.add_argument('--force', action='store_true', help="Hitung ulang walaupun artifact masih current")
+    args = parser.parse_args()
+
+    params = {'metric': args.metric, 'n_repeats': args.repeats, 'seed': args.seed}
+    version = serving_model_version(args.engine)
+    path = artifact_path(ARTIFACT_NAME, version, args.output_dir, **params)
+    current = {'model_version': version, 'dataset_fingerprint': dataset_fingerprint(args.dataset or active_dataset_path()),
+               **params}
+    artifact = None if args.force else load_artifact(path, **current)
+    if artifact:
+        print(f"✅ Permutation importance already current: {path}")
+    else:
+        artifact = build_permutation_importance(args.dataset, artifact_dir=args.output_dir, engine_kind=args.engine,
+                                                workers=args.workers, n_repeats=args.repeats, metric=args.metric,
+                                                seed=args.seed)
+
+    ranked = sorted(artifact['features'].items(), key=lambda item: -item[1]['mean'])
+    print(f"Baseline {artifact['meta']['metric']}: {artifact['baseline']:.4f} "
+          f"({artifact['meta']['labeled_rows']} labeled rows, {artifact['meta']['n_repeats']} repeats)")
+    for name, summary in ranked[:10]:
+        print(f"  {name:28s} {summary['mean']:+.4f}  [{summary['ci_low']:+.4f}, {summary['ci_high']:+.4f}]")
@@ -0,0 +1,247 @@
+"""
+Buffered asynchronous prediction log (JSONL)
+
+Request path hanya melakukan append ke ring buffer di memori (O(1), tanpa I/O). Background
+thread mengambil record per batch, serialize ke JSON dan menulis ke file, dengan rotasi
+berdasarkan ukuran file dan kompresi gzip opsional untuk file yang sudah dirotasi.
+Kalau disk lambat dan buffer penuh, record baru di-drop dan dihitung di `dropped`,
+request tidak pernah menunggu disk.
+
+Format satu baris:
+    {"ts": ..., "request": {...}, "status": 200, "model_version": "...",
+     "response": {...}, "latency_ms": ..., "model_selector": {...}}
+
+"model_selector" (pilihan model dari header X-Model-* dan/atau field body "model") hanya
+ada kalau request memilih model, supaya replay bisa memakai model yang sama.
+
+Aktif lewat env (default off):
+    PREDICTION_LOG_PATH           path file JSONL
+    PREDICTION_LOG_MAX_BYTES      ukuran sebelum rotasi (default 64 MB)
+    PREDICTION_LOG_BACKUP_COUNT   jumlah file rotasi yang disimpan (default 5)
+    PREDICTION_LOG_COMPRESS       "1" untuk gzip file hasil rotasi
+    PREDICTION_LOG_BUFFER_SIZE    kapasitas ring buffer (default 10000 record)
+"""
+
+import atexit
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+
+class PredictionLogger:
+    """Non-blocking JSONL sink dengan ring buffer dan background flush thread"""
+
+    def __init__(self, path, buffer_size=10000, batch_size=500, flush_interval=1.0,
+                 max_bytes=64 * 1024 * 1024, backup_count=5, compress=False):
+        """
+        Args:
+            path (str): File JSONL tujuan
+            buffer_size (int): Kapasitas ring buffer; record di atas ini di-drop
+            batch_size (int): Maksimum record per write
+            flush_interval (float): Interval flush (detik) saat buffer belum mencapai batch_size
+            max_bytes (int): Rotasi file ketika ukurannya melewati batas ini (0 = tanpa rotasi)
+            backup_count (int): Jumlah file rotasi yang disimpan (path.1, path.2, ...)
+            compress (bool): Gzip file hasil rotasi (path.1.gz, ...)
+        """
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closed = False
+
+        self.logged = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.rotations = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls):
+        """Buat logger dari env PREDICTION_LOG_*; return None kalau logging tidak diaktifkan"""
+        path = os.getenv('PREDICTION_LOG_PATH')
+        if not path:
+            return None
+        return cls(
+            path,
+            buffer_size=int(os.getenv('PREDICTION_LOG_BUFFER_SIZE', '10000')),
+            max_bytes=int(os.getenv('PREDICTION_LOG_MAX_BYTES', str(64 * 1024 * 1024))),
+            backup_count=int(os.getenv('PREDICTION_LOG_BACKUP_COUNT', '5')),
+            compress=os.getenv('PREDICTION_LOG_COMPRESS', '0') == '1',
+        )
+
+    def log(self, request, response, status=200, model_version=None, latency_ms=None, model_selector=None):
+        """
+        Enqueue satu prediction record tanpa blocking
+
+        Objek request/response disimpan apa adanya dan di-serialize di background thread,
+        jadi jangan diubah lagi setelah dipanggil.
+
+        Returns:
+            bool: False kalau record di-drop karena buffer penuh atau logger sudah ditutup
+        """
+        record = {
+            'ts': time.time(),
+            'request': request,
+            'status': status,
+            'model_version': model_version,
+            'response': response,
+            'latency_ms': latency_ms,
+        }
+        if model_selector:
+            record['model_selector'] = model_selector
+        with self._lock:
+            if self._closed or len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                return False
+            self._buffer.append(record)
+            self.logged += 1
+            pending = len(self._buffer)
+
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            'logged': self.logged,
+            'written': self.written,
+            'dropped': self.dropped,
+            'pending': pending,
+            'write_errors': self.write_errors,
+            'rotations': self.rotations,
+        }
+
+    def flush(self, timeout=5.0):
+        """Minta background thread menulis semua record yang pending, tunggu sampai timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                pending = len(self._buffer)
+            if pending == 0 and self._idle.is_set():
+                return True
+            self._wakeup.set()
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout=5.0):
+        """Flush record yang tersisa lalu hentikan background thread"""
+        self.flush(timeout)
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def _take_batch(self):
+        with self._lock:
+            count = min(len(self._buffer), self.batch_size)
+            if count:
+                self._idle.clear()
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            batch = self._take_batch()
+            while batch:
+                self._write(batch)
+                batch = self._take_batch()
+            self._idle.set()
+
+            with self._lock:
+                if self._closed and not self._buffer:
+                    return
+
+    def _write(self, batch):
+        try:
+            data = ''.join(json.dumps(record, default=str) + '\n' for record in batch).encode('utf-8')
+            if self.max_bytes and self.path.exists() and self.path.stat().st_size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self.written += len(batch)
+        except Exception as e:
+            with self._lock:
+                self.write_errors += 1
+                self.dropped += len(batch)
+            print(f"Prediction log write failed: {e}", file=sys.stderr)
+
+    def _rotated_path(self, index):
+        suffix = f".{index}.gz" if self.compress else f".{index}"
+        return self.path.with_name(self.path.name + suffix)
+
+    def _rotate(self):
+        """path -> path.1 (-> path.1.gz), path.1 -> path.2, ...; file ke-(backup_count + 1) dihapus"""
+        if self.backup_count <= 0:
+            self.path.unlink()
+            self.rotations += 1
+            return
+
+        oldest = self._rotated_path(self.backup_count)
+        if oldest.exists():
+            oldest.unlink()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self._rotated_path(index)
+            if source.exists():
+                os.replace(source, self._rotated_path(index + 1))
+
+        if self.compress:
+            staging = self.path.with_name(self.path.name + '.rotating')
+            os.replace(self.path, staging)
+            with open(staging, 'rb') as src, gzip.open(self._rotated_path(1), 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            staging.unlink()
+        else:
+            os.replace(self.path, self._rotated_path(1))
+        self.rotations += 1
+
+
+_DEFAULT_LOGGER = None
+_DEFAULT_LOGGER_INIT = False
+_DEFAULT_LOGGER_LOCK = threading.Lock()
+
+
+def get_prediction_logger():
+    """Logger per proses dari env (None kalau PREDICTION_LOG_PATH tidak diset)"""
+    global _DEFAULT_LOGGER, _DEFAULT_LOGGER_INIT
+    if not _DEFAULT_LOGGER_INIT:
+        with _DEFAULT_LOGGER_LOCK:
+            if not _DEFAULT_LOGGER_INIT:
+                _DEFAULT_LOGGER = PredictionLogger.from_env()
+                if _DEFAULT_LOGGER is not None:
+                    atexit.register(_DEFAULT_LOGGER.close, 2.0)
+                _DEFAULT_LOGGER_INIT = True
+    return _DEFAULT_LOGGER
+
+
+def read_prediction_log(path):
+    """Iterate record dari file JSONL (plain atau .gz)"""
+    path = Path(path)
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
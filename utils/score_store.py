@@ -0,0 +1,368 @@
+"""
+Precomputed per-employee risk score store
+
+Semua row di dataset di-score sekali dengan model versi saat ini, lalu disimpan sebagai
+array kompak (EmployeeId, will_stay, will_leave, prediction, risk code) dengan index EmployeeId ->
+posisi row. Lookup satu atau banyak id adalah O(1) per id tanpa menyentuh forest.
+Kedua probabilitas disimpan float64 apa adanya dari predict_proba, sehingga nilainya
+identik dengan response /api/python/predict untuk employee yang sama.
+Store otomatis di-rebuild kalau model version atau dataset fingerprint berubah.
+
+Precompute job:
+    python -m utils.score_store [--force]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.hot_swap import load_serving_model, serving_model_version
+from utils.scoring import (
+    CACHE_DIR, RISK_LEVELS, active_dataset_path, dataset_fingerprint, encode_frame, get_engine,
+    load_dataset, model_version, risk_level_codes
+)
+
+STORE_FILE = 'score_store.npz'
+
+# Kolom kategori yang disimpan (dictionary-encoded) untuk filter query top-N
+CATEGORY_COLUMNS = ('Department', 'JobRole')
+
+# Index direct-address (array) dipakai selama max EmployeeId tidak jauh lebih besar dari jumlah row
+DENSE_INDEX_FACTOR = 4
+
+
+class ScoreStore:
+    """Array-backed table skor per employee dengan index EmployeeId"""
+
+    def __init__(self, employee_ids, will_stay, will_leave, prediction, risk_codes, category_codes, meta):
+        """
+        Args:
+            will_stay, will_leave: Kolom predict_proba (float64, tidak diturunkan satu dari yang lain)
+            category_codes (dict): Kolom kategori -> int16 code per row; nilai asli ada di
+                meta['categories'][kolom] (code = posisi di list)
+        """
+        self.employee_ids = np.asarray(employee_ids, dtype=np.int64)
+        self.will_stay = np.asarray(will_stay, dtype=np.float64)
+        self.will_leave = np.asarray(will_leave, dtype=np.float64)
+        self.prediction = np.asarray(prediction, dtype=np.int8)
+        self.risk_codes = np.asarray(risk_codes, dtype=np.int8)
+        self.category_codes = {col: np.asarray(codes, dtype=np.int16) for col, codes in category_codes.items()}
+        self.meta = meta
+        self._build_index()
+        self._build_category_index()
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def _build_index(self):
+        """EmployeeId -> row position; duplikat id memakai row terakhir"""
+        ids = self.employee_ids
+        n = len(ids)
+        if n and ids.min() >= 0 and ids.max() <= max(DENSE_INDEX_FACTOR * n, 1 << 16):
+            self._dense_index = np.full(int(ids.max()) + 1, -1, dtype=np.int32)
+            self._dense_index[ids] = np.arange(n, dtype=np.int32)
+            self._dict_index = None
+        else:
+            self._dense_index = None
+            self._dict_index = {int(employee_id): position for position, employee_id in enumerate(ids)}
+
+    def _build_category_index(self):
+        """Per kategori: array posisi row (terurut) untuk setiap nilai, termasuk risk_level"""
+        self.category_index = {}
+        columns = dict(self.category_codes, risk_level=self.risk_codes)
+        values = dict(self.meta['categories'], risk_level=list(RISK_LEVELS))
+        for col, codes in columns.items():
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(values[col]) + 1))
+            self.category_index[col] = {
+                value: order[bounds[code]:bounds[code + 1]] for code, value in enumerate(values[col])
+            }
+
+    def positions(self, employee_ids):
+        """Row position untuk setiap id (-1 kalau tidak ada)"""
+        ids = np.asarray(employee_ids, dtype=np.int64)
+        if self._dense_index is not None:
+            positions = np.full(len(ids), -1, dtype=np.int64)
+            in_range = (ids >= 0) & (ids < len(self._dense_index))
+            positions[in_range] = self._dense_index[ids[in_range]]
+            return positions
+        return np.array([self._dict_index.get(int(i), -1) for i in ids], dtype=np.int64)
+
+    def row(self, position):
+        row = {
+            "EmployeeId": int(self.employee_ids[position]),
+            "prediction": int(self.prediction[position]),
+            "probability": {
+                "will_stay": float(self.will_stay[position]),
+                "will_leave": float(self.will_leave[position])
+            },
+            "risk_level": RISK_LEVELS[self.risk_codes[position]],
+        }
+        for col, codes in self.category_codes.items():
+            row[col] = self.meta['categories'][col][codes[position]]
+        return row
+
+    def lookup(self, employee_ids):
+        """
+        Lookup skor untuk banyak EmployeeId sekaligus
+
+        Returns:
+            tuple: (list of score dicts, list of id yang tidak ditemukan)
+        """
+        positions = self.positions(employee_ids)
+        found = [self.row(p) for p in positions if p >= 0]
+        not_found = [int(i) for i, p in zip(employee_ids, positions) if p < 0]
+        return found, not_found
+
+    def filter_positions(self, **filters):
+        """
+        Row position yang cocok dengan semua filter (intersection dari per-category index arrays)
+
+        Args:
+            **filters: kolom -> nilai atau list nilai (OR di dalam satu kolom),
+                misalnya Department='Sales', risk_level=['High', 'Medium']
+
+        Returns:
+            np.ndarray atau None (None = tanpa filter, semua row)
+        """
+        positions = None
+        for col, wanted in filters.items():
+            if wanted is None or wanted == []:
+                continue
+            if col not in self.category_index:
+                raise ValueError(f"Unknown filter '{col}', expected one of {sorted(self.category_index)}")
+            wanted = [wanted] if isinstance(wanted, str) else wanted
+            index = self.category_index[col]
+            parts = [index[value] for value in wanted if value in index]
+            matched = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+        return positions
+
+    def top_at_risk(self, n=10, **filters):
+        """
+        Top-N employee berdasarkan will_leave probability dengan argpartition (O(m), bukan sort penuh)
+
+        Returns:
+            tuple: (list of score dicts terurut menurun, jumlah row yang cocok dengan filter)
+        """
+        positions = self.filter_positions(**filters)
+        scores = self.will_leave if positions is None else self.will_leave[positions]
+        total = len(scores)
+        n = max(0, min(int(n), total))
+        if n == 0:
+            return [], total
+
+        if n < total:
+            top = np.argpartition(-scores, n - 1)[:n]
+        else:
+            top = np.arange(total)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        if positions is not None:
+            top = positions[top]
+        return [self.row(p) for p in top], total
+
+    def is_current(self, current_model_version, current_dataset_fingerprint):
+        return (self.meta.get('model_version') == current_model_version and
+                self.meta.get('dataset_fingerprint') == current_dataset_fingerprint)
+
+    @classmethod
+    def build(cls, engine, df, dataset_fp):
+        """Score semua row DataFrame dalam satu predict_proba call"""
+        import pandas as pd
+
+        proba = engine.predict_proba(encode_frame(df))
+        will_leave = proba[:, 1]
+        categories = {}
+        category_codes = {}
+        for col in CATEGORY_COLUMNS:
+            codes, uniques = pd.factorize(df[col].fillna('Unknown'), sort=True)
+            categories[col] = [str(value) for value in uniques]
+            category_codes[col] = codes
+        meta = {
+            'model_version': engine.version,
+            'dataset_fingerprint': dataset_fp,
+            'rows': int(len(df)),
+            'built_at': time.time(),
+            'categories': categories,
+        }
+        return cls(df['EmployeeId'].to_numpy(), proba[:, 0], will_leave, (will_leave > proba[:, 0]).astype(np.int8),
+                   risk_level_codes(will_leave), category_codes, meta)
+
+    def upsert(self, engine, rows, dataset_fp):
+        """
+        Re-score hanya row yang berubah/baru dan kembalikan store baru
+
+        Row dengan EmployeeId yang sudah ada di-update di posisinya, sisanya di-append.
+        Store lama tidak dimutasi sehingga reader lain tetap melihat data yang konsisten.
+
+        Args:
+            engine: Scoring engine (version harus sama dengan store)
+            rows (DataFrame): Row lengkap (kolom dataset) yang berubah atau baru
+            dataset_fp (str): Fingerprint dataset setelah perubahan
+        """
+        if engine.version != self.meta['model_version']:
+            raise ValueError(f"Engine {engine.version} does not match store model {self.meta['model_version']}")
+
+        proba = engine.predict_proba(encode_frame(rows))
+        will_leave = proba[:, 1]
+        prediction = (will_leave > proba[:, 0]).astype(np.int8)
+        risk_codes = risk_level_codes(will_leave)
+
+        categories = {col: list(values) for col, values in self.meta['categories'].items()}
+        row_codes = {}
+        for col in CATEGORY_COLUMNS:
+            values = categories[col]
+            codes = []
+            for value in rows[col].fillna('Unknown').astype(str):
+                if value not in values:
+                    values.append(value)
+                codes.append(values.index(value))
+            row_codes[col] = np.asarray(codes, dtype=np.int16)
+
+        ids = rows['EmployeeId'].to_numpy(dtype=np.int64)
+        positions = self.positions(ids)
+        existing = positions >= 0
+        appended = ~existing
+
+        def merge(current, values):
+            merged = current.copy()
+            merged[positions[existing]] = values[existing]
+            return np.concatenate([merged, values[appended].astype(current.dtype)])
+
+        meta = dict(self.meta, dataset_fingerprint=dataset_fp, categories=categories, built_at=time.time(),
+                    rows=int(len(self) + appended.sum()))
+        return ScoreStore(
+            merge(self.employee_ids, ids),
+            merge(self.will_stay, proba[:, 0]),
+            merge(self.will_leave, will_leave),
+            merge(self.prediction, prediction),
+            merge(self.risk_codes, risk_codes),
+            {col: merge(codes, row_codes[col]) for col, codes in self.category_codes.items()},
+            meta
+        )
+
+    def arrays(self):
+        arrays = {
+            'employee_ids': self.employee_ids,
+            'will_stay': self.will_stay,
+            'will_leave': self.will_leave,
+            'prediction': self.prediction,
+            'risk_codes': self.risk_codes,
+        }
+        for col, codes in self.category_codes.items():
+            arrays[f"category_{col}"] = codes
+        return arrays
+
+    def save(self, path):
+        """Tulis atomik (temp file + rename) supaya reader tidak pernah membaca file setengah jadi"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)), **self.arrays())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        meta = json.loads(str(arrays.pop('meta')))
+        category_codes = {name[len('category_'):]: arrays.pop(name)
+                          for name in list(arrays) if name.startswith('category_')}
+        return cls(category_codes=category_codes, meta=meta, **arrays)
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def build_score_store(dataset_path=None, model_dir=None, store_path=None, engine=None):
+    """Precompute job: score seluruh dataset dan simpan store ke cache"""
+    dataset_path = Path(dataset_path or active_dataset_path())
+    store_path = Path(store_path or CACHE_DIR / STORE_FILE)
+    engine = engine or load_serving_model(model_dir=model_dir)
+
+    fingerprint = dataset_fingerprint(dataset_path)
+    store = ScoreStore.build(engine, load_dataset(dataset_path), fingerprint)
+    try:
+        store.save(store_path)
+    except OSError as e:
+        print(f"Score store not persisted ({e}), keeping in memory", file=sys.stderr)
+    print(f"Score store built: {len(store)} rows, model {store.meta['model_version']}", file=sys.stderr)
+    return store
+
+
+def get_score_store(dataset_path=None, model_dir=None, store_path=None):
+    """
+    Score store per proses, di-rebuild otomatis kalau model atau dataset berubah
+
+    Urutan: store di memori -> store di cache dir -> precompute ulang. Tanpa model_dir,
+    store harus cocok dengan model serving (hot_swap), termasuk setelah swap.
+    """
+    global _STORE
+    dataset_path = Path(dataset_path or active_dataset_path())
+    store_path = Path(store_path or CACHE_DIR / STORE_FILE)
+    version = model_version(model_dir) if model_dir else serving_model_version()
+    current = (version, dataset_fingerprint(dataset_path))
+
+    store = _STORE
+    if store is not None and store.is_current(*current):
+        return store
+
+    with _STORE_LOCK:
+        if _STORE is not None and _STORE.is_current(*current):
+            return _STORE
+
+        store = None
+        if store_path.exists():
+            try:
+                store = ScoreStore.load(store_path)
+            except Exception as e:
+                print(f"Failed to load score store {store_path}: {e}", file=sys.stderr)
+        if store is None or not store.is_current(*current):
+            if model_dir:
+                store = build_score_store(dataset_path, model_dir, store_path)
+            else:
+                with get_engine().acquire() as engine:
+                    store = build_score_store(dataset_path, store_path=store_path, engine=engine)
+
+        _STORE = store
+        return store
+
+
+def update_score_store(engine, rows, dataset_fp, store_path=None):
+    """Upsert row ke store current dan simpan (dipanggil oleh ingest)"""
+    global _STORE
+    store_path = Path(store_path or CACHE_DIR / STORE_FILE)
+    with _STORE_LOCK:
+        store = _STORE.upsert(engine, rows, dataset_fp)
+        try:
+            store.save(store_path)
+        except OSError as e:
+            print(f"Score store not persisted ({e}), keeping in memory", file=sys.stderr)
+        _STORE = store
+        return store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute per-employee risk scores")
+    parser.add_argument('--dataset', help="Dataset CSV (default: active_dataset_path())")
+    parser.add_argument('--out', help=f"Output store (default: {CACHE_DIR / STORE_FILE})")
+    parser.add_argument('--force', action='store_true', help="Rebuild walaupun store masih current")
+    args = parser.parse_args()
+
+    if args.force:
+        store = build_score_store(args.dataset, store_path=args.out)
+    else:
+        store = get_score_store(args.dataset, store_path=args.out)
+    counts = np.bincount(store.risk_codes, minlength=len(RISK_LEVELS))
+    print(f"✅ {len(store)} employees scored with model {store.meta['model_version']}: " +
+          ", ".join(f"{level} {count}" for level, count in zip(RISK_LEVELS, counts)))
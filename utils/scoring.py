@@ -0,0 +1,357 @@
+"""
+Shared scoring helpers untuk attrition model: feature encoding, model loading dan versioning
+
+Semua handler dan script memakai encoding yang sama dengan `preprocess_input_data`
+di `api/python/predict.py`, tapi langsung ke NumPy matrix (tanpa pandas) supaya
+bisa dipakai untuk satu request maupun batch besar.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODEL_DIR = Path(os.getenv('ATTRITION_MODEL_DIR', REPO_ROOT / 'api' / 'python' / 'models'))
+DATASET_PATH = Path(os.getenv('ATTRITION_DATASET_PATH', REPO_ROOT / 'public' / 'data' / 'hasil_output_DSP (2).csv'))
+# Artifact turunan (score store, cube, dsb.); default ke temp dir karena filesystem serverless read-only
+CACHE_DIR = Path(os.getenv('ATTRITION_CACHE_DIR', Path(tempfile.gettempdir()) / 'attrition_cache'))
+# Dataset hasil ingest: DATASET_PATH ikut di-deploy (read-only), delta ditulis ke salinan ini.
+# Arahkan ke volume bersama kalau beberapa instance harus melihat data yang sama.
+INGEST_DATASET_PATH = Path(os.getenv('ATTRITION_INGEST_DATASET_PATH', CACHE_DIR / 'dataset' / DATASET_PATH.name))
+
+MODEL_FILE = 'rf_model.pkl'
+SCALER_FILE = 'scaler.pkl'
+NUMPY_ARTIFACT_DIR = 'rf_model_numpy'
+
+ENGINES = ('sklearn', 'numpy', 'mmap')
+DEFAULT_ENGINE = os.getenv('ATTRITION_ENGINE', 'sklearn')
+
+NUMERICAL_COLUMNS = [
+    'EmployeeId', 'Age', 'DailyRate', 'DistanceFromHome', 'Education',
+    'EmployeeCount', 'EnvironmentSatisfaction', 'HourlyRate', 'JobInvolvement',
+    'JobLevel', 'JobSatisfaction', 'MonthlyIncome', 'MonthlyRate',
+    'NumCompaniesWorked', 'PercentSalaryHike', 'PerformanceRating',
+    'RelationshipSatisfaction', 'StandardHours', 'StockOptionLevel',
+    'TotalWorkingYears', 'TrainingTimesLastYear', 'WorkLifeBalance',
+    'YearsAtCompany', 'YearsInCurrentRole', 'YearsSinceLastPromotion',
+    'YearsWithCurrManager'
+]
+
+# Nilai konstan yang selalu diset oleh preprocess_input_data
+CONSTANT_COLUMNS = {'EmployeeCount': 1.0, 'StandardHours': 80.0}
+
+# Kategori baseline (di-drop saat one-hot encoding) dipetakan ke None
+CATEGORICAL_MAPPINGS = {
+    'BusinessTravel': {
+        'Travel_Frequently': 'BusinessTravel_Travel_Frequently',
+        'Travel_Rarely': 'BusinessTravel_Travel_Rarely',
+        'Non-Travel': None
+    },
+    'Department': {
+        'Research & Development': 'Department_Research & Development',
+        'Sales': 'Department_Sales',
+        'Human Resources': None
+    },
+    'EducationField': {
+        'Life Sciences': 'EducationField_Life Sciences',
+        'Marketing': 'EducationField_Marketing',
+        'Medical': 'EducationField_Medical',
+        'Other': 'EducationField_Other',
+        'Technical Degree': 'EducationField_Technical Degree',
+        'Human Resources': None
+    },
+    'Gender': {'Male': 'Gender_Male', 'Female': None},
+    'JobRole': {
+        'Human Resources': 'JobRole_Human Resources',
+        'Laboratory Technician': 'JobRole_Laboratory Technician',
+        'Manager': 'JobRole_Manager',
+        'Manufacturing Director': 'JobRole_Manufacturing Director',
+        'Research Director': 'JobRole_Research Director',
+        'Research Scientist': 'JobRole_Research Scientist',
+        'Sales Executive': 'JobRole_Sales Executive',
+        'Sales Representative': 'JobRole_Sales Representative',
+        'Healthcare Representative': None
+    },
+    'MaritalStatus': {
+        'Married': 'MaritalStatus_Married',
+        'Single': 'MaritalStatus_Single',
+        'Divorced': None
+    },
+    'OverTime': {'Yes': 'OverTime_Yes', 'No': None}
+}
+
+FEATURE_COLUMNS = NUMERICAL_COLUMNS + [
+    encoded
+    for mapping in CATEGORICAL_MAPPINGS.values()
+    for encoded in mapping.values()
+    if encoded is not None
+]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+# Model dilatih dengan DataFrame; input NumPy aman karena urutan kolom dijaga di sini
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+
+def get_feature_columns():
+    """Return the exact 47 feature columns that the model expects"""
+    return list(FEATURE_COLUMNS)
+
+
+def _to_float(value):
+    return float(value) if value not in [None, ''] else 0.0
+
+
+def encode_records(records):
+    """
+    Encode list of input dicts ke matrix (n, 47) dengan aturan preprocess_input_data
+
+    Args:
+        records (list): List of raw input dicts (format request /api/python/predict)
+
+    Returns:
+        np.ndarray: Float64 feature matrix
+    """
+    X = np.zeros((len(records), len(FEATURE_COLUMNS)), dtype=np.float64)
+
+    for i, record in enumerate(records):
+        if 'EmployeeNumber' in record:
+            record = dict(record, EmployeeId=record['EmployeeNumber'])
+
+        for j, col in enumerate(NUMERICAL_COLUMNS):
+            if col in record:
+                X[i, j] = _to_float(record[col])
+
+        for cat_col, mapping in CATEGORICAL_MAPPINGS.items():
+            encoded_col = mapping.get(record.get(cat_col))
+            if encoded_col:
+                X[i, FEATURE_INDEX[encoded_col]] = 1.0
+
+    for col, value in CONSTANT_COLUMNS.items():
+        X[:, FEATURE_INDEX[col]] = value
+
+    return X
+
+
+def encode_frame(df):
+    """
+    Vectorized encoding untuk DataFrame (misalnya CSV dataset) ke matrix (n, 47)
+
+    Args:
+        df (pd.DataFrame): Raw employee rows dengan kolom asli (sebelum one-hot)
+
+    Returns:
+        np.ndarray: Float64 feature matrix
+    """
+    import pandas as pd
+
+    X = np.zeros((len(df), len(FEATURE_COLUMNS)), dtype=np.float64)
+
+    if 'EmployeeNumber' in df.columns and 'EmployeeId' not in df.columns:
+        df = df.rename(columns={'EmployeeNumber': 'EmployeeId'})
+
+    for j, col in enumerate(NUMERICAL_COLUMNS):
+        if col in df.columns:
+            X[:, j] = pd.to_numeric(df[col], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+    for cat_col, mapping in CATEGORICAL_MAPPINGS.items():
+        if cat_col not in df.columns:
+            continue
+        values = df[cat_col].to_numpy()
+        for category, encoded_col in mapping.items():
+            if encoded_col:
+                X[:, FEATURE_INDEX[encoded_col]] = (values == category)
+
+    for col, value in CONSTANT_COLUMNS.items():
+        X[:, FEATURE_INDEX[col]] = value
+
+    return X
+
+
+def risk_level(probability):
+    """Map will_leave probability ke risk level (High/Medium/Low)"""
+    return "High" if probability > 0.7 else "Medium" if probability > 0.4 else "Low"
+
+
+RISK_LEVELS = ('Low', 'Medium', 'High')
+
+
+def risk_level_codes(probabilities):
+    """Vectorized risk level: 0=Low, 1=Medium, 2=High"""
+    probabilities = np.asarray(probabilities)
+    return (probabilities > 0.4).astype(np.int8) + (probabilities > 0.7).astype(np.int8)
+
+
+def format_prediction(proba_row, model_type):
+    """Bangun response dict yang sama dengan output handler predict"""
+    will_stay, will_leave = float(proba_row[0]), float(proba_row[1])
+    prediction = 1 if will_leave > will_stay else 0
+    return {
+        "success": True,
+        "prediction": prediction,
+        "prediction_label": "Will Leave" if prediction == 1 else "Will Stay",
+        "probability": {
+            "will_stay": will_stay,
+            "will_leave": will_leave
+        },
+        "risk_level": risk_level(will_leave),
+        "confidence": max(will_stay, will_leave),
+        "model_type": model_type
+    }
+
+
+_VERSION_CACHE = {}
+
+
+def model_version(model_dir=None):
+    """
+    Versi model berbasis checksum isi rf_model.pkl + scaler.pkl
+
+    Returns:
+        str: 12 karakter pertama SHA-256, atau 'unknown' kalau file tidak ada
+    """
+    model_dir = Path(model_dir or MODEL_DIR)
+    paths = [model_dir / MODEL_FILE, model_dir / SCALER_FILE]
+    try:
+        key = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in paths)
+    except FileNotFoundError:
+        return 'unknown'
+
+    if key not in _VERSION_CACHE:
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        _VERSION_CACHE[key] = digest.hexdigest()[:12]
+    return _VERSION_CACHE[key]
+
+
+def active_dataset_path():
+    """Dataset yang berlaku: salinan hasil ingest kalau ada, selain itu DATASET_PATH"""
+    return INGEST_DATASET_PATH if INGEST_DATASET_PATH.exists() else DATASET_PATH
+
+
+def dataset_fingerprint(path=None):
+    """Fingerprint murah (size + mtime) untuk mendeteksi perubahan dataset tanpa membaca isinya"""
+    path = Path(path or active_dataset_path())
+    if path.is_dir():
+        # Dataset columnar (directory): schema ditulis ulang setiap kali dataset berubah
+        from utils.columnar import SCHEMA_FILE
+        path = path / SCHEMA_FILE
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return 'missing'
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def load_dataset(path=None, columns=None):
+    """
+    Load employee dataset sebagai DataFrame
+
+    Kalau ada versi columnar yang masih current untuk CSV ini (python -m utils.columnar),
+    kolom dibaca dari file binary memory-mapped tanpa parsing teks.
+
+    Args:
+        path (str): Path dataset CSV, atau directory dataset columnar (default: active_dataset_path())
+        columns (list): Subset kolom yang dibaca (optional)
+    """
+    import pandas as pd
+    from utils.columnar import ColumnarDataset, open_current
+
+    path = path or active_dataset_path()
+    if Path(path).is_dir():
+        return ColumnarDataset(path).to_frame(columns)
+    columnar = open_current(path)
+    if columnar is not None:
+        return columnar.to_frame(columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+class SklearnEngine:
+    """Scaler + RandomForest dari joblib pickle (full sklearn)"""
+
+    kind = 'sklearn'
+    model_type = "Random Forest ML Model (47 Features)"
+
+    def __init__(self, model, scaler, version, timings=None):
+        self.model = model
+        self.scaler = scaler
+        self.version = version
+        self.timings = timings or {}
+        self.classes_ = model.classes_
+        self.feature_importances_ = model.feature_importances_
+
+    def scale(self, X):
+        """StandardScaler transform (ruang fitur yang dilihat forest)"""
+        return self.scaler.transform(X)
+
+    def predict_proba(self, X):
+        """Scale dan prediksi probabilitas untuk matrix hasil encode_records/encode_frame"""
+        return self.model.predict_proba(self.scale(X))
+
+
+def load_engine(kind=None, model_dir=None):
+    """
+    Load scoring engine
+
+    Args:
+        kind (str): 'sklearn' (joblib pickle), 'numpy' (NumPy-only forest) atau
+            'mmap' (NumPy-only forest dengan array memory-mapped)
+        model_dir (str): Directory berisi artifact model (default: MODEL_DIR)
+
+    Returns:
+        Engine dengan predict_proba(X), classes_, feature_importances_, version dan timings
+    """
+    kind = kind or DEFAULT_ENGINE
+    model_dir = Path(model_dir or MODEL_DIR)
+    if kind not in ENGINES:
+        raise ValueError(f"Unknown engine '{kind}', expected one of {ENGINES}")
+
+    start = time.perf_counter()
+    if kind == 'sklearn':
+        import joblib
+        import sklearn.ensemble  # noqa: F401 - dihitung sebagai waktu import
+        imported = time.perf_counter()
+
+        model_path = model_dir / MODEL_FILE
+        scaler_path = model_dir / SCALER_FILE
+        if not model_path.exists() or not scaler_path.exists():
+            raise FileNotFoundError(
+                f"ML model files not found - model: {model_path.exists()}, scaler: {scaler_path.exists()}"
+            )
+        engine = SklearnEngine(joblib.load(model_path), joblib.load(scaler_path), model_version(model_dir))
+    else:
+        from utils.numpy_forest import NumpyForest
+        imported = time.perf_counter()
+        engine = NumpyForest.load(model_dir / NUMPY_ARTIFACT_DIR, mmap=(kind == 'mmap'))
+        current_version = model_version(model_dir)
+        if current_version != 'unknown' and engine.version != current_version:
+            raise ValueError(
+                f"NumPy forest artifact is stale ({engine.version} != {current_version}), "
+                "re-export with: python -m utils.numpy_forest"
+            )
+
+    loaded = time.perf_counter()
+    engine.timings = {'import_s': imported - start, 'load_s': loaded - imported}
+    print(f"Loaded {kind} engine (model {engine.version}) in {loaded - start:.3f}s", file=sys.stderr)
+    return engine
+
+
+def get_engine():
+    """
+    Engine serving per proses (ATTRITION_ENGINE), sama dengan yang dipakai handler predict
+
+    Mengembalikan HotSwapEngine dari utils.hot_swap, jadi setelah model di-swap semua endpoint
+    ikut memakai model baru. Untuk request yang memakai engine lebih dari sekali, pakai
+    `with get_engine().acquire() as engine:` supaya semuanya dari engine yang sama.
+    """
+    from utils.hot_swap import get_serving_engine
+
+    return get_serving_engine(DEFAULT_ENGINE)[0]
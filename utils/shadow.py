@@ -0,0 +1,273 @@
+"""
+Shadow scoring: bandingkan model kandidat dengan model produksi di traffic asli
+
+Response selalu dari model produksi. Setelah prediksi, matrix fitur (hasil encode_records)
+dan probabilitas produksi dimasukkan ke queue terbatas; worker thread menskor ulang dengan
+model kandidat (beberapa request sekaligus dalam satu predict_proba call) dan mengakumulasi
+statistik perbedaan dengan memori konstan. Kalau queue penuh, item di-drop (dihitung)
+supaya latency request tidak pernah menunggu model kandidat.
+
+Konfigurasi (env):
+    ATTRITION_SHADOW_MODEL=attrition_model/4   model kandidat (name[/version], lewat ModelPool)
+    ATTRITION_SHADOW_STAGE=Staging             atau: versi tertinggi di stage ini
+    ATTRITION_SHADOW_QUEUE=256                 jumlah request maksimum yang menunggu di queue
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.scoring import RISK_LEVELS, risk_level_codes
+
+SHADOW_MODEL = os.getenv('ATTRITION_SHADOW_MODEL', '')
+SHADOW_STAGE = os.getenv('ATTRITION_SHADOW_STAGE', '')
+SHADOW_QUEUE_SIZE = int(os.getenv('ATTRITION_SHADOW_QUEUE', '256'))
+# Item yang digabung worker ke satu predict_proba call
+MAX_COALESCE = 64
+# Jeda sebelum mencoba load ulang model kandidat yang gagal
+RELOAD_BACKOFF_S = 60.0
+# Histogram selisih will_leave (kandidat - produksi) di [-1, 1]
+DELTA_BINS = np.linspace(-1.0, 1.0, 41)
+
+
+class ShadowStats:
+    """Akumulator statistik perbedaan kandidat vs produksi (ukuran tetap)"""
+
+    def __init__(self):
+        self.rows = 0
+        self.sum_delta = 0.0
+        self.sum_abs_delta = 0.0
+        self.sum_sq_delta = 0.0
+        self.max_abs_delta = 0.0
+        self.sum_production = 0.0
+        self.sum_candidate = 0.0
+        self.label_flips = 0
+        self.delta_histogram = np.zeros(len(DELTA_BINS) - 1, dtype=np.int64)
+        # Baris = risk level produksi, kolom = risk level kandidat
+        self.risk_confusion = np.zeros((len(RISK_LEVELS), len(RISK_LEVELS)), dtype=np.int64)
+
+    def update(self, production, candidate):
+        """Update dengan kolom will_leave produksi dan kandidat (array 1-D, satu batch)"""
+        delta = candidate - production
+        abs_delta = np.abs(delta)
+        self.rows += len(delta)
+        self.sum_delta += float(delta.sum())
+        self.sum_abs_delta += float(abs_delta.sum())
+        self.sum_sq_delta += float(np.dot(delta, delta))
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_delta.max(initial=0.0)))
+        self.sum_production += float(production.sum())
+        self.sum_candidate += float(candidate.sum())
+        self.label_flips += int(((production > 0.5) != (candidate > 0.5)).sum())
+        self.delta_histogram += np.histogram(np.clip(delta, -1.0, 1.0), bins=DELTA_BINS)[0]
+        np.add.at(self.risk_confusion, (risk_level_codes(production), risk_level_codes(candidate)), 1)
+
+    def abs_delta_quantile(self, q):
+        """Perkiraan quantile |delta| dari histogram (batas atas bin)"""
+        if self.rows == 0:
+            return None
+        centre = len(self.delta_histogram) // 2
+        # Gabungkan bin simetris: bin ke-i dari tengah = |delta| di [i, i+1) * lebar bin
+        folded = self.delta_histogram[centre:] + self.delta_histogram[:centre][::-1]
+        index = int(np.searchsorted(np.cumsum(folded), q * self.rows))
+        return float(DELTA_BINS[centre + min(index, len(folded) - 1) + 1])
+
+    def report(self):
+        if self.rows == 0:
+            return {'rows': 0}
+        risk_flips = int(self.risk_confusion.sum() - np.trace(self.risk_confusion))
+        return {
+            'rows': self.rows,
+            'mean_delta': self.sum_delta / self.rows,
+            'mean_abs_delta': self.sum_abs_delta / self.rows,
+            'rms_delta': float(np.sqrt(self.sum_sq_delta / self.rows)),
+            'max_abs_delta': self.max_abs_delta,
+            'abs_delta_p50': self.abs_delta_quantile(0.50),
+            'abs_delta_p95': self.abs_delta_quantile(0.95),
+            'abs_delta_p99': self.abs_delta_quantile(0.99),
+            'production_mean_will_leave': self.sum_production / self.rows,
+            'candidate_mean_will_leave': self.sum_candidate / self.rows,
+            'label_flip_rate': self.label_flips / self.rows,
+            'risk_flips': risk_flips,
+            'risk_flip_rate': risk_flips / self.rows,
+            'risk_confusion': {
+                production: {candidate: int(self.risk_confusion[i, j]) for j, candidate in enumerate(RISK_LEVELS)}
+                for i, production in enumerate(RISK_LEVELS)
+            },
+            'delta_histogram': {
+                'edges': DELTA_BINS.tolist(),
+                'counts': self.delta_histogram.tolist(),
+            },
+        }
+
+
+class ShadowScorer:
+    """
+    Queue terbatas + worker thread yang menskor request dengan model kandidat
+
+    Args:
+        load_candidate: Callable tanpa argumen yang me-return (engine, info) model kandidat;
+            dipanggil di worker thread (tidak pernah di jalur request)
+        queue_size (int): Jumlah request maksimum yang menunggu
+    """
+
+    def __init__(self, load_candidate, queue_size=SHADOW_QUEUE_SIZE):
+        self.load_candidate = load_candidate
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = ShadowStats()
+        self.candidate = None
+        self.production_versions = {}
+        self.enqueued = 0
+        self.dropped = 0
+        self.dropped_rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error = None
+        self.busy_s = 0.0
+        self.started_at = time.time()
+        self._next_load = 0.0
+
+    def submit(self, X, production_proba, production_version=None):
+        """
+        Enqueue satu request (non-blocking); return False kalau di-drop karena queue penuh
+
+        X tidak di-copy: matrix hasil encode_records dibuat per request dan tidak diubah lagi
+        setelah predict_proba, jadi worker bisa membacanya langsung.
+        """
+        self._ensure_worker()
+        item = (X, np.asarray(production_proba)[:, 1], production_version)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self.dropped_rows += len(X)
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+                    self._thread.start()
+
+    def _candidate_engine(self):
+        """Engine kandidat (load sekali, retry dengan backoff kalau gagal)"""
+        if self.candidate is None and time.monotonic() >= self._next_load:
+            try:
+                engine, info = self.load_candidate()
+                self.candidate = (engine, info or {'model_version': engine.version})
+            except Exception as e:
+                self._next_load = time.monotonic() + RELOAD_BACKOFF_S
+                self._record_error(f"Candidate load failed: {type(e).__name__}: {e}")
+        return self.candidate
+
+    def _record_error(self, message):
+        with self._lock:
+            self.errors += 1
+            self.last_error = {'error': message, 'at': time.time()}
+        print(f"Shadow scoring error: {message}", file=sys.stderr)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < MAX_COALESCE:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.process(items)
+
+    def process(self, items):
+        """Skor satu gabungan item dengan model kandidat dan update statistik"""
+        started = time.perf_counter()
+        candidate = self._candidate_engine()
+        if candidate is None:
+            with self._lock:
+                self.dropped += len(items)
+                self.dropped_rows += sum(len(X) for X, _, _ in items)
+            return
+
+        X = np.vstack([X for X, _, _ in items])
+        production = np.concatenate([proba for _, proba, _ in items])
+        try:
+            candidate_proba = np.asarray(candidate[0].predict_proba(X))[:, 1]
+        except Exception as e:
+            self._record_error(f"{type(e).__name__}: {e}")
+            return
+
+        with self._lock:
+            self.stats.update(production, candidate_proba)
+            for X_item, _, version in items:
+                self.production_versions[version] = self.production_versions.get(version, 0) + len(X_item)
+            self.batches += 1
+            self.busy_s += time.perf_counter() - started
+
+    def report(self):
+        with self._lock:
+            return {
+                'candidate': self.candidate[1] if self.candidate else None,
+                'production_versions': dict(self.production_versions),
+                'started_at': self.started_at,
+                'queue_depth': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'dropped_rows': self.dropped_rows,
+                'batches': self.batches,
+                'busy_s': self.busy_s,
+                'errors': self.errors,
+                'last_error': self.last_error,
+                'comparison': self.stats.report(),
+            }
+
+    def reset(self):
+        """Mulai statistik baru (misalnya setelah ganti kandidat)"""
+        with self._lock:
+            self.stats = ShadowStats()
+            self.production_versions = {}
+            self.enqueued = self.dropped = self.dropped_rows = self.batches = self.errors = 0
+            self.busy_s = 0.0
+            self.last_error = None
+            self.started_at = time.time()
+
+
+_SHADOW = None
+_SHADOW_LOCK = threading.Lock()
+
+
+def get_shadow_scorer(pool):
+    """
+    ShadowScorer per proses untuk kandidat di ATTRITION_SHADOW_MODEL / ATTRITION_SHADOW_STAGE
+
+    Args:
+        pool: ModelPool (utils/model_pool.py) untuk resolve + load model kandidat
+
+    Returns:
+        ShadowScorer, atau None kalau shadow mode tidak dikonfigurasi
+    """
+    global _SHADOW
+    if not (SHADOW_MODEL or SHADOW_STAGE):
+        return None
+    if _SHADOW is None:
+        with _SHADOW_LOCK:
+            if _SHADOW is None:
+                from utils.model_pool import model_selector
+
+                selector = model_selector(body={'model': {
+                    'name': SHADOW_MODEL.partition('/')[0],
+                    'version': SHADOW_MODEL.partition('/')[2],
+                    'stage': SHADOW_STAGE,
+                }})
+                _SHADOW = ShadowScorer(lambda: pool.get(selector))
+    return _SHADOW
@@ -0,0 +1,216 @@
+"""
+Nearest-neighbor index untuk lookup "similar employees"
+
+Seluruh dataset di-encode dan di-scale (scaler.pkl) sekali, lalu dimasukkan ke BallTree
+(atau KDTree). Query k tetangga terdekat jadi O(log n) per request, bukan brute-force
+jarak ke setiap row. Index di-rebuild otomatis kalau CSV atau model (scaler) berubah.
+EmployeeId ikut di 47 fitur model tapi bukan atribut employee, jadi di-nol-kan sebelum
+jarak dihitung.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.scoring import (
+    FEATURE_INDEX, active_dataset_path, dataset_fingerprint, encode_frame, encode_records,
+    get_engine, load_dataset
+)
+
+TREE_TYPES = ('ball_tree', 'kd_tree')
+DEFAULT_TREE = 'ball_tree'
+LEAF_SIZE = 40
+
+# Kolom dataset yang dikembalikan bersama setiap tetangga
+OUTCOME_COLUMNS = ('Attrition', 'Final_Attrition')
+DISPLAY_COLUMNS = ('Department', 'JobRole')
+
+
+class SimilarityQueryError(ValueError):
+    """Query tetangga tidak valid (dikembalikan sebagai HTTP 400)"""
+
+
+class SimilarityIndex:
+    """Tree index di ruang fitur scaled, plus outcome aktual per row"""
+
+    def __init__(self, tree, employee_ids, columns, meta, dataset=None):
+        self.tree = tree
+        self.employee_ids = employee_ids
+        self.columns = columns
+        self.meta = meta
+        # Raw dataset (index EmployeeId) untuk query berdasarkan id
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    @staticmethod
+    def project(engine, X):
+        """Encoded matrix -> titik di ruang scaled (tanpa EmployeeId)"""
+        points = np.array(engine.scale(X), dtype=np.float64)
+        points[:, FEATURE_INDEX['EmployeeId']] = 0.0
+        return points
+
+    @classmethod
+    def build(cls, engine, df, dataset_fp, tree_type=DEFAULT_TREE):
+        from sklearn.neighbors import BallTree, KDTree
+
+        if tree_type not in TREE_TYPES:
+            raise ValueError(f"Unknown tree type '{tree_type}', expected one of {TREE_TYPES}")
+        start = time.perf_counter()
+        points = cls.project(engine, encode_frame(df))
+        tree = (BallTree if tree_type == 'ball_tree' else KDTree)(points, leaf_size=LEAF_SIZE)
+
+        columns = {}
+        for name in OUTCOME_COLUMNS + DISPLAY_COLUMNS:
+            if name in df.columns:
+                values = df[name]
+                columns[name] = values.to_numpy(dtype=np.float64) if name in OUTCOME_COLUMNS else values.to_numpy()
+        meta = {
+            'model_version': engine.version,
+            'dataset_fingerprint': dataset_fp,
+            'tree_type': tree_type,
+            'rows': int(len(df)),
+            'build_s': time.perf_counter() - start,
+        }
+        return cls(tree, df['EmployeeId'].to_numpy(dtype=np.int64), columns, meta,
+                   dataset=df.set_index('EmployeeId', drop=False))
+
+    def is_current(self, current_model_version, current_dataset_fingerprint):
+        return (self.meta.get('model_version') == current_model_version and
+                self.meta.get('dataset_fingerprint') == current_dataset_fingerprint)
+
+    def neighbor(self, position, distance):
+        result = {"EmployeeId": int(self.employee_ids[position]), "distance": float(distance)}
+        for name, values in self.columns.items():
+            value = values[position]
+            if name in OUTCOME_COLUMNS:
+                value = None if np.isnan(value) else int(value)
+            result[name] = value
+        return result
+
+    def query(self, engine, records, k=10, exclude_ids=None):
+        """
+        k tetangga terdekat untuk setiap employee
+
+        Args:
+            engine: Scoring engine (untuk scaler)
+            records (list): Raw employee dicts
+            k (int): Jumlah tetangga per employee
+            exclude_ids (list): EmployeeId per record yang tidak boleh muncul (employee itu sendiri)
+
+        Returns:
+            list: Untuk setiap record, list tetangga terurut jarak
+
+        Raises:
+            SimilarityQueryError: record tidak bisa di-encode ke fitur numerik yang finite
+        """
+        try:
+            X = encode_records(records)
+        except (TypeError, ValueError) as e:
+            raise SimilarityQueryError(f"Invalid employee: {e}") from e
+        if not np.isfinite(X).all():
+            raise SimilarityQueryError("Invalid employee: numeric fields must be finite")
+        points = self.project(engine, X)
+        # Ambil satu ekstra supaya employee itu sendiri bisa dibuang
+        k_query = min(k + (1 if exclude_ids else 0), len(self))
+        distances, positions = self.tree.query(points, k=k_query)
+
+        results = []
+        for i in range(len(records)):
+            exclude = exclude_ids[i] if exclude_ids else None
+            neighbors = [self.neighbor(pos, dist) for pos, dist in zip(positions[i], distances[i])
+                         if exclude is None or self.employee_ids[pos] != exclude]
+            results.append(neighbors[:k])
+        return results
+
+    def record(self, employee_id):
+        """Raw employee dict dari dataset, None kalau EmployeeId tidak ada"""
+        if self.dataset is None or employee_id not in self.dataset.index:
+            return None
+        row = self.dataset.loc[employee_id]
+        return {name: value.item() if hasattr(value, 'item') else value for name, value in row.items()}
+
+
+def outcome_summary(neighbors):
+    """Attrition rate di antara tetangga (label NaN tidak dihitung)"""
+    summary = {}
+    for name in OUTCOME_COLUMNS:
+        labels = [n[name] for n in neighbors if n.get(name) is not None]
+        summary[name] = {
+            "labeled": len(labels),
+            "left": int(sum(labels)),
+            "rate": sum(labels) / len(labels) if labels else None,
+        }
+    return summary
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_similarity_index(dataset_path=None, tree_type=DEFAULT_TREE, engine=None):
+    """
+    Similarity index per proses, di-rebuild kalau CSV atau model berubah
+
+    Args:
+        engine: Engine yang dipakai request (default: engine serving, termasuk setelah hot swap)
+    """
+    global _INDEX
+    if engine is None:
+        with get_engine().acquire() as engine:
+            return get_similarity_index(dataset_path, tree_type, engine)
+    dataset_path = Path(dataset_path or active_dataset_path())
+    current = (engine.version, dataset_fingerprint(dataset_path))
+
+    index = _INDEX
+    if index is not None and index.is_current(*current) and index.meta['tree_type'] == tree_type:
+        return index
+
+    with _INDEX_LOCK:
+        if _INDEX is not None and _INDEX.is_current(*current) and _INDEX.meta['tree_type'] == tree_type:
+            return _INDEX
+
+        index = SimilarityIndex.build(engine, load_dataset(dataset_path), current[1], tree_type)
+        print(f"Similarity index built: {len(index)} rows ({tree_type}) in {index.meta['build_s']:.3f}s",
+              file=sys.stderr)
+        _INDEX = index
+        return index
+
+
+def find_similar(employee=None, k=10, employee_id=None, max_k=100):
+    """
+    k tetangga untuk employee baru (employee) atau employee di dataset (employee_id)
+
+    Engine dan index berasal dari model serving yang sama, juga kalau model di-swap di
+    tengah request. Employee dengan employee_id tidak ikut dikembalikan sebagai tetangga.
+
+    Returns:
+        dict: model_version, employee_id, k, neighbors, summary
+
+    Raises:
+        SimilarityQueryError: k di luar 1..max_k, EmployeeId tidak ada, atau employee tidak valid
+    """
+    if not 1 <= k <= max_k:
+        raise SimilarityQueryError(f"k must be an integer between 1 and {max_k}")
+
+    with get_engine().acquire() as engine:
+        index = get_similarity_index(engine=engine)
+        if employee is None:
+            employee = index.record(employee_id)
+            if employee is None:
+                raise SimilarityQueryError(f"EmployeeId {employee_id} not found")
+
+        neighbors = index.query(engine, [employee], k=k,
+                                exclude_ids=[employee_id] if employee_id is not None else None)[0]
+        return {
+            "model_version": index.meta['model_version'],
+            "employee_id": employee_id,
+            "k": k,
+            "neighbors": neighbors,
+            "summary": outcome_summary(neighbors)
+        }
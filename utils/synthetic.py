@@ -0,0 +1,362 @@
+"""
+Generator data employee sintetis untuk benchmark dan load test
+
+Model dipelajari dari CSV dataset dengan Gaussian copula:
+- marginal setiap kolom = distribusi empiris (quantile lookup, jadi nilai diskrit tetap valid)
+- korelasi antar kolom = korelasi normal score (rank -> ndtri), termasuk Final_Attrition,
+  jadi hubungan OverTime/Income/Age dengan attrition ikut terbawa
+- kategori nominal diurutkan berdasarkan attrition rate sebelum masuk copula
+- kolom masa kerja dimodelkan sebagai rasio terhadap batas atasnya (konsisten dengan Age)
+- Department / PerformanceRating diambil dari P(kolom | JobRole / PercentSalaryHike),
+  kolom konstan disalin apa adanya
+- Attrition = Final_Attrition yang di-mask kosong dengan rate per kelas yang sama seperti dataset
+
+Output ditulis per chunk (CSV append atau ColumnarWriter), jadi memori tetap terbatas
+berapa pun jumlah row-nya. Hasil deterministik untuk seed + chunk size yang sama.
+
+Usage:
+    python -m utils.synthetic --rows 10000000 --out /tmp/employees_10m.csv
+    python -m utils.synthetic --rows 10000000 --format columnar --out /tmp/employees_10m
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from utils.columnar import ColumnarWriter
+from utils.scoring import DATASET_PATH, load_dataset
+
+DEFAULT_CHUNK_ROWS = 100_000
+OUTPUT_FORMATS = ('csv', 'columnar')
+
+TARGET_COLUMN = 'Final_Attrition'
+
+# Kolom yang hampir deterministik terhadap kolom lain diambil dari distribusi kondisional
+# P(kolom | parent), bukan dari copula (korelasinya terlalu kuat untuk Gaussian copula)
+CONDITIONAL_COLUMNS = {
+    'Department': 'JobRole',
+    'PerformanceRating': 'PercentSalaryHike',
+}
+
+# Kolom masa kerja dimodelkan sebagai rasio terhadap batas atasnya: (kolom, batas, offset)
+# -> value = round(ratio * (batas - offset)), jadi pengalaman <= umur - 18, tenure <= pengalaman, dst
+TENURE_RATIOS = (
+    ('TotalWorkingYears', 'Age', 18),
+    ('YearsAtCompany', 'TotalWorkingYears', 0),
+    ('YearsInCurrentRole', 'YearsAtCompany', 0),
+    ('YearsSinceLastPromotion', 'YearsAtCompany', 0),
+    ('YearsWithCurrManager', 'YearsAtCompany', 0),
+)
+
+# Diisi setelah copula: EmployeeId berurutan, Attrition dari Final_Attrition
+DERIVED_COLUMNS = ('EmployeeId', 'Attrition') + tuple(CONDITIONAL_COLUMNS)
+
+
+def _normal_scores(values, rng):
+    """Rank (tie dipecah acak) -> normal score, supaya kolom diskrit tidak bias ke satu sisi"""
+    from scipy.special import ndtri
+
+    n = len(values)
+    order = np.lexsort((rng.random(n), values))
+    ranks = np.empty(n)
+    ranks[order] = np.arange(n)
+    return ndtri((ranks + 0.5) / n)
+
+
+def _tie_variance_share(values):
+    """
+    Porsi variance normal score yang dijelaskan oleh nilai kolom (1.0 untuk kolom kontinu)
+
+    Tie-breaking acak menambah noise di dalam setiap band nilai, jadi korelasi kolom diskrit
+    (OverTime, PerformanceRating, ...) teredam. Korelasi latent = korelasi / sqrt(share_i * share_j).
+    """
+    from scipy.special import ndtri
+
+    _, counts = np.unique(values, return_counts=True)
+    p = counts / counts.sum()
+    edges = ndtri(np.concatenate([[0.0], np.cumsum(p)[:-1], [1.0]]))
+    density = np.exp(-0.5 * edges ** 2) / np.sqrt(2 * np.pi)
+    band_means = (density[:-1] - density[1:]) / p
+    return float(np.sum(p * band_means ** 2))
+
+
+def _nearest_correlation(corr):
+    """Clip eigenvalue negatif supaya matrix positive definite (Cholesky)"""
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    fixed = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+
+class SyntheticModel:
+    """Gaussian copula + marginal empiris; fit() dari DataFrame, generate() per chunk"""
+
+    def __init__(self, columns, dtypes, constants, copula_columns, marginals, categories,
+                 cholesky, ratios, conditionals, attrition_missing_rate):
+        self.columns = columns
+        self.dtypes = dtypes
+        self.constants = constants
+        self.copula_columns = copula_columns
+        self.marginals = marginals
+        self.categories = categories
+        self.cholesky = cholesky
+        self.ratios = ratios
+        self.conditionals = conditionals
+        self.attrition_missing_rate = attrition_missing_rate
+
+    @classmethod
+    def fit(cls, df, seed=0):
+        """
+        Pelajari marginal dan korelasi dari dataset
+
+        Args:
+            df (DataFrame): Dataset sumber (format CSV dataset)
+            seed (int): Seed untuk tie-breaking rank
+
+        Returns:
+            SyntheticModel
+        """
+        import pandas as pd
+
+        rng = np.random.default_rng(seed)
+        target = pd.Series(df[TARGET_COLUMN].to_numpy(dtype=np.float64))
+
+        ratios = [(name, limit, offset) for name, limit, offset in TENURE_RATIOS
+                  if name in df.columns and limit in df.columns]
+        ratio_values = {}
+        for name, limit, offset in ratios:
+            bound = np.maximum(df[limit].to_numpy(dtype=np.float64) - offset, 0)
+            value = df[name].to_numpy(dtype=np.float64)
+            ratio_values[name] = np.divide(value, bound, out=np.zeros(len(df)), where=bound > 0).clip(0, 1)
+
+        constants, copula_columns, marginals, categories = {}, [], {}, {}
+        scores, shares = [], []
+        for name in df.columns:
+            if name in DERIVED_COLUMNS:
+                continue
+            series = df[name]
+            if series.nunique(dropna=False) == 1:
+                constants[name] = series.iloc[0]
+                continue
+            if name in ratio_values:
+                values = ratio_values[name]
+            elif series.dtype.kind in 'biuf':
+                values = series.to_numpy(dtype=np.float64)
+            else:
+                # Kategori nominal diurutkan berdasarkan attrition rate, jadi korelasi dengan
+                # Final_Attrition (dan kolom lain lewat jalur itu) ikut terbawa di copula
+                rates = target.groupby(series.to_numpy()).mean()
+                categories[name] = list(rates.sort_values(kind='stable').index)
+                values = series.map({value: i for i, value in enumerate(categories[name])}).to_numpy(dtype=np.float64)
+            copula_columns.append(name)
+            marginals[name] = np.sort(values)
+            scores.append(_normal_scores(values, rng))
+            shares.append(_tie_variance_share(values))
+
+        shares = np.sqrt(np.asarray(shares))
+        corr = np.clip(np.corrcoef(np.vstack(scores)) / np.outer(shares, shares), -0.999, 0.999)
+        np.fill_diagonal(corr, 1.0)
+        corr = _nearest_correlation(corr)
+
+        conditionals = {}
+        for name, parent in CONDITIONAL_COLUMNS.items():
+            crosstab = df.groupby(parent)[name].value_counts(normalize=True)
+            conditionals[name] = (parent, {
+                key: (group.index.get_level_values(1).to_numpy(), group.to_numpy())
+                for key, group in crosstab.groupby(level=0)
+            })
+
+        # Label Attrition tidak hilang secara acak: rate kosong dipisah per nilai Final_Attrition
+        missing = df['Attrition'].isna()
+        attrition_missing_rate = {float(value): float(missing[target.to_numpy() == value].mean())
+                                  for value in np.unique(target.dropna())}
+
+        return cls(
+            columns=list(df.columns),
+            dtypes={name: df[name].dtype for name in df.columns},
+            constants=constants,
+            copula_columns=copula_columns,
+            marginals=marginals,
+            categories=categories,
+            cholesky=np.linalg.cholesky(corr),
+            ratios=ratios,
+            conditionals=conditionals,
+            attrition_missing_rate=attrition_missing_rate,
+        )
+
+    def generate(self, rows, rng, start_id=1):
+        """
+        Generate satu chunk row sintetis
+
+        Args:
+            rows (int): Jumlah row
+            rng (Generator): numpy random Generator
+            start_id (int): EmployeeId untuk row pertama
+
+        Returns:
+            DataFrame: kolom dan dtype sama dengan dataset sumber
+        """
+        import pandas as pd
+        from scipy.special import ndtr
+
+        z = rng.standard_normal((rows, len(self.copula_columns))) @ self.cholesky.T
+        u = ndtr(z)
+
+        data = {}
+        for i, name in enumerate(self.copula_columns):
+            sorted_values = self.marginals[name]
+            n = len(sorted_values)
+            values = sorted_values[np.minimum((u[:, i] * n).astype(np.int64), n - 1)]
+            if name in self.categories:
+                values = np.asarray(self.categories[name], dtype=object)[values.astype(np.int64)]
+            data[name] = values
+
+        # Urutan TENURE_RATIOS menjamin batas atas sudah berupa nilai absolut
+        for name, limit, offset in self.ratios:
+            data[name] = np.rint(data[name] * np.maximum(data[limit] - offset, 0))
+
+        for name, (parent, distributions) in self.conditionals.items():
+            values = np.empty(rows, dtype=object)
+            parents = data[parent]
+            for key, (choices, probabilities) in distributions.items():
+                mask = parents == key
+                count = int(mask.sum())
+                if count:
+                    values[mask] = rng.choice(choices.astype(object), size=count, p=probabilities)
+            data[name] = values
+
+        attrition = data[TARGET_COLUMN].astype(np.float64)
+        missing_rate = np.zeros(rows)
+        for value, rate in self.attrition_missing_rate.items():
+            missing_rate[attrition == value] = rate
+        data['Attrition'] = np.where(rng.random(rows) < missing_rate, np.nan, attrition)
+        data['EmployeeId'] = np.arange(start_id, start_id + rows, dtype=np.int64)
+
+        frame = {}
+        for name in self.columns:
+            if name in self.constants:
+                frame[name] = np.full(rows, self.constants[name], dtype=object if isinstance(self.constants[name], str) else None)
+            else:
+                frame[name] = data[name]
+        df = pd.DataFrame(frame, columns=self.columns)
+        for name in self.columns:
+            dtype = self.dtypes[name]
+            df[name] = df[name].astype(dtype if dtype.kind in 'biuf' else 'str')
+        return df
+
+    def stream(self, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, start_id=1):
+        """Yield chunk DataFrame sampai total `rows` (deterministik untuk seed + chunk_rows)"""
+        seeds = np.random.SeedSequence(seed)
+        for offset in range(0, rows, chunk_rows):
+            rng = np.random.default_rng(seeds.spawn(1)[0])
+            yield self.generate(min(chunk_rows, rows - offset), rng, start_id + offset)
+
+
+def columnar_spec(df):
+    """Spesifikasi kolom ColumnarWriter dari dataset sumber (dictionary = nilai sumber)"""
+    spec = []
+    for name in df.columns:
+        series = df[name]
+        if series.dtype.kind in 'biuf':
+            spec.append({'name': name, 'kind': 'numeric', 'dtype': series.dtype.str})
+        else:
+            spec.append({'name': name, 'kind': 'categorical',
+                         'dictionary': sorted(str(value) for value in series.dropna().unique())})
+    return spec
+
+
+def generate_dataset(out_path, rows, fmt='csv', seed=0, chunk_rows=DEFAULT_CHUNK_ROWS,
+                     dataset_path=None, start_id=1):
+    """
+    Generate dataset sintetis ke file CSV atau directory columnar
+
+    Args:
+        out_path (str): File CSV atau directory columnar
+        rows (int): Jumlah row
+        fmt (str): 'csv' atau 'columnar'
+        seed (int): Seed (hasil sama untuk seed + chunk_rows yang sama)
+        chunk_rows (int): Row per chunk (batas memori)
+        dataset_path (str): Dataset sumber (default: DATASET_PATH)
+        start_id (int): EmployeeId pertama
+
+    Returns:
+        dict: ringkasan (rows, chunks, elapsed_s, rows_per_s)
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {OUTPUT_FORMATS}")
+    if rows <= 0 or chunk_rows <= 0:
+        raise ValueError("rows and chunk_rows must be positive")
+
+    started = time.perf_counter()
+    source = load_dataset(dataset_path)
+    model = SyntheticModel.fit(source, seed)
+    out_path = Path(out_path)
+
+    chunks = 0
+    if fmt == 'csv':
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in model.stream(rows, seed, chunk_rows, start_id):
+                chunk.to_csv(f, index=False, header=chunks == 0)
+                chunks += 1
+        os.replace(tmp_path, out_path)
+    else:
+        writer = ColumnarWriter(out_path, columnar_spec(source), rows)
+        for chunk in model.stream(rows, seed, chunk_rows, start_id):
+            writer.write(chunk)
+            chunks += 1
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {'rows': rows, 'chunks': chunks, 'format': fmt, 'out': str(out_path),
+            'elapsed_s': elapsed, 'rows_per_s': rows / elapsed}
+
+
+def compare(source, synthetic):
+    """
+    Bandingkan dataset sintetis dengan sumber
+
+    Returns:
+        dict: selisih mean relatif per kolom numerik, selisih attrition rate, dan
+            selisih maksimum/rata-rata korelasi antar kolom numerik
+    """
+    numeric = [name for name in source.columns
+               if source[name].dtype.kind in 'biuf' and source[name].nunique() > 1 and name != 'EmployeeId']
+    mean_diff = {}
+    for name in numeric:
+        expected = source[name].mean()
+        mean_diff[name] = float(abs(synthetic[name].mean() - expected) / (abs(expected) or 1.0))
+    corr_diff = np.abs(source[numeric].corr().to_numpy() - synthetic[numeric].corr().to_numpy())
+    return {
+        'mean_rel_diff': mean_diff,
+        'attrition_rate': (float(source[TARGET_COLUMN].mean()), float(synthetic[TARGET_COLUMN].mean())),
+        'max_corr_diff': float(np.nanmax(corr_diff)),
+        'mean_corr_diff': float(np.nanmean(corr_diff)),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate data employee sintetis dari dataset")
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--out', required=True, help="File CSV atau directory columnar")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--start-id', type=int, default=1)
+    parser.add_argument('--dataset', help="Dataset sumber (default: DATASET_PATH)")
+    args = parser.parse_args()
+
+    try:
+        summary = generate_dataset(args.out, args.rows, args.format, args.seed, args.chunk_rows,
+                                   args.dataset, args.start_id)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"✅ {summary['rows']} rows ({summary['chunks']} chunks) -> {summary['out']} ({summary['format']}) "
+          f"in {summary['elapsed_s']:.1f}s, {summary['rows_per_s']:,.0f} rows/s")
@@ -0,0 +1,149 @@
+"""
+Vectorized what-if / sensitivity sweep
+
+Base employee di-encode sekali, lalu seluruh grid (1 atau 2 fitur) dibangun sebagai satu
+encoded matrix dengan broadcasting dan di-score dalam satu predict_proba call.
+"""
+
+import numpy as np
+
+from utils.scoring import (
+    CATEGORICAL_MAPPINGS, CONSTANT_COLUMNS, FEATURE_INDEX, NUMERICAL_COLUMNS,
+    RISK_LEVELS, encode_records, risk_level_codes
+)
+
+# Fitur numerik yang masuk akal untuk di-sweep (identitas dan konstanta tidak)
+SWEEPABLE_NUMERIC = [c for c in NUMERICAL_COLUMNS if c != 'EmployeeId' and c not in CONSTANT_COLUMNS]
+MAX_FEATURES = 2
+MAX_VALUES_PER_AXIS = 200
+MAX_GRID_CELLS = 10000
+
+
+class SweepError(ValueError):
+    """Spesifikasi sweep tidak valid (dikembalikan sebagai HTTP 400)"""
+
+
+def axis_values(spec):
+    """
+    Nilai untuk satu axis sweep
+
+    Args:
+        spec (dict): {"name": "MonthlyIncome", "values": [...]} atau
+            {"name": "MonthlyIncome", "start": 1000, "stop": 20000, "num": 50};
+            fitur kategori tanpa "values" memakai semua kategori
+    """
+    name = spec.get('name')
+    if not isinstance(name, str):
+        raise SweepError("Each feature needs a 'name' string")
+    if 'values' in spec and not isinstance(spec['values'], list):
+        raise SweepError(f"'values' for {name} must be a list")
+
+    if name in CATEGORICAL_MAPPINGS:
+        values = spec.get('values') or list(CATEGORICAL_MAPPINGS[name])
+        unknown = [v for v in values if not isinstance(v, str) or v not in CATEGORICAL_MAPPINGS[name]]
+        if unknown:
+            raise SweepError(f"Unknown {name} categories: {unknown}")
+        return list(values)
+
+    if name not in SWEEPABLE_NUMERIC:
+        raise SweepError(f"Feature '{name}' cannot be swept, expected one of "
+                         f"{SWEEPABLE_NUMERIC + list(CATEGORICAL_MAPPINGS)}")
+
+    try:
+        if 'values' in spec:
+            values = [float(v) for v in spec['values']]
+        elif 'start' in spec and 'stop' in spec:
+            num = int(spec.get('num', 20))
+            if not 1 <= num <= MAX_VALUES_PER_AXIS:
+                raise SweepError(f"'num' for {name} must be between 1 and {MAX_VALUES_PER_AXIS}")
+            values = np.linspace(float(spec['start']), float(spec['stop']), num).tolist()
+        else:
+            raise SweepError(f"Feature '{name}' needs 'values' or 'start'/'stop'")
+    except SweepError:
+        raise
+    except (TypeError, ValueError, OverflowError) as e:
+        raise SweepError(f"Invalid sweep values for {name}: {e}") from e
+    if not all(np.isfinite(values)):
+        raise SweepError(f"Sweep values for {name} must be finite numbers")
+    return values
+
+
+def set_feature(X, rows, name, value):
+    """Set satu fitur (numerik atau kategori one-hot) pada subset row matrix encoded"""
+    if name in CATEGORICAL_MAPPINGS:
+        for encoded_col in CATEGORICAL_MAPPINGS[name].values():
+            if encoded_col:
+                X[rows, FEATURE_INDEX[encoded_col]] = 0.0
+        encoded_col = CATEGORICAL_MAPPINGS[name][value]
+        if encoded_col:
+            X[rows, FEATURE_INDEX[encoded_col]] = 1.0
+    else:
+        X[rows, FEATURE_INDEX[name]] = value
+
+
+def encode_base(base_record):
+    """Encode base employee sekali; input yang tidak bisa di-encode menjadi SweepError"""
+    try:
+        return encode_records([base_record])[0]
+    except (TypeError, ValueError) as e:
+        raise SweepError(f"Invalid base employee: {e}") from e
+
+
+def build_grid(base, features):
+    """
+    Bangun encoded matrix untuk seluruh grid
+
+    Args:
+        base (np.ndarray): Base employee hasil encode_base
+        features (list): Spesifikasi axis (lihat axis_values)
+
+    Returns:
+        tuple: (X dengan shape (n1 * n2, 47), list of (name, values))
+    """
+    if not 1 <= len(features) <= MAX_FEATURES:
+        raise SweepError(f"Provide 1 to {MAX_FEATURES} features to sweep")
+    axes = [(spec.get('name'), axis_values(spec)) for spec in features]
+    if len({name for name, _ in axes}) != len(axes):
+        raise SweepError("Swept features must be distinct")
+
+    shape = tuple(len(values) for _, values in axes)
+    if any(n == 0 or n > MAX_VALUES_PER_AXIS for n in shape):
+        raise SweepError(f"Each axis needs 1 to {MAX_VALUES_PER_AXIS} values")
+    cells = int(np.prod(shape))
+    if cells > MAX_GRID_CELLS:
+        raise SweepError(f"Grid has {cells} cells, maximum is {MAX_GRID_CELLS}")
+
+    X = np.tile(base, (cells, 1))
+    # Row-major: index row = i * n2 + j, cocok dengan reshape(shape)
+    grid_index = np.indices(shape).reshape(len(shape), -1)
+    for axis, (name, values) in enumerate(axes):
+        if name in CATEGORICAL_MAPPINGS:
+            for k, value in enumerate(values):
+                set_feature(X, grid_index[axis] == k, name, value)
+        else:
+            X[:, FEATURE_INDEX[name]] = np.asarray(values, dtype=np.float64)[grid_index[axis]]
+    return X, axes
+
+
+def sweep(engine, base_record, features):
+    """
+    Probability curve (1 fitur) atau surface (2 fitur) untuk base employee
+
+    Returns:
+        dict: axes, will_leave dan risk_level dengan shape grid, plus probabilitas base
+    """
+    base = encode_base(base_record)
+    X, axes = build_grid(base, features)
+    shape = tuple(len(values) for _, values in axes)
+
+    # Base row ikut di-score dalam call yang sama
+    proba = engine.predict_proba(np.vstack([base, X]))[:, 1]
+    base_probability, will_leave = float(proba[0]), proba[1:]
+
+    return {
+        "axes": [{"name": name, "values": values} for name, values in axes],
+        "base_probability": base_probability,
+        "will_leave": will_leave.reshape(shape).tolist(),
+        "risk_level": np.asarray(RISK_LEVELS)[risk_level_codes(will_leave)].reshape(shape).tolist(),
+        "cells": int(will_leave.size),
+    }